@@ -0,0 +1,139 @@
+from typing import Dict, List
+import random
+
+# Identifiers and literals mixed into the synthetic statements
+_TABLES = ['customers', 'orders', 'order_items', 'products', 'invoices', 'payments',
+           'shipments', 'warehouses', 'suppliers', 'employees', 'departments', 'audit_log']
+_COLUMNS = ['id', 'customer_id', 'order_id', 'product_id', 'status', 'created_at',
+            'updated_at', 'amount', 'quantity', 'unit_price', 'region', 'name', 'email']
+_UNICODE_VALUES = ['Müller', 'São Paulo', '東京', 'Zürich', 'Łódź', 'Ελλάδα',
+                   'Москва', 'naïve café', '✓ shipped', 'Ünïcødé 🚚']
+_ERRORS = [
+    'All AI models failed. Last error: API Error (429): Rate limit exceeded',
+    'All AI models failed. Last error: Read timed out. (read timeout=60)',
+    'Invalid API response: No choices returned',
+]
+_MODELS = ['google/gemini-2.0-flash-exp:free', 'meta-llama/llama-3.3-70b-instruct:free',
+           'openai/gpt-4o-mini']
+
+
+def build_results(count: int, seed: int = 42, error_rate: float = 0.1) -> List[Dict]:
+    """
+    Build a deterministic synthetic result set.
+
+    Statements mix short DML, long multi-join queries, wide DDL and stored
+    procedures, with unicode literals and comments; about error_rate of
+    them are failed conversions.
+
+    Args:
+        count: Number of results
+        seed: Random seed, so runs are comparable
+        error_rate: Fraction of failed conversions
+
+    Returns:
+        List of conversion result dicts, as returned by AIConverter
+    """
+    rng = random.Random(seed)
+    builders = [_select, _select, _insert, _update, _create_table, _procedure]
+    results = []
+
+    for i in range(1, count + 1):
+        original = rng.choice(builders)(rng)
+
+        if rng.random() < error_rate:
+            results.append({
+                "id": f"stmt-{i:06d}",
+                "original": original,
+                "converted": None,
+                "status": "error",
+                "notes": rng.choice(_ERRORS),
+                "model": None,
+                "duration_ms": round(rng.uniform(50, 60000), 1)
+            })
+            continue
+
+        results.append({
+            "id": f"stmt-{i:06d}",
+            "original": original,
+            "converted": _convert(original),
+            "status": "success",
+            "notes": "Replaced LIMIT with FETCH FIRST; NOW() with SYSDATE; "
+                     "IFNULL with NVL. Identifiers kept as written.",
+            "model": rng.choice(_MODELS),
+            "duration_ms": round(rng.uniform(300, 8000), 1)
+        })
+
+    return results
+
+
+def _convert(sql: str) -> str:
+    """Cheap stand-in for a converted statement of similar size."""
+    return (sql.replace('LIMIT', 'FETCH FIRST')
+               .replace('NOW()', 'SYSDATE')
+               .replace('IFNULL', 'NVL')
+               .replace('AUTO_INCREMENT', 'GENERATED ALWAYS AS IDENTITY'))
+
+
+def _columns(rng: random.Random, count: int) -> List[str]:
+    return [rng.choice(_COLUMNS) + (f"_{n}" if n else '') for n in range(count)]
+
+
+def _select(rng: random.Random) -> str:
+    tables = rng.sample(_TABLES, rng.randint(1, 5))
+    columns = ',\n       '.join(f"t0.{c}" for c in _columns(rng, rng.randint(3, 25)))
+    joins = '\n'.join(
+        f"  LEFT JOIN {table} t{n} ON t{n}.{rng.choice(_COLUMNS)} = t0.id"
+        for n, table in enumerate(tables[1:], 1)
+    )
+    return (
+        f"-- report for {rng.choice(_UNICODE_VALUES)}\n"
+        f"SELECT {columns},\n"
+        f"       CASE WHEN t0.status = 'open' THEN IFNULL(t0.amount, 0) ELSE 0 END AS open_amount,\n"
+        f"       ROW_NUMBER() OVER (PARTITION BY t0.region ORDER BY t0.created_at DESC) AS rn\n"
+        f"FROM {tables[0]} t0\n{joins}\n"
+        f"WHERE t0.region = '{rng.choice(_UNICODE_VALUES)}'\n"
+        f"  AND t0.created_at > NOW() - INTERVAL {rng.randint(1, 90)} DAY\n"
+        f"ORDER BY t0.created_at DESC\nLIMIT {rng.randint(10, 1000)};"
+    )
+
+
+def _insert(rng: random.Random) -> str:
+    columns = _columns(rng, rng.randint(3, 8))
+    rows = ',\n'.join(
+        "  (" + ', '.join(f"'{rng.choice(_UNICODE_VALUES)}'" for _ in columns) + ")"
+        for _ in range(rng.randint(1, 20))
+    )
+    return f"INSERT INTO {rng.choice(_TABLES)} ({', '.join(columns)}) VALUES\n{rows};"
+
+
+def _update(rng: random.Random) -> str:
+    return (
+        f"UPDATE {rng.choice(_TABLES)}\n"
+        f"SET status = '{rng.choice(_UNICODE_VALUES)}', updated_at = NOW()\n"
+        f"WHERE id IN (SELECT order_id FROM order_items WHERE quantity > {rng.randint(1, 50)});"
+    )
+
+
+def _create_table(rng: random.Random) -> str:
+    columns = ',\n'.join(
+        f"  {column} {rng.choice(['INT', 'VARCHAR(255)', 'DECIMAL(12,2)', 'DATETIME', 'TEXT'])}"
+        for column in _columns(rng, rng.randint(5, 60))
+    )
+    return (
+        f"CREATE TABLE {rng.choice(_TABLES)}_{rng.randint(1, 999)} (\n"
+        f"  pk INT NOT NULL AUTO_INCREMENT,\n{columns},\n  PRIMARY KEY (pk)\n"
+        f") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='{rng.choice(_UNICODE_VALUES)}';"
+    )
+
+
+def _procedure(rng: random.Random) -> str:
+    body = '\n'.join(
+        f"  UPDATE {rng.choice(_TABLES)} SET amount = amount * 1.0{n} WHERE region = p_region;"
+        for n in range(rng.randint(2, 40))
+    )
+    return (
+        f"CREATE PROCEDURE refresh_{rng.randint(1, 999)}(IN p_region VARCHAR(50))\n"
+        f"BEGIN\n  DECLARE v_count INT DEFAULT 0;\n{body}\n"
+        f"  IF v_count > 0 THEN\n    INSERT INTO audit_log (name) VALUES ('{rng.choice(_UNICODE_VALUES)}');\n"
+        f"  END IF;\nEND;"
+    )
@@ -0,0 +1,247 @@
+"""
+Export generator benchmark.
+
+Builds synthetic result sets and measures wall time, peak RSS and output
+size for each export generator, each run in a fresh process. Results can
+be saved as a baseline and later runs compared against it.
+
+Usage (from the backend directory):
+    python -m benchmarks.export_benchmark
+    python -m benchmarks.export_benchmark --sizes 10 1000 --save-baseline
+    python -m benchmarks.export_benchmark --generators sql excel-stream --sizes 100000
+"""
+from typing import Dict, List, Optional
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is not reported there
+    resource = None
+
+from benchmarks.corpus import build_results
+
+DEFAULT_SIZES = [10, 1000, 10000, 100000]
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Wall times below this are timer noise and never flagged
+MIN_FLAGGED_WALL_TIME = 0.05
+
+# Generator, method and the largest size it is run at by default. The
+# in-memory PDF and Word generators take minutes beyond a few thousand
+# statements; the streaming variants are what large exports use.
+TARGETS = {
+    'pdf': ('PDFGenerator', 'generate', 1000),
+    'pdf-stream': ('PDFGenerator', 'generate_stream', None),
+    'word': ('WordGenerator', 'generate', 1000),
+    'word-stream': ('WordGenerator', 'generate_stream', None),
+    'excel': ('ExcelGenerator', 'generate', 10000),
+    'excel-stream': ('ExcelGenerator', 'generate_stream', None),
+    'sql': ('SQLGenerator', 'generate_stream', None),
+    'ndjson': ('RecordGenerator', 'generate_stream', None),
+}
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _run_target(target: str, size: int, seed: int, queue):
+    """Run one generator on one corpus size; executed in a fresh process."""
+    import generators
+
+    class_name, method, _ = TARGETS[target]
+
+    try:
+        results = build_results(size, seed=seed)
+        rss_before = _peak_rss_mb()
+
+        generator = getattr(generators, class_name)()
+        started = time.perf_counter()
+
+        output = getattr(generator, method)(results, 'MySQL', 'Oracle')
+        if method == 'generate':
+            output_size = len(output.getvalue())
+        else:
+            # Count streamed bytes without keeping them
+            output_size = sum(len(chunk) for chunk in output)
+
+        wall_time = time.perf_counter() - started
+        peak_rss = _peak_rss_mb()
+
+        queue.put({
+            'wall_time_s': round(wall_time, 4),
+            'peak_rss_mb': round(peak_rss, 1) if peak_rss is not None else None,
+            'rss_growth_mb': round(peak_rss - rss_before, 1) if peak_rss is not None else None,
+            'output_bytes': output_size
+        })
+    except Exception as e:
+        queue.put({'error': f"{type(e).__name__}: {e}"})
+
+
+def run_benchmark(
+    targets: List[str],
+    sizes: List[int],
+    seed: int = 42,
+    include_slow: bool = False
+) -> Dict[str, Dict]:
+    """
+    Run every target on every corpus size.
+
+    Args:
+        targets: Keys of TARGETS
+        sizes: Corpus sizes (number of results)
+        seed: Corpus seed
+        include_slow: Also run targets above their default size limit
+
+    Returns:
+        Measurements keyed by 'target:size'
+    """
+    # A spawned process starts clean, so peak RSS is the generator's own
+    context = multiprocessing.get_context('spawn')
+    measurements = {}
+
+    for size in sizes:
+        for target in targets:
+            max_size = TARGETS[target][2]
+            if max_size is not None and size > max_size and not include_slow:
+                continue
+
+            queue = context.Queue()
+            process = context.Process(target=_run_target, args=(target, size, seed, queue))
+            process.start()
+            measurement = queue.get()
+            process.join()
+
+            key = f"{target}:{size}"
+            measurements[key] = measurement
+            print(_format_row(key, measurement), flush=True)
+
+    return measurements
+
+
+def compare_to_baseline(
+    measurements: Dict[str, Dict],
+    baseline: Dict[str, Dict],
+    tolerance: float
+) -> List[str]:
+    """
+    Find measurements that got worse than the baseline.
+
+    Args:
+        measurements: Output of run_benchmark
+        baseline: Earlier output of run_benchmark
+        tolerance: Allowed relative increase, e.g. 0.25 for +25%
+
+    Returns:
+        One message per regression
+    """
+    regressions = []
+
+    for key, current in measurements.items():
+        previous = baseline.get(key)
+        if not previous or 'error' in current or 'error' in previous:
+            continue
+
+        for metric in ('wall_time_s', 'peak_rss_mb', 'output_bytes'):
+            before, after = previous.get(metric), current.get(metric)
+            if not before or after is None:
+                continue
+            if metric == 'wall_time_s' and after < MIN_FLAGGED_WALL_TIME:
+                continue
+            if after > before * (1 + tolerance):
+                regressions.append(
+                    f"{key} {metric}: {before} -> {after} (+{(after / before - 1) * 100:.0f}%)"
+                )
+
+    return regressions
+
+
+def _format_row(key: str, measurement: Dict) -> str:
+    """Format one measurement as a table row."""
+    if 'error' in measurement:
+        return f"{key:<24} ERROR {measurement['error']}"
+
+    if measurement['peak_rss_mb'] is None:
+        memory = f"{'n/a':>17} {'n/a':>12}"
+    else:
+        memory = (f"{measurement['peak_rss_mb']:>9.1f} MB peak "
+                  f"{measurement['rss_growth_mb']:>+9.1f} MB")
+
+    return (
+        f"{key:<24} {measurement['wall_time_s']:>9.3f}s {memory} "
+        f"{measurement['output_bytes'] / 1024:>12.1f} KB"
+    )
+
+
+def _load_baseline(path: str) -> Optional[Dict]:
+    """Read a stored baseline, if there is one."""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the export generators.")
+    parser.add_argument('--generators', nargs='+', choices=sorted(TARGETS),
+                        default=list(TARGETS), help="Targets to run (default: all)")
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES,
+                        help="Corpus sizes (default: 10 1000 10000 100000)")
+    parser.add_argument('--seed', type=int, default=42, help="Corpus seed")
+    parser.add_argument('--include-slow', action='store_true',
+                        help="Run the in-memory generators at every size too")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help="Baseline file to compare against or save to")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Store this run as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed relative increase before flagging (default: 0.25)")
+    parser.add_argument('--output', help="Also write the measurements to this JSON file")
+    args = parser.parse_args(argv)
+
+    print(f"{'target:size':<24} {'wall':>10} {'peak RSS':>17} {'growth':>12} {'output':>15}")
+    measurements = run_benchmark(args.generators, args.sizes, args.seed, args.include_slow)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(measurements, f, indent=2)
+
+    if args.save_baseline:
+        # Merge, so a partial run only replaces the entries it measured
+        baseline = _load_baseline(args.baseline) or {}
+        baseline.update(measurements)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    baseline = _load_baseline(args.baseline)
+    if baseline is None:
+        print("\nNo baseline found; run with --save-baseline to create one.")
+        return 0
+
+    regressions = compare_to_baseline(measurements, baseline, args.tolerance)
+    if regressions:
+        print(f"\nRegressions (more than +{args.tolerance * 100:.0f}% over baseline):")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+
+    print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,3 +1,6 @@
+import importlib.util
+import os
+
 # Supported SQL dialects
 SUPPORTED_DIALECTS = [
     "MySQL",
@@ -19,11 +22,125 @@ INPUT_FORMATS = {
     "sql": ["text/plain", "application/sql"],
     "xlsx": ["application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"],
     "xls": ["application/vnd.ms-excel"],
-    "txt": ["text/plain"]
+    "txt": ["text/plain"],
+    "zip": ["application/zip", "application/x-zip-compressed"],
+    "tar.gz": ["application/gzip", "application/x-gzip", "application/x-tar"],
+    "sql.gz": ["application/gzip", "application/x-gzip"],
+    "ndjson": ["application/x-ndjson", "application/jsonl"],
+    "jsonl": ["application/x-ndjson", "application/jsonl"],
+    "csv": ["text/csv"],
+    "parquet": ["application/vnd.apache.parquet", "application/octet-stream"]
 }
 
-# Supported output formats
-OUTPUT_FORMATS = ["PDF", "Word Document", "Excel", "SQL File"]
+# Parquet export needs the optional pyarrow package
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+# Supported output formats; Parquet only when pyarrow is installed
+OUTPUT_FORMATS = ["PDF", "Word Document", "Excel", "SQL File", "NDJSON"] + (
+    ["Parquet"] if PARQUET_AVAILABLE else []
+)
+
+# Export statement order: as converted, or reordered into a valid execution order
+EXPORT_ORDERS = ["script", "dependency"]
+
+# Exports with at least this many results use the streaming generators
+LARGE_EXPORT_THRESHOLD = int(os.getenv("LARGE_EXPORT_THRESHOLD", "5000"))
+
+# Parsed file cache (content hash -> extracted statements)
+PARSE_CACHE_DIR = os.getenv(
+    "PARSE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "parse")
+)
+PARSE_CACHE_MEMORY_ENTRIES = 128
+PARSE_CACHE_MEMORY_BYTES = int(os.getenv("PARSE_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+PARSE_CACHE_MAX_BYTES = int(os.getenv("PARSE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Largest decompressed archive member that is read and parsed
+ARCHIVE_MEMBER_MAX_BYTES = int(os.getenv("ARCHIVE_MEMBER_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Statement facts (type, tables, object) shared by the converter, utils and generators
+STATEMENT_CACHE_ENTRIES = int(os.getenv("STATEMENT_CACHE_ENTRIES", "20000"))
+
+# Generated export cache (results + dialects + format -> file), LRU by total size
+EXPORT_CACHE_DIR = os.getenv(
+    "EXPORT_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "export")
+)
+EXPORT_CACHE_MAX_BYTES = int(os.getenv("EXPORT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Statements converted concurrently per request, in dependency order
+CONVERT_MAX_WORKERS = int(os.getenv("CONVERT_MAX_WORKERS", "4"))
+
+# Pre-flight check: fragments scoring below this are not sent to the model
+PREFLIGHT_MIN_CONFIDENCE = float(os.getenv("PREFLIGHT_MIN_CONFIDENCE", "0.5"))
+
+# LLM providers: OpenAI-compatible chat completion endpoints. "local" points
+# at a self-hosted server (llama.cpp server, vLLM, ...) on this host or LAN.
+LLM_PROVIDERS = {
+    "openrouter": {
+        "url": "https://openrouter.ai/api/v1/chat/completions",
+        "api_key_env": "GEMINI_API_KEY",
+        "requires_key": True,
+        # FREE models to try in order (for fallback)
+        "models": [
+            "google/gemini-2.0-flash-exp:free",
+            "meta-llama/llama-3.3-70b-instruct:free",
+            "mistralai/mistral-small-3.1-24b-instruct:free",
+            "google/gemma-3-27b-it:free",
+            "microsoft/phi-3-medium-128k-instruct:free",
+            "openai/gpt-4o-mini"
+        ],
+        "max_concurrency": int(os.getenv("OPENROUTER_MAX_CONCURRENCY", "8")),
+        "timeout": int(os.getenv("OPENROUTER_TIMEOUT", "60")),
+        # Ask OpenRouter to report the cost of each call
+        "usage_accounting": True,
+        "headers": {
+            "HTTP-Referer": "http://localhost:8501",
+            "X-Title": "SQL Dialect Converter"
+        }
+    },
+    "local": {
+        "url": os.getenv("LOCAL_LLM_URL", "http://localhost:8080/v1/chat/completions"),
+        "api_key_env": "LOCAL_LLM_API_KEY",
+        "requires_key": False,
+        "models": [m.strip() for m in os.getenv("LOCAL_LLM_MODELS", "local").split(",") if m.strip()],
+        "max_concurrency": int(os.getenv("LOCAL_LLM_MAX_CONCURRENCY", "2")),
+        "timeout": int(os.getenv("LOCAL_LLM_TIMEOUT", "300")),
+        "free": True
+    }
+}
+
+# USD per million (prompt, completion) tokens, for calls whose provider does
+# not report a cost; models ending in ":free" cost nothing
+MODEL_PRICES = {
+    "openai/gpt-4o-mini": (0.15, 0.60)
+}
+
+# Token and cost budgets (USD) per conversion job and per API key; 0 = unlimited
+JOB_TOKEN_BUDGET = int(os.getenv("JOB_TOKEN_BUDGET", "0"))
+JOB_COST_BUDGET = float(os.getenv("JOB_COST_BUDGET", "0"))
+KEY_TOKEN_BUDGET = int(os.getenv("KEY_TOKEN_BUDGET", "0"))
+KEY_COST_BUDGET = float(os.getenv("KEY_COST_BUDGET", "0"))
+
+# Fair-share scheduling of model calls across API keys: calls in flight in
+# total and per key, and the largest job (in statements) that is served as
+# interactive, ahead of bulk jobs
+SCHEDULER_MAX_CONCURRENCY = int(os.getenv("SCHEDULER_MAX_CONCURRENCY", "8"))
+SCHEDULER_PER_KEY_CONCURRENCY = int(os.getenv("SCHEDULER_PER_KEY_CONCURRENCY", "4"))
+INTERACTIVE_MAX_STATEMENTS = int(os.getenv("INTERACTIVE_MAX_STATEMENTS", "5"))
+
+# Admission control for /api/convert and /api/parse-file: statements and
+# bytes in flight, requests allowed to wait for room, and how long they may
+# wait before getting a 503
+ADMISSION_MAX_STATEMENTS = int(os.getenv("ADMISSION_MAX_STATEMENTS", "50000"))
+ADMISSION_MAX_BYTES = int(os.getenv("ADMISSION_MAX_BYTES", str(256 * 1024 * 1024)))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "16"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "30"))
+
+# Providers tried in order when a request does not choose, e.g. "local,openrouter"
+LLM_PROVIDER_CHAIN = [
+    name.strip() for name in os.getenv("LLM_PROVIDER_CHAIN", "openrouter").split(",") if name.strip()
+]
 
 # AI Model configuration
 GEMINI_MODEL = "gemini-1.5-flash"
@@ -1,3 +1,8 @@
 from .ai_converter import AIConverter
+from .providers import LLMProvider, UnknownProviderError, build_providers
+from .result_store import ConversionRecord, ResultStore
 
-__all__ = ["AIConverter"]
+__all__ = [
+    "AIConverter", "LLMProvider", "UnknownProviderError", "build_providers",
+    "ConversionRecord", "ResultStore"
+]
@@ -1,48 +1,103 @@
-import requests
-from typing import List, Dict, Tuple, Optional
-import os
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import nullcontext
+from typing import Callable, List, Dict, Tuple, Optional, Union
+import threading
+import time
 from dotenv import load_dotenv
 
+from utils.statement import Statement
+from utils.dependency_graph import DependencyGraph
+from utils.statement_chunker import StatementChunker, BODY_MARKER, estimate_tokens
+from converters.result_store import ConversionRecord, ResultStore
+from converters.providers import LLMProvider, build_providers
+from converters.usage import BudgetExceededError, UsageMeter
+from converters.scheduler import ConversionCancelled, ConversionScheduler
+
 # Load environment variables
 load_dotenv()
 
-# OpenRouter API endpoint
-OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+# finish_reason values meaning the model hit the output limit
+TRUNCATED_FINISH_REASONS = ("length", "max_tokens")
+
+
+class TruncatedResponseError(Exception):
+    """The model stopped at the output token limit; its SQL is incomplete."""
+    
+    def __init__(self, message: str, usage: Optional[Dict] = None):
+        super().__init__(message)
+        self.usage = usage
+
+
+def _add_usage(*usages: Optional[Dict]) -> Dict:
+    """Sum usage dicts; a field stays None only if it is unknown everywhere."""
+    total = {"prompt_tokens": None, "completion_tokens": None, "cost": None}
+    for usage in usages:
+        for field, value in (usage or {}).items():
+            if value is not None:
+                total[field] = (total[field] or 0) + value
+    return total
 
 
 class AIConverter:
     """
-    AI-powered SQL dialect converter using OpenRouter API.
+    AI-powered SQL dialect converter using OpenAI-compatible LLM providers
+    (OpenRouter, or a self-hosted server) with fallback between them.
     Converts SQL statements between different database dialects.
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    # Output token limit per model call
+    MAX_OUTPUT_TOKENS = 2000
+    
+    # Output tokens reserved for the notes section of a response
+    NOTES_TOKENS = 300
+    
+    # Converted SQL is usually somewhat longer than the source
+    OUTPUT_EXPANSION = 1.3
+    
+    # Parts of one chunked statement converted at once
+    CHUNK_WORKERS = 4
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        providers: Optional[List[Union[str, LLMProvider]]] = None,
+        meter: Optional[UsageMeter] = None,
+        scheduler: Optional[ConversionScheduler] = None,
+        scheduler_key: str = "no-key",
+        priority: str = 'bulk',
+        cancelled: Optional[threading.Event] = None
+    ):
         """
         Initialize the AI converter.
         
         Args:
             api_key: OpenRouter API key. If not provided, reads from GEMINI_API_KEY env var.
+            providers: Provider names (keys of LLM_PROVIDERS) or LLMProvider
+                objects, tried in order. Defaults to LLM_PROVIDER_CHAIN.
+            meter: Usage meter every model call is charged to; calls that
+                would exceed its budget are not sent
+            scheduler: Shared scheduler every model call takes a slot from
+            scheduler_key: Key id the calls are queued under (fair share)
+            priority: Scheduler priority class, 'interactive' or 'bulk'
+            cancelled: Event that stops model calls not yet sent, e.g. when
+                a newer edit made the conversion obsolete
         """
-        self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        if providers and all(isinstance(p, LLMProvider) for p in providers):
+            self.providers = list(providers)
+        else:
+            self.providers = build_providers(providers, api_key)
         
-        if not self.api_key:
-            raise ValueError(
-                "API key is required. Set GEMINI_API_KEY environment variable "
-                "or pass api_key parameter."
-            )
+        self.api_key = next((p.api_key for p in self.providers if p.api_key), None)
+        self.meter = meter
+        self.scheduler = scheduler
+        self.scheduler_key = scheduler_key
+        self.priority = priority
+        self.cancelled = cancelled
         
-        # Remove quotes if present (common .env issue)
-        self.api_key = self.api_key.strip().strip("'\"")
-        
-        # List of FREE models to try in order (for fallback)
-        self.models_to_try = [
-            "google/gemini-2.0-flash-exp:free",
-            "meta-llama/llama-3.3-70b-instruct:free", 
-            "mistralai/mistral-small-3.1-24b-instruct:free",
-            "google/gemma-3-27b-it:free",
-            "microsoft/phi-3-medium-128k-instruct:free",
-            "openai/gpt-4o-mini"
-        ]
+        # Time this converter's calls spent queued in the scheduler
+        self.queue_wait_ms = 0.0
+        self.queue_max_wait_ms = 0.0
+        self._queue_lock = threading.Lock()
         
         # Dialect-specific information for better conversions
         self.dialect_info = {
@@ -127,138 +182,387 @@ class AIConverter:
     
     def convert(
         self, 
-        statements: List[str], 
+        statements: List[Union[str, Statement]], 
         source_dialect: str, 
         target_dialect: str,
-        progress_callback=None
-    ) -> List[Dict]:
+        progress_callback=None,
+        statement_ids: Optional[List[str]] = None,
+        max_workers: int = 1,
+        skip: Optional[Dict[int, str]] = None
+    ) -> ResultStore:
         """
         Convert SQL statements from source dialect to target dialect.
         
         Args:
-            statements: List of SQL statements to convert
+            statements: List of SQL statements (text or parsed Statement objects)
+                to convert. Repeated statements are only sent to the model once.
             source_dialect: Source database dialect
             target_dialect: Target database dialect
             progress_callback: Optional callback function(current, total) for progress updates
+            statement_ids: Optional caller-supplied IDs, one per statement
+            max_workers: Statements converted at once. Above 1, statements are
+                dispatched in dependency order (see DependencyGraph), so a
+                statement is only sent once the ones it depends on are done.
+            skip: Statements not to send, by index, with the note to record
+                (e.g. rejected by PreflightValidator). They get status 'skipped'.
             
         Returns:
-            List of dicts with 'original', 'converted', 'status', and 'notes' keys
+            ResultStore of ConversionRecords with 'original', 'converted',
+            'status', 'notes', 'model' (the model that answered) and
+            'duration_ms' fields, plus 'id' when statement_ids are given,
+            in the order of the input statements
         """
-        results = []
+        statements = [s if isinstance(s, Statement) else Statement(s) for s in statements]
         total = len(statements)
+        ids = statement_ids if statement_ids is not None else [None] * total
+        records: List[Optional[ConversionRecord]] = [None] * total
+        completed = 0
+        skip = skip or {}
         
+        # First occurrence of each text; repeats reuse its successful conversion
+        first_index: Dict[str, int] = {}
         for i, statement in enumerate(statements):
+            first_index.setdefault(statement.text, i)
+        
+        def convert_one(i: int) -> ConversionRecord:
+            statement = statements[i].text
+            started = time.perf_counter()
             try:
-                converted, notes = self._convert_single(statement, source_dialect, target_dialect)
-                results.append({
-                    "original": statement,
-                    "converted": converted,
-                    "status": "success",
-                    "notes": notes
-                })
+                converted, notes, model, usage = self._convert_single(
+                    statement, source_dialect, target_dialect
+                )
+                record = ConversionRecord(statement, converted, "success", notes, model,
+                                          id=ids[i], **usage)
+            except (BudgetExceededError, ConversionCancelled) as e:
+                record = ConversionRecord(statement, None, "skipped", f"Not converted: {e}", id=ids[i])
             except Exception as e:
-                results.append({
-                    "original": statement,
-                    "converted": None,
-                    "status": "error",
-                    "notes": str(e)
-                })
-            
+                record = ConversionRecord(statement, None, "error", str(e), id=ids[i])
+            record.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            return record
+        
+        def finish(i: int, record: ConversionRecord):
+            nonlocal completed
+            records[i] = record
+            completed += 1
             if progress_callback:
-                progress_callback(i + 1, total)
+                progress_callback(completed, total)
+        
+        for i, note in skip.items():
+            finish(i, ConversionRecord(statements[i].text, None, "skipped", note,
+                                       duration_ms=0.0, id=ids[i]))
+        
+        unique = [
+            i for i, statement in enumerate(statements)
+            if first_index[statement.text] == i and i not in skip
+        ]
+        
+        if max_workers > 1 and len(unique) > 1:
+            self._convert_in_dependency_order(
+                [statements[i] for i in unique],
+                lambda n: convert_one(unique[n]),
+                lambda n, record: finish(unique[n], record),
+                max_workers
+            )
+        else:
+            for i in unique:
+                finish(i, convert_one(i))
+        
+        for i, statement in enumerate(statements):
+            if records[i] is not None:
+                continue
+            first = records[first_index[statement.text]]
+            if first.status == "skipped":
+                finish(i, first.copy(id=ids[i]))
+            elif first.status == "success":
+                finish(i, first.copy(id=ids[i], duration_ms=0.0, prompt_tokens=0,
+                                     completion_tokens=0, cost=0.0))
+            else:
+                # Failures are retried rather than copied
+                finish(i, convert_one(i))
         
-        return results
+        return ResultStore(records)
+    
+    def _convert_in_dependency_order(
+        self,
+        statements: List[Statement],
+        convert_one: Callable[[int], ConversionRecord],
+        finish: Callable[[int, ConversionRecord], None],
+        max_workers: int
+    ):
+        """
+        Convert statements concurrently, each once its dependencies are done.
+        
+        Independent branches of the dependency graph run in parallel; finish
+        is called on this thread as conversions complete.
+        """
+        graph = DependencyGraph(statements)
+        waiting = [len(deps) for deps in graph.dependencies]
+        # Script order among ready statements; cycles fall back to it too
+        order = graph.order()
+        position = {i: n for n, i in enumerate(order)}
+        ready = sorted((i for i, count in enumerate(waiting) if count == 0), key=position.get)
+        
+        remaining = len(statements)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            running = {}
+            
+            while remaining:
+                while ready and len(running) < max_workers:
+                    i = ready.pop(0)
+                    running[executor.submit(convert_one, i)] = i
+                
+                if not running:
+                    # Only possible inside a dependency cycle: release the next in order
+                    ready.append(next(i for i in order if waiting[i] > 0))
+                    waiting[ready[-1]] = 0
+                    continue
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = running.pop(future)
+                    waiting[i] = -1
+                    remaining -= 1
+                    finish(i, future.result())
+                    
+                    for j in graph.dependents[i]:
+                        if waiting[j] > 0:
+                            waiting[j] -= 1
+                            if waiting[j] == 0:
+                                ready.append(j)
+                
+                ready.sort(key=position.get)
     
     def _convert_single(
         self, 
         statement: str, 
         source_dialect: str, 
         target_dialect: str
-    ) -> Tuple[str, str]:
+    ) -> Tuple[str, str, str, Dict]:
         """
         Convert a single SQL statement.
         
+        Statements whose converted output would not fit MAX_OUTPUT_TOKENS,
+        or whose conversion came back truncated, are converted in parts
+        (see _convert_chunked) when they have a body that can be split.
+        
         Args:
             statement: SQL statement to convert
             source_dialect: Source dialect
             target_dialect: Target dialect
             
         Returns:
-            Tuple of (converted_sql, conversion_notes)
+            Tuple of (converted_sql, conversion_notes, model_used, usage), where
+            usage has 'prompt_tokens', 'completion_tokens' and 'cost'
         """
+        if self._estimate_output_tokens(statement) > self.MAX_OUTPUT_TOKENS:
+            chunks = self._chunker().split(statement)
+            if chunks is not None:
+                return self._convert_chunked(chunks, source_dialect, target_dialect)
+        
         prompt = self._build_conversion_prompt(statement, source_dialect, target_dialect)
         
-        # Try models in sequence until one works
+        try:
+            return self._convert_prompt(prompt)
+        except TruncatedResponseError as e:
+            chunks = self._chunker().split(statement)
+            if chunks is None:
+                raise Exception(f"{e}; the statement has no body that can be split into parts")
+            converted, notes, model, usage = self._convert_chunked(chunks, source_dialect, target_dialect)
+            # The truncated attempt was paid for too
+            return converted, notes, model, _add_usage(e.usage, usage)
+    
+    def _convert_prompt(self, prompt: str) -> Tuple[str, str, str, Dict]:
+        """
+        Send a prompt to each provider's models in turn until one answers.
+        
+        A truncated answer or an exhausted budget is raised right away: the
+        other models have the same output limit and draw on the same budget.
+        So is a cancellation.
+        
+        Returns:
+            Tuple of (converted_sql, conversion_notes, model_used, usage)
+        """
+        # Try providers and their models in sequence until one works
         last_error = None
         
-        for model in self.models_to_try:
-            try:
-                return self._call_model(model, prompt)
-            except Exception as e:
-                print(f"Model {model} failed: {e}")
-                last_error = e
-                continue
+        for provider in self.providers:
+            for model in provider.models:
+                try:
+                    converted, notes, usage = self._call_model(provider, model, prompt)
+                    return converted, notes, model, usage
+                except (TruncatedResponseError, BudgetExceededError, ConversionCancelled):
+                    raise
+                except Exception as e:
+                    print(f"Model {model} ({provider.name}) failed: {e}")
+                    last_error = e
+                    continue
         
         # If all failed
         raise Exception(f"All AI models failed. Last error: {last_error}")
-
-    def _call_model(self, model: str, prompt: str) -> Tuple[str, str]:
-        """Helper to call a specific model."""
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "http://localhost:8501",
-            "X-Title": "SQL Dialect Converter"
-        }
+    
+    def _convert_chunked(
+        self,
+        chunks: Dict,
+        source_dialect: str,
+        target_dialect: str
+    ) -> Tuple[str, str, str, Dict]:
+        """
+        Convert a split statement part by part and stitch the result.
         
-        payload = {
-            "model": model,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            "temperature": 0.3,
-            "max_tokens": 2000
-        }
+        The skeleton (header, declarations and closing END around
+        BODY_MARKER) and the body parts are converted in parallel; each
+        part gets the source skeleton as context. The converted parts
+        replace the marker in the converted skeleton.
         
-        # Debug: Print API key (masked) and request details
-        masked_key = self.api_key[:10] + "..." + self.api_key[-10:] if len(self.api_key) > 20 else "***"
-        print(f"[DEBUG] Using API key: {masked_key}")
-        print(f"[DEBUG] API key length: {len(self.api_key)}")
-        print(f"[DEBUG] Model: {model}")
-        print(f"[DEBUG] Full Authorization header: {headers['Authorization'][:20]}...")
+        Args:
+            chunks: Output of StatementChunker.split
+            source_dialect: Source dialect
+            target_dialect: Target dialect
+            
+        Returns:
+            Tuple of (converted_sql, conversion_notes, model_used, usage)
+        """
+        skeleton, parts = chunks['skeleton'], chunks['parts']
+        
+        prompts = [self._build_conversion_prompt(
+            skeleton, source_dialect, target_dialect,
+            fragment_note=f"The line `{BODY_MARKER}` stands for the body, which is "
+                          f"converted separately. Copy that line unchanged."
+        )]
+        for n, part in enumerate(parts, 1):
+            prompts.append(self._build_conversion_prompt(
+                part, source_dialect, target_dialect,
+                context=skeleton,
+                fragment_note=f"This is part {n} of {len(parts)} of the body of the routine "
+                              f"shown as context. Convert only these statements."
+            ))
         
-        response = requests.post(OPENROUTER_API_URL, headers=headers, json=payload, timeout=60)
+        try:
+            with ThreadPoolExecutor(max_workers=min(len(prompts), self.CHUNK_WORKERS)) as executor:
+                answers = list(executor.map(self._convert_prompt, prompts))
+        except TruncatedResponseError as e:
+            raise Exception(f"{e} (in a part of a statement split into {len(parts)} parts)")
         
-        if response.status_code != 200:
-            error_data = response.json() if response.text else {}
-            error_msg = error_data.get("error", {}).get("message", response.text)
-            print(f"[DEBUG] Full error response: {response.text}")
-            raise Exception(f"API Error ({response.status_code}): {error_msg}")
+        converted_skeleton = answers[0][0]
+        if BODY_MARKER not in converted_skeleton:
+            raise Exception("Chunked conversion failed: the body marker was not kept in the routine header")
         
-        response_data = response.json()
+        body = "\n".join(converted.strip() for converted, _, _, _ in answers[1:])
+        converted = converted_skeleton.replace(BODY_MARKER, body, 1)
         
-        if "choices" not in response_data or not response_data["choices"]:
-             raise Exception("Invalid API response: No choices returned")
-             
-        response_text = response_data["choices"][0]["message"]["content"]
+        notes = [f"Converted in {len(prompts)} parts to fit the output limit."]
+        for _, part_notes, _, _ in answers:
+            if part_notes not in notes:
+                notes.append(part_notes)
+        models = list(dict.fromkeys(model for _, _, model, _ in answers))
+        usage = _add_usage(*(usage for _, _, _, usage in answers))
+        
+        return converted, "\n".join(notes), ", ".join(models), usage
+    
+    def _chunker(self) -> StatementChunker:
+        """Chunker sized so each converted part fits the output limit."""
+        part_tokens = (self.MAX_OUTPUT_TOKENS - self.NOTES_TOKENS) / self.OUTPUT_EXPANSION
+        return StatementChunker(max_part_tokens=int(part_tokens))
+    
+    def _estimate_output_tokens(self, statement: str) -> int:
+        """Expected output tokens of converting a statement, notes included."""
+        return int(estimate_tokens(statement) * self.OUTPUT_EXPANSION) + self.NOTES_TOKENS
+
+    def _call_model(self, provider: LLMProvider, model: str, prompt: str) -> Tuple[str, str, Dict]:
+        """
+        Helper to call a specific model of a provider.
+        
+        With a scheduler, the call first waits for a fair-share slot. It is
+        then charged to the meter, if any: the prompt plus the full output
+        limit, and its cost at MODEL_PRICES, are reserved up front, so a
+        call that could exceed the budget is never sent, then settled with
+        the reported usage. Once the
+        converter is cancelled, no further call is sent; one already in
+        flight runs to completion.
+        
+        Returns:
+            Tuple of (converted_sql, conversion_notes, usage)
+        """
+        if self.cancelled is not None and self.cancelled.is_set():
+            raise ConversionCancelled("Cancelled before the model call was sent")
+        
+        if self.scheduler is not None:
+            slot = self.scheduler.slot(self.scheduler_key, self.priority, self.cancelled)
+        else:
+            slot = nullcontext(0.0)
+        
+        with slot as waited:
+            self._record_wait(waited)
+            
+            prompt_tokens = estimate_tokens(prompt)
+            reserved = prompt_tokens + self.MAX_OUTPUT_TOKENS
+            # Models without a known price cannot be held to the cost budget up front
+            reserved_cost = provider.estimate_cost(model, prompt_tokens, self.MAX_OUTPUT_TOKENS) or 0.0
+            if self.meter is not None:
+                self.meter.reserve(reserved, reserved_cost)
+            
+            usage = None
+            try:
+                answer = provider.complete(model, prompt, self.MAX_OUTPUT_TOKENS)
+                usage = answer["usage"]
+            finally:
+                if self.meter is not None:
+                    self.meter.settle(reserved, usage, reserved_cost)
+        
+        # A cut-off answer would parse into partial SQL; never keep it
+        if answer["finish_reason"] in TRUNCATED_FINISH_REASONS:
+            raise TruncatedResponseError(
+                f"Output truncated by {model} at {self.MAX_OUTPUT_TOKENS} tokens "
+                f"(finish_reason={answer['finish_reason']})",
+                usage
+            )
         
         # Parse the response
-        return self._parse_response(response_text)
+        converted, notes = self._parse_response(answer["content"])
+        return converted, notes, usage
+    
+    def _record_wait(self, waited: float):
+        """Add one call's scheduler wait (ms) to this converter's totals."""
+        with self._queue_lock:
+            self.queue_wait_ms += waited
+            self.queue_max_wait_ms = max(self.queue_max_wait_ms, waited)
     
     def _build_conversion_prompt(
         self, 
         statement: str, 
         source_dialect: str, 
-        target_dialect: str
+        target_dialect: str,
+        context: Optional[str] = None,
+        fragment_note: Optional[str] = None
     ) -> str:
-        """Build the prompt for SQL conversion."""
+        """
+        Build the prompt for SQL conversion.
+        
+        Args:
+            statement: SQL to convert
+            source_dialect: Source dialect
+            target_dialect: Target dialect
+            context: Surrounding source SQL shown for reference only
+            fragment_note: Extra instruction when converting part of a statement
+        """
         
         source_info = self.dialect_info.get(source_dialect, {})
         target_info = self.dialect_info.get(target_dialect, {})
         
+        fragment = ""
+        if context:
+            fragment += f"""
+CONTEXT ({source_dialect}, for reference only - do not convert or repeat it):
+```sql
+{context}
+```
+"""
+        if fragment_note:
+            fragment += f"""
+NOTE: {fragment_note}
+"""
+        
         prompt = f"""You are an expert SQL developer specializing in database migrations and SQL dialect conversions.
 
 TASK: Convert the following SQL statement from {source_dialect} to {target_dialect}.
@@ -267,7 +571,7 @@ SOURCE SQL ({source_dialect}):
 ```sql
 {statement}
 ```
-
+{fragment}
 SOURCE DIALECT FEATURES ({source_dialect}):
 - String concatenation: {source_info.get('string_concat', 'N/A')}
 - Date functions: {source_info.get('date_functions', 'N/A')}
@@ -346,20 +650,11 @@ IMPORTANT: Only output valid {target_dialect} SQL. Do not include any explanator
         return converted_sql, notes
     
     def validate_api_key(self) -> bool:
-        """Validate that the API key is working."""
-        try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "model": self.models_to_try[0],
-                "messages": [{"role": "user", "content": "Say OK"}],
-                "max_tokens": 10
-            }
-            
-            response = requests.post(OPENROUTER_API_URL, headers=headers, json=payload, timeout=10)
-            return response.status_code == 200
-        except Exception:
-            return False
+        """
+        Validate that the API key is working.
+        
+        Only providers that take the key are asked; keyless ones (a local
+        server) would accept any key. The key is valid if one of them
+        accepts it, and invalid if none is in the chain.
+        """
+        return any(provider.validate() for provider in self.providers if provider.requires_key)
@@ -0,0 +1,212 @@
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import threading
+
+from utils.sql_utils import SQLUtils
+from utils.admission import AdmissionController, AdmissionRejected
+from converters.ai_converter import AIConverter
+from converters.providers import LLMProvider
+from converters.scheduler import ConversionScheduler
+from converters.usage import UsageMeter
+
+
+class LiveConversionSession:
+    """
+    Incremental conversion for one live editor connection.
+
+    Each update carries the whole editor text. It is split with
+    SQLUtils.split_statements, and only statements not converted or in
+    progress yet are sent to the model. Conversions of statements that an
+    update removed or edited are cancelled: calls not yet sent (queued in
+    the scheduler, fallback models, remaining parts) are dropped, and the
+    answer of a call already in flight is discarded. Results are pushed as
+    each statement finishes, with the statement's positions in the latest
+    text.
+
+    Messages sent:
+        {"type": "statements", "version", "statements", "results", "pending"}
+            after each update; results holds cached conversions (or None)
+        {"type": "result", "version", "indexes", "result"}
+            for each finished statement
+        {"type": "done", "version", "cancelled", "usage"}
+            once nothing is pending
+    """
+
+    # Successful conversions kept for reuse, by statement text
+    MAX_CACHED = 512
+
+    def __init__(
+        self,
+        providers: List[LLMProvider],
+        source_dialect: str,
+        target_dialect: str,
+        send: Callable[[Dict], Awaitable[None]],
+        meter: Optional[UsageMeter] = None,
+        scheduler: Optional[ConversionScheduler] = None,
+        scheduler_key: str = "no-key",
+        admission: Optional[AdmissionController] = None
+    ):
+        """
+        Initialize a session.
+
+        Args:
+            providers: Provider chain every conversion uses
+            source_dialect: Source dialect
+            target_dialect: Target dialect
+            send: Coroutine function that pushes a message to the client
+            meter: Usage meter of the connection
+            scheduler: Shared model call scheduler (calls are interactive)
+            scheduler_key: Key id the calls are queued under
+            admission: Admission controller each conversion must pass
+        """
+        self.providers = providers
+        self.source_dialect = source_dialect
+        self.target_dialect = target_dialect
+        self.meter = meter
+        self.scheduler = scheduler
+        self.scheduler_key = scheduler_key
+        self.admission = admission
+
+        self.version = 0
+        self.statements: List[str] = []
+        self.cancelled_count = 0
+
+        self._send = send
+        self._send_lock = asyncio.Lock()
+        self._results: "OrderedDict[str, Dict]" = OrderedDict()
+        self._running: Dict[str, Tuple[asyncio.Task, threading.Event]] = {}
+
+    async def update(self, sql_text: str, version: Optional[int] = None):
+        """
+        Apply a new editor text.
+
+        Args:
+            sql_text: Full editor text
+            version: Client's version number of the text (default: next)
+        """
+        self.version = version if version is not None else self.version + 1
+        statements = await asyncio.get_running_loop().run_in_executor(
+            None, SQLUtils.split_statements, sql_text
+        )
+        self.statements = statements
+        wanted = set(statements)
+
+        # Conversions this text no longer needs are stale
+        for text in [text for text in self._running if text not in wanted]:
+            self._cancel(text)
+        if self.scheduler is not None:
+            self.scheduler.wake()
+
+        results = []
+        pending = []
+        for i, text in enumerate(statements):
+            if text in self._results:
+                self._results.move_to_end(text)
+                results.append(self._results[text])
+                continue
+
+            results.append(None)
+            pending.append(i)
+            if text not in self._running:
+                cancelled = threading.Event()
+                task = asyncio.create_task(self._convert(text, cancelled))
+                self._running[text] = (task, cancelled)
+
+        await self._push({
+            "type": "statements",
+            "version": self.version,
+            "statements": statements,
+            "results": results,
+            "pending": pending
+        })
+
+        if not pending:
+            await self._push_done()
+
+    def close(self):
+        """Cancel every conversion in progress."""
+        for text in list(self._running):
+            self._cancel(text)
+        if self.scheduler is not None:
+            self.scheduler.wake()
+
+    def _cancel(self, text: str):
+        task, cancelled = self._running.pop(text)
+        cancelled.set()
+        task.cancel()
+        self.cancelled_count += 1
+
+    async def _convert(self, text: str, cancelled: threading.Event):
+        """Convert one statement and push its result, unless it went stale."""
+        try:
+            result = await self._convert_one(text, cancelled)
+        finally:
+            # Drop this task's entry, unless a newer update already replaced it
+            entry = self._running.get(text)
+            if entry is not None and entry[1] is cancelled:
+                del self._running[text]
+
+        if cancelled.is_set():
+            return
+
+        if result["status"] == "success":
+            self._results[text] = result
+            while len(self._results) > self.MAX_CACHED:
+                self._results.popitem(last=False)
+
+        await self._push({
+            "type": "result",
+            "version": self.version,
+            "indexes": [i for i, statement in enumerate(self.statements) if statement == text],
+            "result": result
+        })
+
+        if not self._running:
+            await self._push_done()
+
+    async def _convert_one(self, text: str, cancelled: threading.Event) -> Dict:
+        """Run the conversion; failures come back as an error result."""
+        ticket = None
+        try:
+            if self.admission is not None:
+                ticket = await self.admission.acquire(1, len(text.encode('utf-8')))
+
+            converter = AIConverter(
+                providers=self.providers,
+                meter=self.meter,
+                scheduler=self.scheduler,
+                scheduler_key=self.scheduler_key,
+                priority='interactive',
+                cancelled=cancelled
+            )
+            results = await asyncio.get_running_loop().run_in_executor(
+                None, converter.convert, [text], self.source_dialect, self.target_dialect
+            )
+            return results[0].to_dict()
+        except AdmissionRejected as e:
+            notes = f"{e}; retry in {e.retry_after}s"
+        except Exception as e:
+            print(f"Live conversion failed: {e}")
+            notes = f"Conversion failed: {e}"
+        finally:
+            if ticket is not None:
+                self.admission.release(ticket)
+
+        return {"original": text, "converted": None, "status": "error", "notes": notes}
+
+    async def _push_done(self):
+        await self._push({
+            "type": "done",
+            "version": self.version,
+            "cancelled": self.cancelled_count,
+            "usage": self.meter.to_dict() if self.meter is not None else None
+        })
+
+    async def _push(self, message: Dict):
+        # Tasks finish concurrently; keep each message whole on the socket
+        async with self._send_lock:
+            try:
+                await self._send(message)
+            except Exception as e:
+                print(f"Live conversion: could not send {message['type']}: {e}")
@@ -0,0 +1,235 @@
+import requests
+from typing import Dict, List, Optional
+import os
+import threading
+
+from config import LLM_PROVIDERS, LLM_PROVIDER_CHAIN, MODEL_PRICES
+
+# Concurrent calls per provider, shared by every converter in the process
+_slots: Dict[str, threading.BoundedSemaphore] = {}
+_slots_lock = threading.Lock()
+
+
+class UnknownProviderError(ValueError):
+    """A provider name that is not in LLM_PROVIDERS."""
+
+
+class LLMProvider:
+    """
+    An OpenAI-compatible chat completions endpoint.
+
+    Covers OpenRouter as well as self-hosted servers (llama.cpp server,
+    vLLM) that speak the same API. Each provider has its own endpoint,
+    auth, model list, timeout and a process-wide cap on concurrent calls.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        models: List[str],
+        api_key: Optional[str] = None,
+        max_concurrency: int = 4,
+        timeout: int = 60,
+        headers: Optional[Dict[str, str]] = None,
+        usage_accounting: bool = False,
+        free: bool = False,
+        requires_key: bool = False
+    ):
+        """
+        Initialize a provider.
+
+        Args:
+            name: Provider name, as used in LLM_PROVIDERS
+            url: Chat completions URL
+            models: Models to try in order
+            api_key: Bearer token, if the endpoint needs one
+            max_concurrency: Calls in flight at once across the process
+            timeout: Request timeout in seconds
+            headers: Extra request headers
+            usage_accounting: Ask the endpoint to report cost (OpenRouter)
+            free: Calls cost nothing (self-hosted)
+            requires_key: The endpoint takes the caller's API key
+        """
+        self.name = name
+        self.url = url
+        self.models = models
+        self.api_key = api_key
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.usage_accounting = usage_accounting
+        self.free = free
+        self.requires_key = requires_key
+
+        with _slots_lock:
+            self._slots = _slots.setdefault(name, threading.BoundedSemaphore(max_concurrency))
+
+    @classmethod
+    def from_config(cls, name: str, api_key: Optional[str] = None) -> "LLMProvider":
+        """
+        Create a provider from LLM_PROVIDERS.
+
+        Args:
+            name: Key of LLM_PROVIDERS
+            api_key: Key to use instead of the configured environment variable
+
+        Returns:
+            LLMProvider
+        """
+        if name not in LLM_PROVIDERS:
+            raise UnknownProviderError(f"Unknown LLM provider: {name}")
+
+        settings = LLM_PROVIDERS[name]
+        api_key = api_key or os.getenv(settings.get("api_key_env", ""), "")
+        # Remove quotes if present (common .env issue)
+        api_key = api_key.strip().strip("'\"") or None
+
+        if settings.get("requires_key") and not api_key:
+            raise ValueError(
+                f"API key is required for {name}. Set {settings['api_key_env']} "
+                "environment variable or pass api_key parameter."
+            )
+
+        return cls(
+            name,
+            settings["url"],
+            list(settings["models"]),
+            api_key=api_key,
+            max_concurrency=settings.get("max_concurrency", 4),
+            timeout=settings.get("timeout", 60),
+            headers=settings.get("headers"),
+            usage_accounting=settings.get("usage_accounting", False),
+            free=settings.get("free", False),
+            requires_key=settings.get("requires_key", False)
+        )
+
+    def complete(self, model: str, prompt: str, max_tokens: int, temperature: float = 0.3) -> Dict:
+        """
+        Run one chat completion.
+
+        Args:
+            model: Model name
+            prompt: User message
+            max_tokens: Output token limit
+            temperature: Sampling temperature
+
+        Returns:
+            Dict with 'content', 'finish_reason' and 'usage' ('prompt_tokens',
+            'completion_tokens' and 'cost' in USD; None where unknown)
+        """
+        headers = {"Content-Type": "application/json", **self.headers}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+
+        payload = {
+            "model": model,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        if self.usage_accounting:
+            payload["usage"] = {"include": True}
+
+        print(f"[DEBUG] Provider: {self.name} Model: {model}")
+
+        with self._slots:
+            response = requests.post(self.url, headers=headers, json=payload, timeout=self.timeout)
+
+        if response.status_code != 200:
+            try:
+                error_data = response.json() if response.text else {}
+            except ValueError:
+                error_data = {}
+            error_msg = error_data.get("error", {}).get("message", response.text)
+            print(f"[DEBUG] Full error response: {response.text}")
+            raise Exception(f"API Error ({response.status_code}): {error_msg}")
+
+        response_data = response.json()
+
+        if "choices" not in response_data or not response_data["choices"]:
+            raise Exception("Invalid API response: No choices returned")
+
+        choice = response_data["choices"][0]
+        return {
+            "content": choice["message"]["content"],
+            "finish_reason": choice.get("finish_reason"),
+            "usage": self._usage(model, response_data.get("usage") or {})
+        }
+
+    def estimate_cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+        """
+        Cost of a call from MODEL_PRICES.
+
+        Returns:
+            Cost in USD, 0.0 for free models and providers, or None if the
+            model has no known price
+        """
+        if self.free or model.endswith(":free"):
+            return 0.0
+        if model not in MODEL_PRICES:
+            return None
+        prompt_price, completion_price = MODEL_PRICES[model]
+        return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1e6
+
+    def _usage(self, model: str, reported: Dict) -> Dict:
+        """Normalize reported usage and fill in the cost where it is missing."""
+        prompt_tokens = reported.get("prompt_tokens")
+        completion_tokens = reported.get("completion_tokens")
+        cost = reported.get("cost")
+
+        if cost is None and prompt_tokens is not None:
+            cost = self.estimate_cost(model, prompt_tokens, completion_tokens or 0)
+        elif cost is None and (self.free or model.endswith(":free")):
+            cost = 0.0
+
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cost": cost
+        }
+
+    def validate(self) -> bool:
+        """Check that the endpoint answers with these credentials."""
+        try:
+            self.complete(self.models[0], "Say OK", max_tokens=10)
+            return True
+        except Exception:
+            return False
+
+
+def build_providers(names: Optional[List[str]] = None, api_key: Optional[str] = None) -> List[LLMProvider]:
+    """
+    Build a fallback chain of providers.
+
+    Providers that need a key and have none are left out of the chain; if
+    that leaves nothing, the first one's error is raised.
+
+    Args:
+        names: Provider names in fallback order (default: LLM_PROVIDER_CHAIN)
+        api_key: Key given with the request, used by providers that need one
+
+    Returns:
+        List of LLMProvider, in fallback order
+    """
+    providers = []
+    first_error = None
+
+    for name in names or LLM_PROVIDER_CHAIN:
+        if name not in LLM_PROVIDERS:
+            raise UnknownProviderError(f"Unknown LLM provider: {name}")
+        # The request's key is only sent to providers that need one
+        key = api_key if LLM_PROVIDERS[name].get("requires_key") else None
+        try:
+            providers.append(LLMProvider.from_config(name, key))
+        except ValueError as e:
+            first_error = first_error or e
+
+    if not providers:
+        raise first_error or ValueError("No LLM provider configured")
+
+    return providers
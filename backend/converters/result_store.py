@@ -0,0 +1,137 @@
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional
+import sys
+
+# Fields of a conversion result, in API order
+RESULT_FIELDS = (
+    'id', 'original', 'converted', 'status', 'notes', 'model', 'duration_ms',
+    'prompt_tokens', 'completion_tokens', 'cost'
+)
+
+# Notes up to this length are interned; longer ones are usually unique
+_MAX_INTERNED_NOTES = 256
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Intern a repeated short string so every record shares one copy."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class ConversionRecord(Mapping):
+    """
+    Compact record of one conversion result.
+
+    Uses __slots__ instead of a per-result dict; status and model are
+    interned, as are short notes (error messages and boilerplate notes
+    repeat across a job). Reads like a read-only dict, so generators that
+    expect result dicts accept records unchanged.
+    """
+
+    __slots__ = RESULT_FIELDS
+
+    def __init__(
+        self,
+        original: str,
+        converted: Optional[str],
+        status: str,
+        notes: Optional[str],
+        model: Optional[str] = None,
+        duration_ms: Optional[float] = None,
+        id: Optional[str] = None,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        cost: Optional[float] = None
+    ):
+        self.id = id
+        self.original = original
+        self.converted = converted
+        self.status = _intern(status)
+        self.notes = _intern(notes) if notes and len(notes) <= _MAX_INTERNED_NOTES else notes
+        self.model = _intern(model)
+        self.duration_ms = duration_ms
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.cost = cost
+
+    @classmethod
+    def from_dict(cls, result: Dict) -> "ConversionRecord":
+        """Build a record from a result dict (e.g. from an export request)."""
+        return cls(**{field: result.get(field) for field in RESULT_FIELDS})
+
+    def copy(self, **changes) -> "ConversionRecord":
+        """Copy the record, replacing the given fields."""
+        values = {field: getattr(self, field) for field in RESULT_FIELDS}
+        values.update(changes)
+        return ConversionRecord(**values)
+
+    def to_dict(self) -> Dict:
+        """Convert to the API schema (ConversionResult)."""
+        return {field: getattr(self, field) for field in RESULT_FIELDS}
+
+    def __getitem__(self, key: str):
+        if key not in RESULT_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(RESULT_FIELDS)
+
+    def __len__(self) -> int:
+        return len(RESULT_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"ConversionRecord(id={self.id!r}, status={self.status!r})"
+
+
+class ResultStore:
+    """
+    Ordered collection of ConversionRecords with running counts.
+
+    Success, skipped and error counts are kept up to date on append, so
+    callers do not scan the results again. Supports len(), iteration and indexing
+    like the list of result dicts it replaces.
+    """
+
+    __slots__ = ('records', 'success_count', 'skipped_count')
+
+    def __init__(self, records: Optional[Iterable[ConversionRecord]] = None):
+        self.records: List[ConversionRecord] = []
+        self.success_count = 0
+        self.skipped_count = 0
+
+        for record in records or ():
+            self.append(record)
+
+    @classmethod
+    def from_dicts(cls, results: Iterable[Dict]) -> "ResultStore":
+        """Build a store from result dicts."""
+        return cls(ConversionRecord.from_dict(result) for result in results)
+
+    @property
+    def error_count(self) -> int:
+        return len(self.records) - self.success_count - self.skipped_count
+
+    def append(self, record: ConversionRecord):
+        """Add a record and update the counts."""
+        self.records.append(record)
+        if record.status == 'success':
+            self.success_count += 1
+        elif record.status == 'skipped':
+            self.skipped_count += 1
+
+    def without_skipped(self) -> "ResultStore":
+        """A store holding only the records that were sent for conversion."""
+        return ResultStore(record for record in self.records if record.status != 'skipped')
+
+    def to_dicts(self) -> List[Dict]:
+        """Convert every record to the API schema."""
+        return [record.to_dict() for record in self.records]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[ConversionRecord]:
+        return iter(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
@@ -0,0 +1,198 @@
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+import itertools
+import threading
+import time
+
+# Priority classes, highest first
+PRIORITIES = ('interactive', 'bulk')
+
+
+class ConversionCancelled(Exception):
+    """The conversion was made obsolete before its model call was sent."""
+
+
+class _Ticket:
+    """A model call waiting for a slot."""
+
+    __slots__ = ('key', 'priority', 'tag', 'seq', 'enqueued')
+
+    def __init__(self, key: str, priority: int, tag: float, seq: int):
+        self.key = key
+        self.priority = priority
+        self.tag = tag
+        self.seq = seq
+        self.enqueued = time.perf_counter()
+
+    def order(self):
+        return self.priority, self.tag, self.seq
+
+
+class ConversionScheduler:
+    """
+    Process-wide fair-share gate for model calls.
+
+    Every model call takes a slot first. At most max_concurrency calls run
+    at once, and at most per_key_limit of them for one API key. Waiting
+    calls are served by priority class (interactive before bulk), then by
+    start-time fair queueing across keys. Each call's tag is
+    max(virtual time, the key's last tag) + 1 / weight, so a key with a
+    20k-statement job gets its weighted share and no more while other
+    keys have calls waiting.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        per_key_limit: int = 4,
+        weights: Optional[Dict[str, float]] = None
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrency: Model calls in flight across all keys
+            per_key_limit: Model calls in flight per API key
+            weights: Relative share per key id (default 1.0)
+        """
+        self.max_concurrency = max_concurrency
+        self.per_key_limit = per_key_limit
+        self.weights = weights or {}
+
+        self._condition = threading.Condition()
+        self._waiting: List[_Ticket] = []
+        self._running: Dict[str, int] = {}
+        self._last_tag: Dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._seq = itertools.count()
+
+        # Wait statistics per priority class
+        self._served = {priority: 0 for priority in PRIORITIES}
+        self._wait_total = {priority: 0.0 for priority in PRIORITIES}
+        self._wait_max = {priority: 0.0 for priority in PRIORITIES}
+        self.withdrawn = 0
+
+    @contextmanager
+    def slot(
+        self,
+        key: str,
+        priority: str = 'bulk',
+        cancelled: Optional[threading.Event] = None
+    ) -> Iterator[float]:
+        """
+        Hold a slot for one model call.
+
+        Args:
+            key: API key id the call is made for
+            priority: 'interactive' or 'bulk'
+            cancelled: Event that withdraws the call while it is queued
+                (call wake() after setting it)
+
+        Yields:
+            Milliseconds the call waited for its slot
+        """
+        waited = self.acquire(key, priority, cancelled)
+        try:
+            yield waited
+        finally:
+            self.release(key)
+
+    def acquire(
+        self,
+        key: str,
+        priority: str = 'bulk',
+        cancelled: Optional[threading.Event] = None
+    ) -> float:
+        """
+        Block until the call may run; returns the wait in milliseconds.
+
+        Raises:
+            ConversionCancelled: If cancelled is set while the call is queued
+        """
+        with self._condition:
+            start = max(self._virtual_time, self._last_tag.get(key, 0.0))
+            tag = start + 1.0 / self.weights.get(key, 1.0)
+            self._last_tag[key] = tag
+
+            ticket = _Ticket(key, PRIORITIES.index(priority), start, next(self._seq))
+            self._waiting.append(ticket)
+
+            while self._next_ticket() is not ticket:
+                if cancelled is not None and cancelled.is_set():
+                    self._waiting.remove(ticket)
+                    self.withdrawn += 1
+                    self._condition.notify_all()
+                    raise ConversionCancelled("Cancelled while queued for a model call")
+                self._condition.wait()
+
+            self._waiting.remove(ticket)
+            self._running[key] = self._running.get(key, 0) + 1
+            self._virtual_time = max(self._virtual_time, ticket.tag)
+
+            waited = (time.perf_counter() - ticket.enqueued) * 1000
+            self._served[priority] += 1
+            self._wait_total[priority] += waited
+            self._wait_max[priority] = max(self._wait_max[priority], waited)
+
+            # Another waiting call may be eligible too
+            self._condition.notify_all()
+            return waited
+
+    def wake(self):
+        """Let queued calls re-check their cancel events."""
+        with self._condition:
+            self._condition.notify_all()
+
+    def release(self, key: str):
+        """Give a slot back."""
+        with self._condition:
+            self._running[key] -= 1
+            if not self._running[key]:
+                del self._running[key]
+            self._condition.notify_all()
+
+    def _next_ticket(self) -> Optional[_Ticket]:
+        """The waiting call to run next, if a slot is free for it."""
+        if sum(self._running.values()) >= self.max_concurrency:
+            return None
+
+        eligible = [
+            ticket for ticket in self._waiting
+            if self._running.get(ticket.key, 0) < self.per_key_limit
+        ]
+        return min(eligible, key=_Ticket.order) if eligible else None
+
+    def stats(self) -> Dict:
+        """Queue depth, running calls and wait times, for monitoring."""
+        with self._condition:
+            waiting_by_key: Dict[str, int] = {}
+            for ticket in self._waiting:
+                waiting_by_key[ticket.key] = waiting_by_key.get(ticket.key, 0) + 1
+
+            return {
+                "max_concurrency": self.max_concurrency,
+                "per_key_limit": self.per_key_limit,
+                "running": sum(self._running.values()),
+                "queue_depth": len(self._waiting),
+                "withdrawn": self.withdrawn,
+                "queue_depth_by_priority": {
+                    priority: sum(1 for t in self._waiting if t.priority == n)
+                    for n, priority in enumerate(PRIORITIES)
+                },
+                "keys": {
+                    key: {
+                        "running": self._running.get(key, 0),
+                        "waiting": waiting_by_key.get(key, 0)
+                    }
+                    for key in set(self._running) | set(waiting_by_key)
+                },
+                "wait_ms": {
+                    priority: {
+                        "served": self._served[priority],
+                        "avg": round(self._wait_total[priority] / self._served[priority], 1)
+                        if self._served[priority] else 0.0,
+                        "max": round(self._wait_max[priority], 1)
+                    }
+                    for priority in PRIORITIES
+                }
+            }
@@ -0,0 +1,172 @@
+from typing import Dict, Optional
+import hashlib
+import threading
+
+
+class BudgetExceededError(Exception):
+    """A model call would take a job or API key over its token or cost budget."""
+
+
+class UsageMeter:
+    """
+    Running token, cost and call totals with optional budgets.
+
+    Calls reserve their worst-case tokens and cost before they are sent and
+    settle with the reported usage afterwards, so concurrent calls cannot
+    jointly overshoot the token or cost budget. A meter can have a parent (the per-key
+    meter of a job); reservations and usage count against both.
+    """
+
+    def __init__(
+        self,
+        token_budget: Optional[int] = None,
+        cost_budget: Optional[float] = None,
+        parent: Optional["UsageMeter"] = None,
+        name: str = "job"
+    ):
+        """
+        Initialize a meter.
+
+        Args:
+            token_budget: Maximum total tokens, or None for no limit
+            cost_budget: Maximum cost in USD, or None for no limit
+            parent: Meter that is charged as well (e.g. per API key)
+            name: Name used in budget errors
+        """
+        self.token_budget = token_budget or None
+        self.cost_budget = cost_budget or None
+        self.parent = parent
+        self.name = name
+
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost = 0.0
+        self.calls = 0
+        self.exhausted = False
+        self._reserved = 0
+        self._reserved_cost = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def reserve(self, tokens: int, cost: float = 0.0):
+        """
+        Reserve tokens and cost for a call about to be sent.
+
+        Args:
+            tokens: Worst-case tokens of the call (prompt plus output limit)
+            cost: Worst-case cost of the call in USD
+
+        Raises:
+            BudgetExceededError: If the call could take this meter or its
+                parent over budget; nothing is reserved then
+        """
+        with self._lock:
+            if self.token_budget and self.total_tokens + self._reserved + tokens > self.token_budget:
+                self.exhausted = True
+                raise BudgetExceededError(
+                    f"{self.name} token budget of {self.token_budget} exhausted "
+                    f"({self.total_tokens} used)"
+                )
+            if self.cost_budget and (
+                self.cost >= self.cost_budget
+                or self.cost + self._reserved_cost + cost > self.cost_budget
+            ):
+                self.exhausted = True
+                raise BudgetExceededError(
+                    f"{self.name} cost budget of ${self.cost_budget:.4f} exhausted "
+                    f"(${self.cost:.4f} spent)"
+                )
+            self._reserved += tokens
+            self._reserved_cost += cost
+
+        if self.parent is not None:
+            try:
+                self.parent.reserve(tokens, cost)
+            except BudgetExceededError:
+                with self._lock:
+                    self._reserved -= tokens
+                    self._reserved_cost -= cost
+                    self.exhausted = True
+                raise
+
+    def settle(self, reserved: int, usage: Optional[Dict], reserved_cost: float = 0.0):
+        """
+        Replace a reservation with the usage the call reported.
+
+        Args:
+            reserved: Tokens passed to reserve()
+            usage: Dict with 'prompt_tokens', 'completion_tokens' and 'cost'
+                (None when the call failed without usage)
+            reserved_cost: Cost passed to reserve()
+        """
+        usage = usage or {}
+        with self._lock:
+            self._reserved -= reserved
+            self._reserved_cost -= reserved_cost
+            self.prompt_tokens += usage.get('prompt_tokens') or 0
+            self.completion_tokens += usage.get('completion_tokens') or 0
+            self.cost += usage.get('cost') or 0.0
+            self.calls += 1
+
+        if self.parent is not None:
+            self.parent.settle(reserved, usage, reserved_cost)
+
+    def to_dict(self) -> Dict:
+        """Totals for API responses."""
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "cost": round(self.cost, 6),
+            "calls": self.calls,
+            "token_budget": self.token_budget,
+            "cost_budget": self.cost_budget,
+            "budget_exhausted": self.exhausted
+        }
+
+
+class UsageLedger:
+    """
+    Process-wide usage totals per API key.
+
+    Keys are identified by a short hash, so the ledger never holds them.
+    """
+
+    def __init__(self, token_budget: Optional[int] = None, cost_budget: Optional[float] = None):
+        """
+        Initialize the ledger.
+
+        Args:
+            token_budget: Token budget per API key, or None for no limit
+            cost_budget: Cost budget per API key in USD, or None for no limit
+        """
+        self.token_budget = token_budget
+        self.cost_budget = cost_budget
+        self._meters: Dict[str, UsageMeter] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_id(api_key: Optional[str]) -> str:
+        """Stable, non-reversible identifier for an API key."""
+        if not api_key:
+            return "no-key"
+        return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:12]
+
+    def meter(self, api_key: Optional[str]) -> UsageMeter:
+        """Get the meter of an API key, creating it on first use."""
+        key_id = self.key_id(api_key)
+        with self._lock:
+            if key_id not in self._meters:
+                self._meters[key_id] = UsageMeter(
+                    self.token_budget, self.cost_budget, name=f"API key {key_id}"
+                )
+            return self._meters[key_id]
+
+    def to_dict(self) -> Dict:
+        """Totals of every key seen, by key id."""
+        with self._lock:
+            meters = dict(self._meters)
+        return {key_id: meter.to_dict() for key_id, meter in meters.items()}
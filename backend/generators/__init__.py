@@ -2,5 +2,9 @@ from .pdf_generator import PDFGenerator
 from .word_generator import WordGenerator
 from .excel_generator import ExcelGenerator
 from .sql_generator import SQLGenerator
+from .record_generator import RecordGenerator
+from .migration_generator import MigrationGenerator
+from .bundle_generator import BundleGenerator
 
-__all__ = ["PDFGenerator", "WordGenerator", "ExcelGenerator", "SQLGenerator"]
+__all__ = ["PDFGenerator", "WordGenerator", "ExcelGenerator", "SQLGenerator", "RecordGenerator",
+           "MigrationGenerator", "BundleGenerator"]
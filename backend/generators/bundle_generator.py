@@ -0,0 +1,130 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from typing import List, Dict, Iterator, Optional
+import zipfile
+
+from .pdf_generator import PDFGenerator
+from .word_generator import WordGenerator
+from .excel_generator import ExcelGenerator
+from .sql_generator import SQLGenerator
+from .record_generator import RecordGenerator
+from utils.streaming import iter_writer_output
+
+# Generator and archive member name for each export format
+BUNDLE_MEMBERS = {
+    "PDF": (PDFGenerator, "converted_sql.pdf"),
+    "Word Document": (WordGenerator, "converted_sql.docx"),
+    "Excel": (ExcelGenerator, "converted_sql.xlsx"),
+    "SQL File": (SQLGenerator, "converted_sql.sql"),
+    "NDJSON": (partial(RecordGenerator, 'ndjson'), "converted_sql.ndjson"),
+    "Parquet": (partial(RecordGenerator, 'parquet'), "converted_sql.parquet")
+}
+
+# Formats whose output is already compressed and gains nothing from deflate
+_COMPRESSED_FORMATS = ("PDF", "Word Document", "Excel", "Parquet")
+
+
+def _generate_member(
+    export_format: str,
+    results: List[Dict],
+    source_dialect: str,
+    target_dialect: str,
+    stream: bool
+) -> bytes:
+    """
+    Generate one export format.
+
+    Runs in a worker process, so it only takes and returns plain data.
+
+    Returns:
+        The complete file content
+    """
+    generator_class, _ = BUNDLE_MEMBERS[export_format]
+    generator = generator_class()
+
+    if stream:
+        return b''.join(generator.generate_stream(results, source_dialect, target_dialect))
+    return generator.generate(results, source_dialect, target_dialect).getvalue()
+
+
+class BundleGenerator:
+    """
+    Generator for a ZIP bundle holding several export formats at once.
+
+    Each format is produced by its own generator in a separate worker
+    process, and members are written into the streamed archive in the
+    order they finish, so the bundle takes as long as the slowest format
+    rather than the sum of all of them.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Initialize the bundle generator.
+
+        Args:
+            max_workers: Worker processes used for generation. Defaults to
+                one per requested format.
+        """
+        self.max_workers = max_workers
+
+    def generate_stream(
+        self,
+        results: List[Dict],
+        source_dialect: str,
+        target_dialect: str,
+        formats: List[str],
+        large_export: bool = False
+    ) -> Iterator[bytes]:
+        """
+        Stream a ZIP archive with one member per requested format.
+
+        Args:
+            results: List of conversion results
+            source_dialect: Source SQL dialect
+            target_dialect: Target SQL dialect
+            formats: Export formats to include (keys of BUNDLE_MEMBERS)
+            large_export: Use the streaming generators inside the workers
+
+        Yields:
+            Chunks of the ZIP file
+        """
+        formats = list(dict.fromkeys(formats))
+        unknown = [f for f in formats if f not in BUNDLE_MEMBERS]
+        if unknown:
+            raise ValueError(f"Unsupported format: {', '.join(unknown)}")
+
+        def produce(writer):
+            workers = self.max_workers or len(formats)
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(
+                        _generate_member, export_format, results,
+                        source_dialect, target_dialect, large_export
+                    ): export_format
+                    for export_format in formats
+                }
+
+                try:
+                    with zipfile.ZipFile(writer, 'w') as archive:
+                        for future in as_completed(futures):
+                            export_format = futures[future]
+                            self._write_member(archive, export_format, future.result())
+                except BaseException:
+                    # Client went away or a generator failed; skip the rest
+                    for future in futures:
+                        future.cancel()
+                    raise
+
+        return iter_writer_output(produce)
+
+    def _write_member(self, archive: zipfile.ZipFile, export_format: str, data: bytes):
+        """Add one generated file to the archive."""
+        _, member_name = BUNDLE_MEMBERS[export_format]
+
+        if export_format in _COMPRESSED_FORMATS:
+            compression = zipfile.ZIP_STORED
+        else:
+            compression = zipfile.ZIP_DEFLATED
+
+        archive.writestr(member_name, data, compress_type=compression)
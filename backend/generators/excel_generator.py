@@ -1,9 +1,14 @@
-from openpyxl import Workbook
-from openpyxl.styles import Font, Fill, PatternFill, Border, Side, Alignment
+from openpyxl import Workbook, load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Fill, PatternFill, Border, Side, Alignment, NamedStyle
 from openpyxl.utils import get_column_letter
-from typing import List, Dict
+from typing import List, Dict, Iterator
 from datetime import datetime
 import io
+import zipfile
+
+from utils.streaming import iter_writer_output
 
 class ExcelGenerator:
     """
@@ -17,6 +22,7 @@ class ExcelGenerator:
         self.header_font = Font(color='FFFFFF', bold=True, size=11)
         self.success_fill = PatternFill(start_color='d1fae5', end_color='d1fae5', fill_type='solid')
         self.error_fill = PatternFill(start_color='fee2e2', end_color='fee2e2', fill_type='solid')
+        self.skipped_fill = PatternFill(start_color='fef3c7', end_color='fef3c7', fill_type='solid')
         self.border = Border(
             left=Side(style='thin', color='e0e0e0'),
             right=Side(style='thin', color='e0e0e0'),
@@ -24,6 +30,9 @@ class ExcelGenerator:
             bottom=Side(style='thin', color='e0e0e0')
         )
         self.wrap_alignment = Alignment(wrap_text=True, vertical='top')
+        
+        # Column widths for the results sheet
+        self.result_column_widths = {'A': 5, 'B': 12, 'C': 50, 'D': 50, 'E': 40}
     
     def generate(
         self, 
@@ -92,15 +101,14 @@ class ExcelGenerator:
         ws['A7'].font = Font(size=14, bold=True, color='667eea')
         ws.merge_cells('A7:B7')
         
-        success_count = sum(1 for r in results if r['status'] == 'success')
-        error_count = len(results) - success_count
-        success_rate = (success_count / len(results) * 100) if results else 0
+        success_count, error_count, skipped_count = self._count_statuses(results)
         
         stats = [
             ("Total Statements", len(results)),
             ("Successfully Converted", success_count),
             ("Errors", error_count),
-            ("Success Rate", f"{success_rate:.1f}%")
+            ("Skipped", skipped_count),
+            ("Success Rate", self._success_rate(success_count, error_count))
         ]
         
         for i, (label, value) in enumerate(stats, 9):
@@ -108,11 +116,13 @@ class ExcelGenerator:
             ws[f'B{i}'] = value
             ws[f'A{i}'].font = Font(bold=True)
             
-            # Color code success/error rows
+            # Color code success/error/skipped rows
             if "Success" in label and isinstance(value, int):
                 ws[f'B{i}'].fill = self.success_fill
             elif "Error" in label:
                 ws[f'B{i}'].fill = self.error_fill
+            elif label == "Skipped":
+                ws[f'B{i}'].fill = self.skipped_fill
         
         # Adjust column widths
         ws.column_dimensions['A'].width = 25
@@ -141,39 +151,312 @@ class ExcelGenerator:
         
         # Data rows
         for row_idx, result in enumerate(results, 2):
-            # Row number
-            ws.cell(row=row_idx, column=1, value=row_idx - 1)
+            self._write_result_row(ws, row_idx, result.get('id') or row_idx - 1, result)
+        
+        # Adjust column widths
+        for column, width in self.result_column_widths.items():
+            ws.column_dimensions[column].width = width
+        
+        # Freeze header row
+        ws.freeze_panes = 'A2'
+    
+    def _write_result_row(self, ws, row_idx: int, label, result: Dict):
+        """Write and style one result row of the detailed results sheet."""
+        # Row number, or the caller-supplied statement ID
+        ws.cell(row=row_idx, column=1, value=label)
+        
+        # Status
+        status_cell = ws.cell(row=row_idx, column=2)
+        if result['status'] == 'success':
+            status_cell.value = "✓ Success"
+            status_cell.fill = self.success_fill
+        elif result['status'] == 'skipped':
+            status_cell.value = "– Skipped"
+            status_cell.fill = self.skipped_fill
+        else:
+            status_cell.value = "✗ Error"
+            status_cell.fill = self.error_fill
+        
+        # Original SQL
+        ws.cell(row=row_idx, column=3, value=result['original'])
+        
+        # Converted SQL
+        ws.cell(row=row_idx, column=4, value=result.get('converted', ''))
+        
+        # Notes
+        ws.cell(row=row_idx, column=5, value=result.get('notes', ''))
+        
+        # Apply styling to all cells in row
+        for col in range(1, 6):
+            cell = ws.cell(row=row_idx, column=col)
+            cell.border = self.border
+            cell.alignment = self.wrap_alignment
+    
+    def append(
+        self, 
+        base_file, 
+        results: List[Dict], 
+        source_dialect: str, 
+        target_dialect: str
+    ) -> io.BytesIO:
+        """
+        Extend a previously generated Excel file with new results.
+        
+        Existing rows are kept as they are; the new results are appended
+        to the results sheet and the summary statistics are updated.
+        
+        Args:
+            base_file: Open binary file of an xlsx file produced by this
+                generator (cached copies do not carry an .xlsx suffix)
+            results: Results added since the base file was generated
+            source_dialect: Source SQL dialect
+            target_dialect: Target SQL dialect
             
-            # Status
-            status_cell = ws.cell(row=row_idx, column=2)
+        Returns:
+            BytesIO buffer containing the extended Excel file
+        """
+        base_file.seek(0)
+        wb = load_workbook(base_file)
+        stats = self._summary_cells(wb["Summary"])
+        ws = wb["Conversion Results"]
+        
+        if "Skipped" not in stats:
+            # Files written before skipped results were counted
+            stats = self._add_skipped_row(wb["Summary"], stats)
+        
+        total = stats["Total Statements"].value
+        success_count = stats["Successfully Converted"].value
+        skipped_count = stats["Skipped"].value
+        
+        row_idx = ws.max_row
+        for i, result in enumerate(results, total + 1):
+            row_idx += 1
+            self._write_result_row(ws, row_idx, result.get('id') or i, result)
             if result['status'] == 'success':
-                status_cell.value = "✓ Success"
-                status_cell.fill = self.success_fill
-            else:
-                status_cell.value = "✗ Error"
-                status_cell.fill = self.error_fill
+                success_count += 1
+            elif result['status'] == 'skipped':
+                skipped_count += 1
+        
+        total += len(results)
+        error_count = total - success_count - skipped_count
+        
+        stats["Total Statements"].value = total
+        stats["Successfully Converted"].value = success_count
+        stats["Errors"].value = error_count
+        stats["Skipped"].value = skipped_count
+        stats["Success Rate"].value = self._success_rate(success_count, error_count)
+        stats["Generated:"].value = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        buffer = io.BytesIO()
+        wb.save(buffer)
+        buffer.seek(0)
+        
+        return buffer
+    
+    def read_summary(self, file) -> Dict:
+        """
+        Read the summary statistics of an Excel file produced by this generator.
+        
+        Args:
+            file: Path or binary file object of the xlsx file
             
-            # Original SQL
-            ws.cell(row=row_idx, column=3, value=result['original'])
+        Returns:
+            Dict with 'total', 'success', 'error' and 'skipped' counts
+            
+        Raises:
+            ValueError: If the file is not a workbook with a summary sheet
+                with statistics
+        """
+        try:
+            wb = load_workbook(file, read_only=True)
+        except (zipfile.BadZipFile, InvalidFileException, KeyError) as e:
+            raise ValueError(f"Not an Excel file generated by this tool: {e}")
+        try:
+            stats = {
+                row[0].value: row[1].value
+                for row in wb["Summary"].iter_rows(min_col=1, max_col=2)
+                if len(row) == 2 and row[0].value
+            }
+        except KeyError:
+            raise ValueError("Excel file has no Summary sheet")
+        finally:
+            wb.close()
+        
+        try:
+            return {
+                'total': int(stats["Total Statements"]),
+                'success': int(stats["Successfully Converted"]),
+                'error': int(stats["Errors"]),
+                'skipped': int(stats.get("Skipped") or 0)
+            }
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Excel summary sheet has no conversion statistics")
+    
+    def _add_skipped_row(self, ws, stats: Dict) -> Dict:
+        """Insert a zero Skipped row above Success Rate in an older summary sheet."""
+        row = stats["Success Rate"].row
+        ws.insert_rows(row)
+        ws.cell(row=row, column=1, value="Skipped").font = Font(bold=True)
+        value = ws.cell(row=row, column=2, value=0)
+        value.fill = self.skipped_fill
+        return self._summary_cells(ws)
+    
+    def _count_statuses(self, results: List[Dict]):
+        """Count (success, error, skipped) results."""
+        success_count = sum(1 for r in results if r['status'] == 'success')
+        skipped_count = sum(1 for r in results if r['status'] == 'skipped')
+        return success_count, len(results) - success_count - skipped_count, skipped_count
+    
+    def _success_rate(self, success_count: int, error_count: int) -> str:
+        """Share of attempted conversions that succeeded; skipped ones were not attempted."""
+        attempted = success_count + error_count
+        return f"{(success_count / attempted * 100) if attempted else 0:.1f}%"
+    
+    def _summary_cells(self, ws) -> Dict:
+        """Map summary labels in column A to their value cells in column B."""
+        return {
+            ws.cell(row=row, column=1).value: ws.cell(row=row, column=2)
+            for row in range(1, ws.max_row + 1)
+            if ws.cell(row=row, column=1).value
+        }
+    
+    def generate_stream(
+        self, 
+        results: List[Dict], 
+        source_dialect: str, 
+        target_dialect: str
+    ) -> Iterator[bytes]:
+        """
+        Stream an Excel file for very large result sets.
+        
+        Uses an openpyxl write-only workbook: rows are serialized as they
+        are appended, styling comes from named styles registered once per
+        workbook instead of per-cell style objects, and the zipped file is
+        handed out in chunks while it is being written.
+        
+        Args:
+            results: List of conversion results
+            source_dialect: Source SQL dialect
+            target_dialect: Target SQL dialect
             
-            # Converted SQL
-            ws.cell(row=row_idx, column=4, value=result.get('converted', ''))
+        Yields:
+            Chunks of the xlsx file
+        """
+        def produce(writer):
+            wb = Workbook(write_only=True)
+            styles = self._register_named_styles(wb)
             
-            # Notes
-            ws.cell(row=row_idx, column=5, value=result.get('notes', ''))
+            self._write_summary_sheet(wb, styles, results, source_dialect, target_dialect)
+            self._write_results_sheet(wb, styles, results, source_dialect, target_dialect)
             
-            # Apply styling to all cells in row
-            for col in range(1, 6):
-                cell = ws.cell(row=row_idx, column=col)
-                cell.border = self.border
-                cell.alignment = self.wrap_alignment
+            wb.save(writer)
         
-        # Adjust column widths
-        ws.column_dimensions['A'].width = 5
-        ws.column_dimensions['B'].width = 12
-        ws.column_dimensions['C'].width = 50
-        ws.column_dimensions['D'].width = 50
-        ws.column_dimensions['E'].width = 40
+        return iter_writer_output(produce)
+    
+    def _register_named_styles(self, wb: Workbook) -> Dict[str, str]:
+        """Register the shared named styles used by the write-only sheets."""
+        named_styles = [
+            NamedStyle(name='sql_header', font=self.header_font, fill=self.header_fill,
+                       border=self.border,
+                       alignment=Alignment(horizontal='center', vertical='center')),
+            NamedStyle(name='sql_cell', border=self.border, alignment=self.wrap_alignment),
+            NamedStyle(name='sql_success', fill=self.success_fill, border=self.border,
+                       alignment=self.wrap_alignment),
+            NamedStyle(name='sql_error', fill=self.error_fill, border=self.border,
+                       alignment=self.wrap_alignment),
+            NamedStyle(name='sql_skipped', fill=self.skipped_fill, border=self.border,
+                       alignment=self.wrap_alignment),
+            NamedStyle(name='sql_title', font=Font(size=18, bold=True, color='1a1a2e')),
+            NamedStyle(name='sql_section', font=Font(size=14, bold=True, color='667eea')),
+            NamedStyle(name='sql_label', font=Font(bold=True)),
+            NamedStyle(name='sql_success_value', fill=self.success_fill),
+            NamedStyle(name='sql_error_value', fill=self.error_fill),
+            NamedStyle(name='sql_skipped_value', fill=self.skipped_fill),
+        ]
+        
+        for style in named_styles:
+            wb.add_named_style(style)
+        
+        return {style.name.replace('sql_', ''): style.name for style in named_styles}
+    
+    def _styled(self, ws, value, style: str) -> WriteOnlyCell:
+        """Create a write-only cell with a named style."""
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+    
+    def _write_summary_sheet(
+        self, 
+        wb: Workbook, 
+        styles: Dict[str, str],
+        results: List[Dict],
+        source_dialect: str,
+        target_dialect: str
+    ):
+        """Write the summary sheet in write-only mode."""
+        ws = wb.create_sheet("Summary")
+        ws.column_dimensions['A'].width = 25
+        ws.column_dimensions['B'].width = 25
+        ws.merged_cells.add('A1:D1')
+        ws.merged_cells.add('A7:B7')
+        
+        success_count, error_count, skipped_count = self._count_statuses(results)
+        
+        ws.append([self._styled(ws, "SQL Dialect Conversion Report", styles['title'])])
+        ws.append([])
+        ws.append([self._styled(ws, "Source Dialect:", styles['label']), source_dialect])
+        ws.append([self._styled(ws, "Target Dialect:", styles['label']), target_dialect])
+        ws.append([self._styled(ws, "Generated:", styles['label']),
+                   datetime.now().strftime("%Y-%m-%d %H:%M:%S")])
+        ws.append([])
+        ws.append([self._styled(ws, "Statistics", styles['section'])])
+        ws.append([])
+        
+        ws.append([self._styled(ws, "Total Statements", styles['label']), len(results)])
+        ws.append([self._styled(ws, "Successfully Converted", styles['label']),
+                   self._styled(ws, success_count, styles['success_value'])])
+        ws.append([self._styled(ws, "Errors", styles['label']),
+                   self._styled(ws, error_count, styles['error_value'])])
+        ws.append([self._styled(ws, "Skipped", styles['label']),
+                   self._styled(ws, skipped_count, styles['skipped_value'])])
+        ws.append([self._styled(ws, "Success Rate", styles['label']),
+                   self._success_rate(success_count, error_count)])
+    
+    def _write_results_sheet(
+        self, 
+        wb: Workbook, 
+        styles: Dict[str, str],
+        results: List[Dict],
+        source_dialect: str,
+        target_dialect: str
+    ):
+        """Write the detailed results sheet row by row in write-only mode."""
+        ws = wb.create_sheet("Conversion Results")
+        
+        for column, width in self.result_column_widths.items():
+            ws.column_dimensions[column].width = width
         
         # Freeze header row
         ws.freeze_panes = 'A2'
+        
+        headers = ["#", "Status", f"Original SQL ({source_dialect})", 
+                   f"Converted SQL ({target_dialect})", "Notes"]
+        ws.append([self._styled(ws, header, styles['header']) for header in headers])
+        
+        cell_style = styles['cell']
+        
+        for row_idx, result in enumerate(results, 1):
+            if result['status'] == 'success':
+                status = self._styled(ws, "✓ Success", styles['success'])
+            elif result['status'] == 'skipped':
+                status = self._styled(ws, "– Skipped", styles['skipped'])
+            else:
+                status = self._styled(ws, "✗ Error", styles['error'])
+            
+            ws.append([
+                self._styled(ws, result.get('id') or row_idx, cell_style),
+                status,
+                self._styled(ws, result['original'], cell_style),
+                self._styled(ws, result.get('converted', ''), cell_style),
+                self._styled(ws, result.get('notes', ''), cell_style)
+            ])
@@ -0,0 +1,172 @@
+from datetime import datetime
+from typing import List, Dict, Iterator, Tuple
+import json
+import re
+import zipfile
+
+from utils.statement import Statement
+from utils.streaming import iter_writer_output
+
+
+class MigrationGenerator:
+    """
+    Generator for SQL exports split into numbered migration files.
+
+    Converted statements are written to a ZIP with one file per run of
+    consecutive statements on the same database object (or per statement),
+    numbered in the order of the results, plus a
+    manifest.json that lists the files, the objects they touch and the
+    statements that could not be converted.
+    """
+
+    SPLIT_MODES = ('object', 'statement')
+
+    def __init__(self, split_by: str = 'object'):
+        """
+        Initialize the migration generator.
+
+        Args:
+            split_by: 'object' to group consecutive statements on the same
+                object type and name, or 'statement' for one file per statement
+        """
+        if split_by not in self.SPLIT_MODES:
+            raise ValueError(f"Unsupported split mode: {split_by}")
+
+        self.split_by = split_by
+
+    def generate_stream(
+        self,
+        results: List[Dict],
+        source_dialect: str,
+        target_dialect: str
+    ) -> Iterator[bytes]:
+        """
+        Stream a ZIP of migration files.
+
+        Args:
+            results: List of conversion results
+            source_dialect: Source SQL dialect
+            target_dialect: Target SQL dialect
+
+        Yields:
+            Chunks of the ZIP file
+        """
+        def produce(writer):
+            groups, failed, skipped = self._group_results(results)
+            width = max(4, len(str(len(groups))))
+            manifest_files = []
+
+            with zipfile.ZipFile(writer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+                for number, (key, members) in enumerate(groups, 1):
+                    object_type, object_name = key[0], key[1]
+                    filename = self._file_name(number, width, object_type, object_name)
+
+                    archive.writestr(filename, self._file_content(
+                        number, object_type, object_name, members,
+                        source_dialect, target_dialect
+                    ))
+
+                    manifest_files.append({
+                        "order": number,
+                        "file": filename,
+                        "object_type": object_type,
+                        "object_name": object_name,
+                        "statements": [label for label, _ in members]
+                    })
+
+                manifest = {
+                    "source_dialect": source_dialect,
+                    "target_dialect": target_dialect,
+                    "generated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "split_by": self.split_by,
+                    "files": manifest_files,
+                    "failed": failed,
+                    "skipped": skipped
+                }
+                archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+
+        return iter_writer_output(produce)
+
+    def _group_results(
+        self, results: List[Dict]
+    ) -> Tuple[List[Tuple[Tuple, List]], List[Dict], List[Dict]]:
+        """
+        Group successful conversions into migration files.
+
+        Only consecutive statements on the same object share a file, so no
+        statement is moved ahead of the ones before it: a later ALTER or
+        DROP of an object gets its own file after whatever came in between.
+
+        Returns:
+            List of (group key, list of (label, converted_sql) pairs) in
+            result order, and the lists of failed and skipped statements
+            for the manifest. Keys start with (object_type, object_name);
+            per-statement keys also hold the statement label.
+        """
+        groups: List[Tuple[Tuple, List]] = []
+        failed = []
+        skipped = []
+
+        for i, result in enumerate(results, 1):
+            # Caller-supplied statement IDs take the place of the running number
+            label = str(result.get('id') or i)
+
+            if result['status'] == 'skipped':
+                skipped.append({"statement": label, "reason": result.get('notes') or ''})
+                continue
+            if result['status'] != 'success' or not result.get('converted'):
+                failed.append({"statement": label, "error": result.get('notes', 'Unknown error')})
+                continue
+
+            converted = result['converted'].strip()
+            object_type, object_name = Statement(converted).object
+
+            if self.split_by == 'statement':
+                key = (object_type, object_name, label)
+            else:
+                key = (object_type, object_name)
+
+            if groups and groups[-1][0] == key:
+                groups[-1][1].append((label, converted))
+            else:
+                groups.append((key, [(label, converted)]))
+
+        return groups, failed, skipped
+
+    def _file_name(self, number: int, width: int, object_type: str, object_name) -> str:
+        """Build a sortable, filesystem-safe migration file name."""
+        name = re.sub(r'[^A-Za-z0-9]+', '_', (object_name or 'statement').lower()).strip('_')
+        return f"{number:0{width}d}_{object_type}_{name[:60] or 'statement'}.sql"
+
+    def _file_content(
+        self,
+        number: int,
+        object_type: str,
+        object_name,
+        members: List[Tuple[str, str]],
+        source_dialect: str,
+        target_dialect: str
+    ) -> str:
+        """Build the text of one migration file."""
+        labels = [label for label, _ in members]
+        if len(labels) > 20:
+            # Keep the banner short for bulk data files; the manifest has the full list
+            statements = f"{len(labels)} statements ({labels[0]} .. {labels[-1]})"
+        else:
+            statements = ', '.join(labels)
+
+        lines = [
+            f"-- Migration {number}: {object_type} {object_name or ''}".rstrip(),
+            f"-- Converted from {source_dialect} to {target_dialect}",
+            f"-- Statements: {statements}",
+            ""
+        ]
+
+        for label, converted in members:
+            # Ensure statements end with semicolon
+            if not converted.endswith(';'):
+                converted += ';'
+            lines.append(converted)
+            lines.append("")
+
+        return "\n".join(lines)
@@ -2,21 +2,91 @@ from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Preformatted
 from reportlab.lib.enums import TA_LEFT, TA_CENTER
-from typing import List, Dict
+from typing import List, Dict, Iterator
 from datetime import datetime
 import io
 
+from utils.streaming import iter_writer_output
+
+# Heading colour and label per result status; anything else is an error
+_STATUS_LABELS = {
+    'success': ('#10b981', '✓ Success'),
+    'skipped': ('#f59e0b', '– Skipped'),
+}
+_ERROR_LABEL = ('#ef4444', '✗ Error')
+
+
+class _CodeBlock(Preformatted):
+    """
+    Preformatted SQL block with a shaded, bordered background.
+    
+    Much cheaper than a markup-parsed Paragraph: the text is laid out
+    line by line with no XML parsing or escaping.
+    """
+    
+    def draw(self):
+        style = self.style
+        padding = style.borderPadding
+        self.canv.saveState()
+        self.canv.setFillColor(style.backColor)
+        self.canv.setStrokeColor(style.borderColor)
+        self.canv.setLineWidth(style.borderWidth)
+        self.canv.rect(
+            style.leftIndent - padding,
+            -padding,
+            self.width - style.leftIndent - style.rightIndent + 2 * padding,
+            self.height + 2 * padding,
+            stroke=1,
+            fill=1
+        )
+        self.canv.restoreState()
+        Preformatted.draw(self)
+    
+    def split(self, availWidth, availHeight):
+        # Keep the shading on both halves of a block split across pages
+        return [_CodeBlock('\n'.join(part.lines), part.style)
+                for part in Preformatted.split(self, availWidth, availHeight)]
+
+
+class _LazyStory(list):
+    """
+    Story list that refills itself from an iterator of flowable chunks.
+    
+    reportlab consumes the story from the front while laying out pages,
+    so only the current chunk of flowables is ever held in memory.
+    """
+    
+    def __init__(self, chunks: Iterator[List]):
+        super().__init__()
+        self._chunks = chunks
+    
+    def __len__(self):
+        while not list.__len__(self):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self.extend(chunk)
+        return list.__len__(self)
+
+
 class PDFGenerator:
     """
     Generator for creating PDF files with SQL conversion results.
     Uses reportlab for professional PDF generation.
     """
     
+    # Stylesheet built once per process and shared by all instances
+    _shared_styles = None
+    
     def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self._create_custom_styles()
+        if PDFGenerator._shared_styles is None:
+            self.styles = getSampleStyleSheet()
+            self._create_custom_styles()
+            PDFGenerator._shared_styles = self.styles
+        else:
+            self.styles = PDFGenerator._shared_styles
     
     def _create_custom_styles(self):
         """Create custom paragraph styles for the PDF."""
@@ -66,6 +136,23 @@ class PDFGenerator:
             spaceAfter=5
         ))
         
+        # Preformatted SQL block style (large reports)
+        self.styles.add(ParagraphStyle(
+            name='SQLBlock',
+            parent=self.styles['Code'],
+            fontSize=9,
+            leading=11,
+            fontName='Courier',
+            backColor=colors.HexColor('#f5f5f5'),
+            borderColor=colors.HexColor('#e0e0e0'),
+            borderWidth=1,
+            borderPadding=6,
+            leftIndent=10,
+            rightIndent=10,
+            spaceBefore=10,
+            spaceAfter=10
+        ))
+        
         # Notes style
         self.styles.add(ParagraphStyle(
             name='Notes',
@@ -106,6 +193,174 @@ class PDFGenerator:
         )
         
         # Build PDF content
+        story = self._build_header(results, source_dialect, target_dialect)
+        
+        for i, result in enumerate(results, 1):
+            # Statement header
+            status_color, status_text = _STATUS_LABELS.get(result['status'], _ERROR_LABEL)
+            
+            # Caller-supplied statement IDs take the place of the running number
+            label = self._escape_sql(str(result.get('id') or i))
+            story.append(Paragraph(
+                f"<b>Statement {label}</b> <font color='{status_color}'>[{status_text}]</font>",
+                self.styles['Heading3']
+            ))
+            
+            # Original SQL
+            story.append(Paragraph("<b>Original SQL:</b>", self.styles['Normal']))
+            original_sql = self._escape_sql(result['original'])
+            story.append(Paragraph(f"<font face='Courier' size='9'>{original_sql}</font>", self.styles['SQLCode']))
+            
+            story.append(Spacer(1, 10))
+            
+            # Converted SQL
+            if result['status'] == 'success':
+                story.append(Paragraph("<b>Converted SQL:</b>", self.styles['Normal']))
+                converted_sql = self._escape_sql(result['converted'])
+                story.append(Paragraph(f"<font face='Courier' size='9'>{converted_sql}</font>", self.styles['SQLCode']))
+            elif result['status'] == 'skipped':
+                story.append(Paragraph("<b>Not converted:</b>", self.styles['Normal']))
+                story.append(Paragraph(self._escape_sql(result.get('notes') or ''), self.styles['Notes']))
+            else:
+                story.append(Paragraph("<b>Error:</b>", self.styles['Normal']))
+                story.append(Paragraph(result['notes'], self.styles['Notes']))
+            
+            # Notes
+            if result['status'] == 'success' and result.get('notes'):
+                story.append(Spacer(1, 5))
+                story.append(Paragraph(f"<i>Notes: {result['notes']}</i>", self.styles['Notes']))
+            
+            story.append(Spacer(1, 20))
+            
+            # Add page break every 3 statements
+            if i % 3 == 0 and i < len(results):
+                story.append(PageBreak())
+        
+        # Build PDF
+        doc.build(story)
+        buffer.seek(0)
+        
+        return buffer
+    
+    def generate_stream(
+        self, 
+        results: List[Dict], 
+        source_dialect: str, 
+        target_dialect: str,
+        chunk_size: int = 200
+    ) -> Iterator[bytes]:
+        """
+        Stream a PDF report for very large result sets.
+        
+        Flowables are produced chunk by chunk while reportlab lays out the
+        pages, so the full story never exists in memory. SQL is drawn with
+        preformatted code blocks instead of markup-parsed paragraphs, page
+        content is compressed, and the finished file is handed out in chunks.
+        
+        Args:
+            results: List of conversion results
+            source_dialect: Source SQL dialect
+            target_dialect: Target SQL dialect
+            chunk_size: Statements laid out per story chunk
+            
+        Yields:
+            Chunks of the PDF file
+        """
+        def produce(writer):
+            doc = SimpleDocTemplate(
+                writer,
+                pagesize=letter,
+                rightMargin=72,
+                leftMargin=72,
+                topMargin=72,
+                bottomMargin=72,
+                pageCompression=1
+            )
+            
+            code_style = self.styles['SQLBlock']
+            code_width = doc.width - code_style.leftIndent - code_style.rightIndent
+            # Courier glyphs are 0.6 em wide
+            max_line_length = int(code_width / (code_style.fontSize * 0.6))
+            
+            chunks = self._iter_story_chunks(
+                results, source_dialect, target_dialect, chunk_size, max_line_length
+            )
+            doc.build(_LazyStory(chunks))
+        
+        return iter_writer_output(produce)
+    
+    def _iter_story_chunks(
+        self, 
+        results: List[Dict], 
+        source_dialect: str, 
+        target_dialect: str,
+        chunk_size: int,
+        max_line_length: int
+    ) -> Iterator[List]:
+        """Yield the report story in chunks of statements."""
+        yield self._build_header(results, source_dialect, target_dialect)
+        
+        chunk = []
+        
+        for i, result in enumerate(results, 1):
+            chunk.extend(self._statement_flowables(i, result, max_line_length))
+            
+            # Add page break every 3 statements
+            if i % 3 == 0 and i < len(results):
+                chunk.append(PageBreak())
+            
+            if i % chunk_size == 0:
+                yield chunk
+                chunk = []
+        
+        if chunk:
+            yield chunk
+    
+    def _statement_flowables(self, index: int, result: Dict, max_line_length: int) -> List:
+        """Build the cheap flowables for one statement in a large report."""
+        flowables = []
+        code_style = self.styles['SQLBlock']
+        
+        status_color, status_text = _STATUS_LABELS.get(result['status'], _ERROR_LABEL)
+        
+        label = self._escape_sql(str(result.get('id') or index))
+        flowables.append(Paragraph(
+            f"<b>Statement {label}</b> <font color='{status_color}'>[{status_text}]</font>",
+            self.styles['Heading3']
+        ))
+        
+        flowables.append(Paragraph("<b>Original SQL:</b>", self.styles['Normal']))
+        flowables.append(_CodeBlock(result['original'] or '', code_style,
+                                    maxLineLength=max_line_length))
+        
+        if result['status'] == 'success':
+            flowables.append(Paragraph("<b>Converted SQL:</b>", self.styles['Normal']))
+            flowables.append(_CodeBlock(result['converted'] or '', code_style,
+                                        maxLineLength=max_line_length))
+            
+            if result.get('notes'):
+                flowables.append(Spacer(1, 5))
+                flowables.append(Paragraph(
+                    f"<i>Notes: {self._escape_sql(result['notes'])}</i>",
+                    self.styles['Notes']
+                ))
+        elif result['status'] == 'skipped':
+            flowables.append(Paragraph("<b>Not converted:</b>", self.styles['Normal']))
+            flowables.append(Paragraph(self._escape_sql(result.get('notes') or ''), self.styles['Notes']))
+        else:
+            flowables.append(Paragraph("<b>Error:</b>", self.styles['Normal']))
+            flowables.append(Paragraph(self._escape_sql(result.get('notes', '')), self.styles['Notes']))
+        
+        flowables.append(Spacer(1, 20))
+        return flowables
+    
+    def _build_header(
+        self, 
+        results: List[Dict], 
+        source_dialect: str, 
+        target_dialect: str
+    ) -> List:
+        """Build the title, summary table and details heading."""
         story = []
         
         # Title
@@ -122,13 +377,15 @@ class PDFGenerator:
         
         # Summary table
         success_count = sum(1 for r in results if r['status'] == 'success')
-        error_count = len(results) - success_count
+        skipped_count = sum(1 for r in results if r['status'] == 'skipped')
+        error_count = len(results) - success_count - skipped_count
         
         summary_data = [
             ['Summary', ''],
             ['Total Statements', str(len(results))],
             ['Successfully Converted', str(success_count)],
-            ['Errors', str(error_count)]
+            ['Errors', str(error_count)],
+            ['Skipped', str(skipped_count)]
         ]
         
         summary_table = Table(summary_data, colWidths=[2.5*inch, 1.5*inch])
@@ -152,48 +409,7 @@ class PDFGenerator:
         story.append(Paragraph("Conversion Details", self.styles['SectionHeader']))
         story.append(Spacer(1, 10))
         
-        for i, result in enumerate(results, 1):
-            # Statement header
-            status_color = '#10b981' if result['status'] == 'success' else '#ef4444'
-            status_text = '✓ Success' if result['status'] == 'success' else '✗ Error'
-            
-            story.append(Paragraph(
-                f"<b>Statement {i}</b> <font color='{status_color}'>[{status_text}]</font>",
-                self.styles['Heading3']
-            ))
-            
-            # Original SQL
-            story.append(Paragraph("<b>Original SQL:</b>", self.styles['Normal']))
-            original_sql = self._escape_sql(result['original'])
-            story.append(Paragraph(f"<font face='Courier' size='9'>{original_sql}</font>", self.styles['SQLCode']))
-            
-            story.append(Spacer(1, 10))
-            
-            # Converted SQL
-            if result['status'] == 'success':
-                story.append(Paragraph("<b>Converted SQL:</b>", self.styles['Normal']))
-                converted_sql = self._escape_sql(result['converted'])
-                story.append(Paragraph(f"<font face='Courier' size='9'>{converted_sql}</font>", self.styles['SQLCode']))
-            else:
-                story.append(Paragraph("<b>Error:</b>", self.styles['Normal']))
-                story.append(Paragraph(result['notes'], self.styles['Notes']))
-            
-            # Notes
-            if result['status'] == 'success' and result.get('notes'):
-                story.append(Spacer(1, 5))
-                story.append(Paragraph(f"<i>Notes: {result['notes']}</i>", self.styles['Notes']))
-            
-            story.append(Spacer(1, 20))
-            
-            # Add page break every 3 statements
-            if i % 3 == 0 and i < len(results):
-                story.append(PageBreak())
-        
-        # Build PDF
-        doc.build(story)
-        buffer.seek(0)
-        
-        return buffer
+        return story
     
     def _escape_sql(self, sql: str) -> str:
         """Escape special characters for XML/HTML in reportlab."""
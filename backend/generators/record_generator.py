@@ -0,0 +1,155 @@
+from typing import List, Dict, Iterator
+import io
+import json
+
+from utils.streaming import iter_writer_output
+
+# Columns written for every result, in order
+RECORD_FIELDS = ('id', 'status', 'original', 'converted', 'notes', 'model', 'duration_ms')
+
+
+class RecordGenerator:
+    """
+    Generator for machine-readable exports: NDJSON and Parquet.
+
+    Writes one flat record per result with statement ID, status, original
+    and converted SQL, notes, the model that answered and the conversion
+    time, for downstream tooling that should not have to scrape Excel.
+    Both formats are produced as a stream.
+    """
+
+    FORMATS = ('ndjson', 'parquet')
+
+    def __init__(self, record_format: str = 'ndjson', batch_size: int = 10000):
+        """
+        Initialize the record generator.
+
+        Args:
+            record_format: 'ndjson' or 'parquet'
+            batch_size: Results per Parquet row group
+        """
+        if record_format not in self.FORMATS:
+            raise ValueError(f"Unsupported record format: {record_format}")
+
+        self.record_format = record_format
+        self.batch_size = batch_size
+
+    def generate(
+        self,
+        results: List[Dict],
+        source_dialect: str,
+        target_dialect: str,
+        filename: str = None
+    ) -> io.BytesIO:
+        """
+        Generate a record file with conversion results.
+
+        Args:
+            results: List of conversion results
+            source_dialect: Source SQL dialect
+            target_dialect: Target SQL dialect
+            filename: Optional filename (for metadata)
+
+        Returns:
+            BytesIO buffer containing the file
+        """
+        buffer = io.BytesIO()
+
+        for chunk in self.generate_stream(results, source_dialect, target_dialect):
+            buffer.write(chunk)
+
+        buffer.seek(0)
+
+        return buffer
+
+    def generate_stream(
+        self,
+        results: List[Dict],
+        source_dialect: str,
+        target_dialect: str,
+        chunk_size: int = 64 * 1024
+    ) -> Iterator[bytes]:
+        """
+        Stream a record file with conversion results.
+
+        Args:
+            results: List of conversion results
+            source_dialect: Source SQL dialect
+            target_dialect: Target SQL dialect
+            chunk_size: Approximate size of the yielded NDJSON chunks
+
+        Yields:
+            Chunks of the file
+        """
+        if self.record_format == 'parquet':
+            return self._parquet_stream(results, source_dialect, target_dialect)
+        return self._ndjson_stream(results, chunk_size)
+
+    def _ndjson_stream(self, results: List[Dict], chunk_size: int) -> Iterator[bytes]:
+        """Yield one JSON object per line, grouped into chunks."""
+        pending = []
+        pending_size = 0
+
+        for record in self._iter_records(results):
+            line = json.dumps(record, ensure_ascii=False, default=str).encode('utf-8') + b'\n'
+            pending.append(line)
+            pending_size += len(line)
+
+            if pending_size >= chunk_size:
+                yield b''.join(pending)
+                pending = []
+                pending_size = 0
+
+        if pending:
+            yield b''.join(pending)
+
+    def _parquet_stream(
+        self,
+        results: List[Dict],
+        source_dialect: str,
+        target_dialect: str
+    ) -> Iterator[bytes]:
+        """Write Parquet row groups batch by batch into the output stream."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet export requires pyarrow (pip install pyarrow)")
+
+        schema = pa.schema(
+            [(field, pa.string()) for field in RECORD_FIELDS[:-1]]
+            + [('duration_ms', pa.float64())],
+            metadata={
+                'source_dialect': source_dialect,
+                'target_dialect': target_dialect
+            }
+        )
+
+        def produce(writer):
+            with pq.ParquetWriter(writer, schema, compression='snappy') as parquet_writer:
+                batch = []
+                for record in self._iter_records(results):
+                    batch.append(record)
+                    if len(batch) >= self.batch_size:
+                        parquet_writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                        batch = []
+
+                if batch:
+                    parquet_writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+
+        return iter_writer_output(produce)
+
+    def _iter_records(self, results: List[Dict]) -> Iterator[Dict]:
+        """Flatten results into records with a fixed set of fields."""
+        for i, result in enumerate(results, 1):
+            duration = result.get('duration_ms')
+
+            yield {
+                'id': str(result.get('id') or i),
+                'status': result.get('status'),
+                'original': result.get('original'),
+                'converted': result.get('converted'),
+                'notes': result.get('notes'),
+                'model': result.get('model'),
+                'duration_ms': float(duration) if duration is not None else None
+            }
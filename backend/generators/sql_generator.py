@@ -1,6 +1,13 @@
-from typing import List, Dict
+from typing import List, Dict, Iterator, Union
 from datetime import datetime
 import io
+import re
+
+# Start of the summary footer, used to find where statement blocks end
+_FOOTER_MARKER = (
+    b"-- ============================================================================\n"
+    b"-- CONVERSION SUMMARY"
+)
 
 class SQLGenerator:
     """
@@ -30,38 +37,202 @@ class SQLGenerator:
         Returns:
             BytesIO buffer containing the SQL file
         """
-        lines = []
+        buffer = io.BytesIO()
         
-        # Header comment block
-        lines.append(self._create_header_block(source_dialect, target_dialect, len(results)))
-        lines.append("")
+        for chunk in self.generate_stream(results, source_dialect, target_dialect):
+            buffer.write(chunk)
         
-        # Process each result
-        success_count = 0
-        error_count = 0
+        buffer.seek(0)
         
-        for i, result in enumerate(results, 1):
-            if result['status'] == 'success':
-                success_count += 1
-                lines.append(self._format_successful_conversion(i, result))
-            else:
-                error_count += 1
-                lines.append(self._format_failed_conversion(i, result))
+        return buffer
+    
+    def generate_stream(
+        self, 
+        results: List[Dict], 
+        source_dialect: str, 
+        target_dialect: str,
+        chunk_size: int = 64 * 1024
+    ) -> Iterator[bytes]:
+        """
+        Stream a SQL file with conversion results.
+        
+        Header, statement blocks and footer are encoded and yielded as they
+        are formatted; summary counts are tallied in the same pass, so
+        memory use does not grow with the number of statements.
+        
+        Args:
+            results: List of conversion results
+            source_dialect: Source SQL dialect
+            target_dialect: Target SQL dialect
+            chunk_size: Approximate size of the yielded chunks
+            
+        Yields:
+            UTF-8 encoded chunks of the SQL file
+        """
+        return self._encode_blocks(
+            self._iter_blocks(results, source_dialect, target_dialect), chunk_size
+        )
+    
+    def append_stream(
+        self, 
+        base_file, 
+        results: List[Dict], 
+        source_dialect: str, 
+        target_dialect: str,
+        chunk_size: int = 64 * 1024
+    ) -> Iterator[bytes]:
+        """
+        Stream a previously generated SQL file extended with new results.
+        
+        The existing statement blocks are copied byte for byte; only the
+        header, the new blocks and the footer are formatted, and the
+        summary counts continue from the ones in the base file's footer.
+        
+        Args:
+            base_file: Open binary file of a SQL file produced by this
+                generator; it is closed once copied. Opened by the caller
+                so the file cannot be evicted from the export cache
+                before streaming starts.
+            results: Results added since the base file was generated
+            source_dialect: Source SQL dialect
+            target_dialect: Target SQL dialect
+            chunk_size: Approximate size of the yielded chunks
+            
+        Yields:
+            UTF-8 encoded chunks of the extended SQL file
+        """
+        with base_file:
+            summary = self.read_summary(base_file)
             
-            lines.append("")  # Blank line between statements
+            header = self._create_header_block(
+                source_dialect, target_dialect, summary['total'] + len(results)
+            )
+            yield (header + "\n\n").encode('utf-8')
+            
+            # Existing statement blocks, unchanged
+            base_file.seek(summary['body_start'])
+            remaining = summary['body_end'] - summary['body_start']
+            while remaining > 0:
+                chunk = base_file.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
         
-        # Footer with summary
-        lines.append(self._create_footer_block(success_count, error_count))
+        counts = {key: summary[key] for key in ('success', 'error', 'skipped')}
+        blocks = self._iter_statement_blocks(results, counts, start=summary['total'] + 1)
+        yield from self._encode_blocks(blocks, chunk_size)
         
-        # Join all lines
-        content = "\n".join(lines)
+        yield self._create_footer_block(**counts).encode('utf-8')
+    
+    def read_summary(self, file) -> Dict:
+        """
+        Read the summary of a SQL file produced by this generator.
         
-        # Convert to bytes and return buffer
-        buffer = io.BytesIO()
-        buffer.write(content.encode('utf-8'))
-        buffer.seek(0)
+        Only the header and footer are read, not the statement blocks.
         
-        return buffer
+        Args:
+            file: Seekable binary file object
+            
+        Returns:
+            Dict with 'total', 'success', 'error' and 'skipped' counts and the
+            'body_start'/'body_end' byte offsets of the statement blocks
+            
+        Raises:
+            ValueError: If the file does not look like a generated SQL file
+        """
+        file.seek(0, io.SEEK_END)
+        size = file.tell()
+        
+        file.seek(0)
+        head = file.read(min(size, 8192))
+        header_end = head.find(b"\n\n")
+        
+        tail_start = max(0, size - 8192)
+        file.seek(tail_start)
+        tail = file.read()
+        footer_start = tail.rfind(_FOOTER_MARKER)
+        
+        if header_end < 0 or footer_start < 0:
+            raise ValueError("Not a SQL file generated by this tool")
+        
+        footer = tail[footer_start:].decode('utf-8')
+        counts = {}
+        for key, label in (('total', 'Total Statements Processed'),
+                           ('success', 'Successfully Converted'),
+                           ('error', 'Failed Conversions')):
+            match = re.search(rf'^-- {label}: (\d+)$', footer, re.MULTILINE)
+            if not match:
+                raise ValueError("SQL file footer has no conversion summary")
+            counts[key] = int(match.group(1))
+        
+        # Files written before skipped results were counted have no such line
+        match = re.search(r'^-- Skipped \(Not Converted\): (\d+)$', footer, re.MULTILINE)
+        counts['skipped'] = int(match.group(1)) if match else 0
+        
+        counts['body_start'] = header_end + 2
+        counts['body_end'] = tail_start + footer_start
+        return counts
+    
+    def _encode_blocks(self, blocks: Iterator[str], chunk_size: int) -> Iterator[bytes]:
+        """Encode text blocks, grouping small ones into larger chunks."""
+        pending = []
+        pending_size = 0
+        
+        for block in blocks:
+            data = block.encode('utf-8')
+            pending.append(data)
+            pending_size += len(data)
+            
+            # Group small blocks so the response is not sent line by line
+            if pending_size >= chunk_size:
+                yield b''.join(pending)
+                pending = []
+                pending_size = 0
+        
+        if pending:
+            yield b''.join(pending)
+    
+    def _iter_blocks(
+        self, 
+        results: List[Dict], 
+        source_dialect: str, 
+        target_dialect: str
+    ) -> Iterator[str]:
+        """Yield the text blocks of the SQL file in order."""
+        # Header comment block
+        yield self._create_header_block(source_dialect, target_dialect, len(results))
+        yield "\n\n"
+        
+        # Process each result
+        counts = {'success': 0, 'error': 0, 'skipped': 0}
+        yield from self._iter_statement_blocks(results, counts)
+        
+        # Footer with summary
+        yield self._create_footer_block(**counts)
+    
+    def _iter_statement_blocks(
+        self, 
+        results: List[Dict], 
+        counts: Dict[str, int], 
+        start: int = 1
+    ) -> Iterator[str]:
+        """Yield one block per result, tallying statuses into counts."""
+        for i, result in enumerate(results, start):
+            # Caller-supplied statement IDs take the place of the running number
+            label = result.get('id') or i
+            
+            if result['status'] == 'success':
+                counts['success'] += 1
+                yield self._format_successful_conversion(label, result)
+            elif result['status'] == 'skipped':
+                counts['skipped'] += 1
+                yield self._format_skipped_statement(label, result)
+            else:
+                counts['error'] += 1
+                yield self._format_failed_conversion(label, result)
+            
+            yield "\n\n"  # Blank line between statements
     
     def _create_header_block(
         self, 
@@ -87,7 +258,7 @@ class SQLGenerator:
         
         return header
     
-    def _format_successful_conversion(self, index: int, result: Dict) -> str:
+    def _format_successful_conversion(self, index: Union[int, str], result: Dict) -> str:
         """Format a successfully converted statement."""
         original = result['original'].strip()
         converted = result['converted'].strip()
@@ -110,7 +281,7 @@ class SQLGenerator:
         
         return block
     
-    def _format_failed_conversion(self, index: int, result: Dict) -> str:
+    def _format_failed_conversion(self, index: Union[int, str], result: Dict) -> str:
         """Format a failed conversion."""
         original = result['original'].strip()
         error = result.get('notes', 'Unknown error')
@@ -123,6 +294,23 @@ class SQLGenerator:
 -- Original Statement (could not be converted):
 /*
 {original}
+*/"""
+        
+        return block
+    
+    def _format_skipped_statement(self, index: Union[int, str], result: Dict) -> str:
+        """Format a statement that was not sent for conversion."""
+        original = result['original'].strip()
+        reason = result.get('notes') or 'No reason given'
+        
+        block = f"""-- ----------------------------------------------------------------------------
+-- Statement {index} - SKIPPED
+-- ----------------------------------------------------------------------------
+-- Reason: {reason}
+-- ----------------------------------------------------------------------------
+-- Original Statement (not converted):
+/*
+{original}
 */"""
         
         return block
@@ -133,18 +321,21 @@ class SQLGenerator:
         indented = [prefix + line if i > 0 else line for i, line in enumerate(lines)]
         return '\n'.join(indented)
     
-    def _create_footer_block(self, success_count: int, error_count: int) -> str:
+    def _create_footer_block(self, success: int, error: int, skipped: int = 0) -> str:
         """Create the footer summary block."""
-        total = success_count + error_count
-        success_rate = (success_count / total * 100) if total > 0 else 0
+        total = success + error + skipped
+        # Skipped statements were never attempted, so they don't count against the rate
+        attempted = success + error
+        success_rate = (success / attempted * 100) if attempted > 0 else 0
         
         footer = f"""-- ============================================================================
 -- CONVERSION SUMMARY
 -- ============================================================================
 -- 
 -- Total Statements Processed: {total}
--- Successfully Converted: {success_count}
--- Failed Conversions: {error_count}
+-- Successfully Converted: {success}
+-- Failed Conversions: {error}
+-- Skipped (Not Converted): {skipped}
 -- Success Rate: {success_rate:.1f}%
 -- 
 -- ============================================================================
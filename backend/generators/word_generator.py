@@ -4,9 +4,37 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.table import WD_TABLE_ALIGNMENT
 from docx.oxml.ns import qn
 from docx.oxml import OxmlElement
-from typing import List, Dict
+from typing import List, Dict, Iterator
 from datetime import datetime
+from xml.sax.saxutils import escape
 import io
+import re
+import zipfile
+
+from utils.streaming import iter_writer_output
+
+# Characters that are not allowed in WordprocessingML text
+_INVALID_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# Width of the text block (8.5in page, 1in margins) in twentieths of a point
+_TEXT_WIDTH_TWIPS = 9360
+
+# Precompiled WordprocessingML fragments for the fast writer
+_PARAGRAPH_XML = '<w:p>{ppr}{runs}</w:p>'
+_STYLED_PPR_XML = '<w:pPr><w:pStyle w:val="{style}"/>{jc}</w:pPr>'
+_RUN_XML = '<w:r>{rpr}<w:t xml:space="preserve">{text}</w:t></w:r>'
+_PAGE_BREAK_XML = '<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+_CODE_RPR_XML = '<w:rPr><w:rFonts w:ascii="Courier New" w:hAnsi="Courier New"/><w:sz w:val="18"/></w:rPr>'
+_CODE_BLOCK_XML = (
+    '<w:tbl><w:tblPr><w:tblStyle w:val="TableGrid"/><w:tblW w:w="0" w:type="auto"/>'
+    '<w:tblLook w:val="04A0" w:firstRow="1" w:lastRow="0" w:firstColumn="1" '
+    'w:lastColumn="0" w:noHBand="0" w:noVBand="1"/></w:tblPr>'
+    '<w:tblGrid><w:gridCol w:w="%d"/></w:tblGrid><w:tr><w:tc><w:tcPr>'
+    '<w:tcW w:w="%d" w:type="dxa"/><w:shd w:val="clear" w:color="auto" w:fill="F5F5F5"/>'
+    '</w:tcPr><w:p><w:r>' % (_TEXT_WIDTH_TWIPS, _TEXT_WIDTH_TWIPS)
+    + _CODE_RPR_XML + '{text}</w:r></w:p></w:tc></w:tr></w:tbl>'
+)
+
 
 class WordGenerator:
     """
@@ -14,10 +42,15 @@ class WordGenerator:
     Uses python-docx for professional document generation.
     """
     
+    # Package parts and document.xml head/tail of the blank template,
+    # built once per process for the fast writer
+    _template = None
+    
     def __init__(self):
         self.primary_color = RGBColor(102, 126, 234)  # #667eea
         self.success_color = RGBColor(16, 185, 129)    # #10b981
         self.error_color = RGBColor(239, 68, 68)       # #ef4444
+        self.skipped_color = RGBColor(245, 158, 11)    # #f59e0b
         self.gray_color = RGBColor(102, 102, 102)      # #666666
     
     def generate(
@@ -72,11 +105,10 @@ class WordGenerator:
         # Summary section
         doc.add_heading('Summary', level=1)
         
-        success_count = sum(1 for r in results if r['status'] == 'success')
-        error_count = len(results) - success_count
+        success_count, error_count, skipped_count = self._count_statuses(results)
         
         # Summary table
-        table = doc.add_table(rows=4, cols=2)
+        table = doc.add_table(rows=5, cols=2)
         table.style = 'Table Grid'
         table.alignment = WD_TABLE_ALIGNMENT.CENTER
         
@@ -84,7 +116,8 @@ class WordGenerator:
             ('Total Statements', str(len(results))),
             ('Successfully Converted', str(success_count)),
             ('Errors', str(error_count)),
-            ('Success Rate', f'{(success_count/len(results)*100):.1f}%' if results else 'N/A')
+            ('Skipped', str(skipped_count)),
+            ('Success Rate', self._success_rate(success_count, error_count))
         ]
         
         for i, (label, value) in enumerate(summary_data):
@@ -103,13 +136,17 @@ class WordGenerator:
         
         for i, result in enumerate(results, 1):
             # Statement header
-            header = doc.add_heading(f'Statement {i}', level=2)
+            # Caller-supplied statement IDs take the place of the running number
+            header = doc.add_heading(f"Statement {result.get('id') or i}", level=2)
             
             # Status indicator
             status_para = doc.add_paragraph()
             if result['status'] == 'success':
                 run = status_para.add_run('✓ Successfully Converted')
                 run.font.color.rgb = self.success_color
+            elif result['status'] == 'skipped':
+                run = status_para.add_run('– Skipped (Not Converted)')
+                run.font.color.rgb = self.skipped_color
             else:
                 run = status_para.add_run('✗ Conversion Failed')
                 run.font.color.rgb = self.error_color
@@ -134,6 +171,11 @@ class WordGenerator:
                     run.font.size = Pt(10)
                     run.font.italic = True
                     run.font.color.rgb = self.gray_color
+            elif result['status'] == 'skipped':
+                doc.add_heading('Reason:', level=3)
+                reason_para = doc.add_paragraph()
+                run = reason_para.add_run(result.get('notes') or 'No reason given')
+                run.font.color.rgb = self.skipped_color
             else:
                 doc.add_heading('Error:', level=3)
                 error_para = doc.add_paragraph()
@@ -175,9 +217,229 @@ class WordGenerator:
         # Set cell shading (light gray background)
         self._set_cell_shading(cell, 'F5F5F5')
     
+    def _count_statuses(self, results: List[Dict]):
+        """Count (success, error, skipped) results."""
+        success_count = sum(1 for r in results if r['status'] == 'success')
+        skipped_count = sum(1 for r in results if r['status'] == 'skipped')
+        return success_count, len(results) - success_count - skipped_count, skipped_count
+    
+    def _success_rate(self, success_count: int, error_count: int) -> str:
+        """Share of attempted conversions that succeeded; skipped ones were not attempted."""
+        attempted = success_count + error_count
+        return f'{(success_count / attempted * 100):.1f}%' if attempted else 'N/A'
+    
     def _set_cell_shading(self, cell, color: str):
         """Set the background color of a cell."""
         cell_properties = cell._tc.get_or_add_tcPr()
         shading = OxmlElement('w:shd')
         shading.set(qn('w:fill'), color)
         cell_properties.append(shading)
+    
+    def generate_stream(
+        self, 
+        results: List[Dict], 
+        source_dialect: str, 
+        target_dialect: str
+    ) -> Iterator[bytes]:
+        """
+        Stream a Word document for large result sets.
+        
+        Produces the same report layout as generate(), but writes the
+        document XML directly from precompiled fragments instead of going
+        through python-docx's object model, and streams it into the zip
+        container as it is produced.
+        
+        Args:
+            results: List of conversion results
+            source_dialect: Source SQL dialect
+            target_dialect: Target SQL dialect
+            
+        Yields:
+            Chunks of the docx file
+        """
+        parts, document_head, document_tail = self._get_template()
+        
+        def produce(writer):
+            with zipfile.ZipFile(writer, 'w', compression=zipfile.ZIP_DEFLATED) as package:
+                for name, data in parts:
+                    package.writestr(name, data)
+                
+                with package.open('word/document.xml', 'w', force_zip64=True) as document:
+                    document.write(document_head)
+                    for fragment in self._iter_body_xml(results, source_dialect, target_dialect):
+                        document.write(fragment.encode('utf-8'))
+                    document.write(document_tail)
+        
+        return iter_writer_output(produce)
+    
+    @classmethod
+    def _get_template(cls):
+        """Build (once) the blank template parts used by the fast writer."""
+        if cls._template is None:
+            doc = Document()
+            for section in doc.sections:
+                section.left_margin = Inches(1)
+                section.right_margin = Inches(1)
+                section.top_margin = Inches(1)
+                section.bottom_margin = Inches(1)
+            
+            buffer = io.BytesIO()
+            doc.save(buffer)
+            
+            with zipfile.ZipFile(buffer) as package:
+                parts = [
+                    (name, package.read(name)) for name in package.namelist()
+                    if name != 'word/document.xml'
+                ]
+                document_xml = package.read('word/document.xml')
+            
+            # Body content goes between <w:body> and the section properties
+            body_start = document_xml.index(b'<w:body>') + len(b'<w:body>')
+            body_end = document_xml.index(b'<w:sectPr')
+            cls._template = (parts, document_xml[:body_start], document_xml[body_end:])
+        
+        return cls._template
+    
+    def _iter_body_xml(
+        self, 
+        results: List[Dict], 
+        source_dialect: str, 
+        target_dialect: str
+    ) -> Iterator[str]:
+        """Yield the body XML of the report, one block at a time."""
+        primary = str(self.primary_color)
+        gray = str(self.gray_color)
+        success = str(self.success_color)
+        error = str(self.error_color)
+        skipped = str(self.skipped_color)
+        
+        # Title, subtitle and date
+        yield self._paragraph_xml('SQL Dialect Conversion Report', style='Title', center=True)
+        yield self._paragraph_xml(f'{source_dialect} → {target_dialect}', center=True,
+                                  size=28, color=primary)
+        yield self._paragraph_xml(
+            f'Generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}',
+            center=True, size=20, color=gray
+        )
+        yield _PARAGRAPH_XML.format(ppr='', runs='')
+        
+        # Summary section
+        yield self._paragraph_xml('Summary', style='Heading1')
+        
+        success_count, error_count, skipped_count = self._count_statuses(results)
+        
+        yield self._summary_table_xml([
+            ('Total Statements', str(len(results))),
+            ('Successfully Converted', str(success_count)),
+            ('Errors', str(error_count)),
+            ('Skipped', str(skipped_count)),
+            ('Success Rate', self._success_rate(success_count, error_count))
+        ])
+        yield _PARAGRAPH_XML.format(ppr='', runs='')
+        
+        # Conversion details
+        yield self._paragraph_xml('Conversion Details', style='Heading1')
+        
+        for i, result in enumerate(results, 1):
+            yield self._paragraph_xml(f"Statement {result.get('id') or i}", style='Heading2')
+            
+            if result['status'] == 'success':
+                yield self._paragraph_xml('✓ Successfully Converted', bold=True, color=success)
+            elif result['status'] == 'skipped':
+                yield self._paragraph_xml('– Skipped (Not Converted)', bold=True, color=skipped)
+            else:
+                yield self._paragraph_xml('✗ Conversion Failed', bold=True, color=error)
+            
+            yield self._paragraph_xml('Original SQL:', style='Heading3')
+            yield self._code_block_xml(result['original'])
+            
+            if result['status'] == 'success':
+                yield self._paragraph_xml('Converted SQL:', style='Heading3')
+                yield self._code_block_xml(result['converted'])
+                
+                if result.get('notes'):
+                    yield _PARAGRAPH_XML.format(ppr='', runs=(
+                        self._run_xml('Notes: ', bold=True, size=20)
+                        + self._run_xml(result['notes'], size=20, italic=True, color=gray)
+                    ))
+            elif result['status'] == 'skipped':
+                yield self._paragraph_xml('Reason:', style='Heading3')
+                yield self._paragraph_xml(result.get('notes') or 'No reason given', color=skipped)
+            else:
+                yield self._paragraph_xml('Error:', style='Heading3')
+                yield self._paragraph_xml(result.get('notes', 'Unknown error'), color=error)
+            
+            # Add spacing between statements
+            yield _PARAGRAPH_XML.format(ppr='', runs='')
+            
+            # Add page break every 2 statements
+            if i % 2 == 0 and i < len(results):
+                yield _PAGE_BREAK_XML
+    
+    def _paragraph_xml(
+        self, 
+        text: str, 
+        style: str = None, 
+        center: bool = False, 
+        **run_format
+    ) -> str:
+        """Build a single-run paragraph."""
+        jc = '<w:jc w:val="center"/>' if center else ''
+        if style:
+            ppr = _STYLED_PPR_XML.format(style=style, jc=jc)
+        else:
+            ppr = f'<w:pPr>{jc}</w:pPr>' if jc else ''
+        return _PARAGRAPH_XML.format(ppr=ppr, runs=self._run_xml(text, **run_format))
+    
+    def _run_xml(
+        self, 
+        text: str, 
+        bold: bool = False, 
+        italic: bool = False, 
+        size: int = None, 
+        color: str = None
+    ) -> str:
+        """Build a text run; size is in half-points."""
+        rpr = ''
+        if bold:
+            rpr += '<w:b/>'
+        if italic:
+            rpr += '<w:i/>'
+        if color:
+            rpr += f'<w:color w:val="{color}"/>'
+        if size:
+            rpr += f'<w:sz w:val="{size}"/>'
+        rpr = f'<w:rPr>{rpr}</w:rPr>' if rpr else ''
+        return _RUN_XML.format(rpr=rpr, text=self._escape_text(text))
+    
+    def _code_block_xml(self, code: str) -> str:
+        """Build a shaded one-cell code table, matching _add_code_block."""
+        if not code:
+            code = "(empty)"
+        
+        lines = [f'<w:t xml:space="preserve">{self._escape_text(line)}</w:t>'
+                 for line in code.split('\n')]
+        return _CODE_BLOCK_XML.format(text='<w:br/>'.join(lines))
+    
+    def _summary_table_xml(self, rows: List) -> str:
+        """Build the centered two-column summary table."""
+        column_width = _TEXT_WIDTH_TWIPS // 2
+        cell = (f'<w:tc><w:tcPr><w:tcW w:w="{column_width}" w:type="dxa"/></w:tcPr>'
+                '<w:p>{run}</w:p></w:tc>')
+        
+        body = ''.join(
+            '<w:tr>' + ''.join(cell.format(run=self._run_xml(value, size=22))
+                               for value in (label, value)) + '</w:tr>'
+            for label, value in rows
+        )
+        return (
+            '<w:tbl><w:tblPr><w:tblStyle w:val="TableGrid"/><w:tblW w:w="0" w:type="auto"/>'
+            '<w:jc w:val="center"/><w:tblLook w:val="04A0" w:firstRow="1" w:lastRow="0" '
+            'w:firstColumn="1" w:lastColumn="0" w:noHBand="0" w:noVBand="1"/></w:tblPr>'
+            f'<w:tblGrid><w:gridCol w:w="{column_width}"/><w:gridCol w:w="{column_width}"/></w:tblGrid>'
+            f'{body}</w:tbl>'
+        )
+    
+    def _escape_text(self, text) -> str:
+        """Escape text for WordprocessingML, dropping invalid control characters."""
+        return escape(_INVALID_XML_CHARS.sub('', str(text)))
@@ -1,24 +1,51 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Header, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, FileResponse, JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
 from typing import List, Optional
-import os
+import json
 import sys
 from io import BytesIO
 from dotenv import load_dotenv
 
 # Import local modules
 from converters.ai_converter import AIConverter
+from converters.providers import UnknownProviderError, build_providers
+from converters.live_session import LiveConversionSession
+from converters.usage import UsageLedger, UsageMeter
+from converters.scheduler import ConversionScheduler, PRIORITIES
 from parsers.pdf_parser import PDFParser
 from parsers.sql_parser import SQLParser
 from parsers.excel_parser import ExcelParser
+from parsers.archive_parser import ArchiveParser
+from parsers.record_parser import RecordParser
 from generators.pdf_generator import PDFGenerator
 from generators.word_generator import WordGenerator
 from generators.excel_generator import ExcelGenerator
 from generators.sql_generator import SQLGenerator
+from generators.record_generator import RecordGenerator
+from generators.migration_generator import MigrationGenerator
+from generators.bundle_generator import BundleGenerator
 from utils.sql_utils import SQLUtils
-from config import SUPPORTED_DIALECTS, OUTPUT_FORMATS
+from utils.statement import Statement
+from utils.dependency_graph import DependencyGraph
+from utils.preflight import PreflightValidator
+from utils.statement_formatter import StatementFormatter
+from utils.parse_cache import ParseCache
+from utils.export_cache import ExportCache
+from utils.admission import AdmissionController, AdmissionRejected, AdmissionTicket
+from config import (
+    SUPPORTED_DIALECTS, OUTPUT_FORMATS, PARSE_CACHE_DIR, PARSE_CACHE_MEMORY_ENTRIES,
+    PARSE_CACHE_MEMORY_BYTES, PARSE_CACHE_MAX_BYTES, ARCHIVE_MEMBER_MAX_BYTES,
+    LARGE_EXPORT_THRESHOLD, EXPORT_CACHE_DIR, EXPORT_CACHE_MAX_BYTES, EXPORT_ORDERS,
+    PARQUET_AVAILABLE, CONVERT_MAX_WORKERS, PREFLIGHT_MIN_CONFIDENCE, LLM_PROVIDERS, LLM_PROVIDER_CHAIN,
+    JOB_TOKEN_BUDGET, JOB_COST_BUDGET, KEY_TOKEN_BUDGET, KEY_COST_BUDGET,
+    SCHEDULER_MAX_CONCURRENCY, SCHEDULER_PER_KEY_CONCURRENCY, INTERACTIVE_MAX_STATEMENTS,
+    STATEMENT_CACHE_ENTRIES,
+    ADMISSION_MAX_STATEMENTS, ADMISSION_MAX_BYTES, ADMISSION_MAX_QUEUE, ADMISSION_QUEUE_TIMEOUT
+)
 
 # Load environment variables
 load_dotenv()
@@ -30,6 +57,50 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Statement facts (type, tables) are shared by every consumer of the same text
+Statement.set_cache_size(STATEMENT_CACHE_ENTRIES)
+
+# Shared formatter so formatted views are cached across requests
+statement_formatter = StatementFormatter()
+
+# Parsed file results keyed by content hash and parser version
+parse_cache = ParseCache(
+    PARSE_CACHE_DIR,
+    max_entries=PARSE_CACHE_MEMORY_ENTRIES,
+    max_bytes=PARSE_CACHE_MAX_BYTES,
+    max_memory_bytes=PARSE_CACHE_MEMORY_BYTES
+)
+
+# Generated export files keyed by results, dialects and format
+export_cache = ExportCache(EXPORT_CACHE_DIR, max_bytes=EXPORT_CACHE_MAX_BYTES)
+
+# Token and cost totals per API key, for the life of the process
+usage_ledger = UsageLedger(KEY_TOKEN_BUDGET, KEY_COST_BUDGET)
+
+# Model call slots shared fairly between API keys, interactive jobs first
+scheduler = ConversionScheduler(SCHEDULER_MAX_CONCURRENCY, SCHEDULER_PER_KEY_CONCURRENCY)
+
+# Statements and bytes being converted or parsed at once, with a bounded wait queue
+admission = AdmissionController(
+    ADMISSION_MAX_STATEMENTS, ADMISSION_MAX_BYTES, ADMISSION_MAX_QUEUE, ADMISSION_QUEUE_TIMEOUT
+)
+
+# Media type and download name of each export format
+EXPORT_FILES = {
+    "PDF": ("application/pdf", "converted_sql.pdf"),
+    "Word Document": (
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        "converted_sql.docx"
+    ),
+    "Excel": (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "converted_sql.xlsx"
+    ),
+    "SQL File": ("text/plain", "converted_sql.sql"),
+    "NDJSON": ("application/x-ndjson", "converted_sql.ndjson"),
+    "Parquet": ("application/vnd.apache.parquet", "converted_sql.parquet")
+}
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -46,13 +117,26 @@ class ConversionRequest(BaseModel):
     source_dialect: str
     target_dialect: str
     api_key: Optional[str] = None
+    statement_ids: Optional[List[str]] = None
+    preflight: Optional[str] = None
+    min_confidence: Optional[float] = None
+    providers: Optional[List[str]] = None
+    token_budget: Optional[int] = None
+    cost_budget: Optional[float] = None
+    priority: Optional[str] = None
 
 
 class ConversionResult(BaseModel):
+    id: Optional[str] = None
     original: str
     converted: Optional[str]
     status: str
     notes: str
+    model: Optional[str] = None
+    duration_ms: Optional[float] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    cost: Optional[float] = None
 
 
 class ConversionResponse(BaseModel):
@@ -60,17 +144,52 @@ class ConversionResponse(BaseModel):
     success_count: int
     error_count: int
     total_count: int
+    skipped_count: int = 0
+    preflight: Optional[dict] = None
+    usage: Optional[dict] = None
+    key_usage: Optional[dict] = None
+    queue: Optional[dict] = None
 
 
 class ManualSQLRequest(BaseModel):
     sql_text: str
 
 
+class FormatSQLRequest(BaseModel):
+    statements: List[str]
+
+
+class DependencyRequest(BaseModel):
+    statements: List[str]
+
+
 class ExportRequest(BaseModel):
     results: List[dict]
     source_dialect: str
     target_dialect: str
     format: str
+    format_original: bool = False
+    split_by: Optional[str] = None
+    order: str = "script"
+
+
+class ExportAppendRequest(BaseModel):
+    results: List[dict]
+    source_dialect: str
+    target_dialect: str
+    format: str
+    base_etag: str
+    watermark: int
+    format_original: bool = False
+
+
+class ExportBundleRequest(BaseModel):
+    results: List[dict]
+    source_dialect: str
+    target_dialect: str
+    formats: List[str] = OUTPUT_FORMATS
+    format_original: bool = False
+    order: str = "script"
 
 
 # Root endpoint
@@ -98,46 +217,175 @@ async def get_formats():
     return {"formats": OUTPUT_FORMATS}
 
 
+# Get configured LLM providers
+@app.get("/api/providers")
+async def get_providers():
+    """Get the configured LLM providers and the default fallback chain"""
+    return {
+        "providers": [
+            {
+                "name": name,
+                "url": settings["url"],
+                "models": settings["models"],
+                "requires_key": settings.get("requires_key", False)
+            }
+            for name, settings in LLM_PROVIDERS.items()
+        ],
+        "default_chain": LLM_PROVIDER_CHAIN
+    }
+
+
+# Get token and cost totals per API key
+@app.get("/api/usage")
+async def get_usage():
+    """Get token and cost totals per API key (identified by a short hash)"""
+    return {"keys": usage_ledger.to_dict()}
+
+
+# Get scheduler queue depth and wait times
+@app.get("/api/scheduler")
+async def get_scheduler():
+    """Get model call slots in use, queue depth and wait times per priority"""
+    return {
+        **scheduler.stats(),
+        "interactive_max_statements": INTERACTIVE_MAX_STATEMENTS
+    }
+
+
+# Get admission limits and current load
+@app.get("/api/limits")
+async def get_limits():
+    """Get the in-flight statement and byte limits, queue and current load"""
+    return admission.stats()
+
+
+async def _admit(statements: int, size: int) -> AdmissionTicket:
+    """Wait for room under the admission limits; 503 with Retry-After when saturated."""
+    try:
+        return await admission.acquire(statements, size)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+
 # Parse uploaded file
 @app.post("/api/parse-file")
-async def parse_file(file: UploadFile = File(...)):
+async def parse_file(file: UploadFile = File(...), reformat: bool = Form(False)):
     """
     Parse uploaded file and extract SQL statements.
-    Supports: PDF, SQL, TXT, Excel (XLSX/XLS)
+    Supports: PDF, SQL, TXT, Excel (XLSX/XLS), archives of them
+    (ZIP, TAR.GZ/TGZ, SQL.GZ/TXT.GZ) and statement inventories
+    (NDJSON/JSONL, CSV, Parquet)
+    
+    SQL and TXT uploads are streamed through the incremental splitter.
+    Statements are returned as written with cheap metadata; use
+    /api/format-sql (or reformat=true) for the reindented view.
+    Archive statements are tagged with their source file and line;
+    members that were skipped are listed in errors.
+    Inventory records are taken verbatim and keep their caller-supplied IDs.
+    
+    Uploads count against the admission byte limit while they are parsed.
     """
+    ticket = None
     try:
         # Get file extension
         file_extension = file.filename.split('.')[-1].lower()
+        archive_type = ArchiveParser.archive_type(file.filename)
         
-        # Read file content
-        content = await file.read()
-        file_obj = BytesIO(content)
-        file_obj.name = file.filename
-        
-        # Parse based on file type
-        if file_extension == 'pdf':
-            parser = PDFParser()
-            statements = parser.parse(file_obj)
+        if archive_type:
+            parser = ArchiveParser(max_member_bytes=ARCHIVE_MEMBER_MAX_BYTES)
+            options = ()
+        elif file_extension in RecordParser.FORMATS:
+            parser = RecordParser()
+            options = ()
         elif file_extension in ['sql', 'txt']:
-            parser = SQLParser()
-            statements = parser.parse(file_obj)
+            parser = SQLParser(formatter=statement_formatter)
+            options = (reformat,)
+        elif file_extension == 'pdf':
+            parser = PDFParser()
+            options = ()
         elif file_extension in ['xlsx', 'xls']:
             parser = ExcelParser()
-            statements = parser.parse(file_obj)
+            options = ()
         else:
             raise HTTPException(
                 status_code=400,
                 detail=f"Unsupported file format: {file_extension}"
             )
         
-        return {
+        if file.size is not None:
+            size = file.size
+        else:
+            size = file.file.seek(0, 2)
+            file.file.seek(0)
+        ticket = await _admit(0, size)
+        
+        # Repeat uploads of the same bytes are served from the cache;
+        # hashing and cache file I/O run off the event loop
+        content_hash = await run_in_threadpool(ParseCache.hash_file, file.file)
+        cache_key = ParseCache.make_key(content_hash, parser, *options)
+        parsed = await run_in_threadpool(parse_cache.get, cache_key)
+        cached = parsed is not None
+        
+        if not cached:
+            if archive_type:
+                # Decompressed as a stream; members are parsed in worker processes
+                parsed = await run_in_threadpool(parser.parse, file.file, file.filename)
+            elif isinstance(parser, RecordParser):
+                # One statement per record, read without re-splitting
+                parsed = await run_in_threadpool(parser.parse, file.file, file.filename)
+            elif isinstance(parser, SQLParser):
+                # Stream straight from the spooled upload instead of reading it all;
+                # split off the event loop so large dumps don't stall other requests
+                parsed = await run_in_threadpool(parser.parse, file.file, reformat=reformat)
+            else:
+                # Read file content
+                content = await file.read()
+                file_obj = BytesIO(content)
+                file_obj.name = file.filename
+                parsed = parser.parse(file_obj)
+            
+            await run_in_threadpool(parse_cache.set, cache_key, parsed)
+        
+        member_errors = []
+        if archive_type:
+            member_errors = [entry for entry in parsed if 'error' in entry]
+            parsed = [entry for entry in parsed if 'error' not in entry]
+        
+        if archive_type or isinstance(parser, RecordParser):
+            statements = [entry['statement'] for entry in parsed]
+        else:
+            statements = parsed
+        
+        response = {
             "statements": statements,
+            "metadata": [StatementFormatter.describe(s) for s in statements],
             "count": len(statements),
-            "filename": file.filename
+            "filename": file.filename,
+            "cached": cached
         }
+        
+        if archive_type:
+            response["sources"] = [
+                {"source": entry['source'], "line": entry['line']} for entry in parsed
+            ]
+            response["errors"] = member_errors
+        elif isinstance(parser, RecordParser):
+            response["ids"] = [entry['id'] for entry in parsed]
+            response["attributes"] = [entry['attributes'] for entry in parsed]
+        
+        return response
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if ticket is not None:
+            admission.release(ticket)
 
 
 # Parse manual SQL input
@@ -148,19 +396,55 @@ async def parse_sql(request: ManualSQLRequest):
         statements = SQLUtils.split_statements(request.sql_text)
         return {
             "statements": statements,
+            "metadata": [StatementFormatter.describe(s) for s in statements],
             "count": len(statements)
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Format statements on demand
+@app.post("/api/format-sql")
+async def format_sql(request: FormatSQLRequest):
+    """
+    Get the reindented view of parsed statements.
+    Formatting is computed on first request and cached per statement.
+    """
+    try:
+        formatted = statement_formatter.format_many(request.statements)
+        return {
+            "formatted": formatted,
+            "count": len(formatted)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Analyze statement dependencies
+@app.post("/api/dependencies")
+async def statement_dependencies(request: DependencyRequest):
+    """
+    Build the dependency graph of a script's statements.
+    Returns a valid execution order, the levels that can run in parallel,
+    each statement's dependencies and where dependency cycles were broken
+    (all as statement indices).
+    """
+    try:
+        graph = await run_in_threadpool(DependencyGraph, request.statements)
+        return graph.to_dict()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # Convert SQL statements
 @app.post("/api/convert", response_model=ConversionResponse)
 async def convert_sql(request: ConversionRequest):
     """
     Convert SQL statements from source dialect to target dialect.
-    Uses AI-powered conversion via OpenRouter API.
+    Uses AI-powered conversion via the configured LLM providers
+    (OpenRouter by default, or a self-hosted OpenAI-compatible server).
     """
+    ticket = None
     try:
         # Validate dialects
         if request.source_dialect not in SUPPORTED_DIALECTS:
@@ -181,106 +465,612 @@ async def convert_sql(request: ConversionRequest):
                 detail="Source and target dialects cannot be the same"
             )
         
-        # Get API key from request or environment
-        api_key = request.api_key or os.getenv("GEMINI_API_KEY")
+        if request.statement_ids is not None and len(request.statement_ids) != len(request.statements):
+            raise HTTPException(
+                status_code=400,
+                detail="statement_ids must have one entry per statement"
+            )
         
-        if not api_key:
+        unknown = [name for name in request.providers or () if name not in LLM_PROVIDERS]
+        if unknown:
             raise HTTPException(
-                status_code=401,
-                detail="API key is required. Provide it in the request or set GEMINI_API_KEY environment variable."
+                status_code=400,
+                detail=f"Unknown LLM provider: {', '.join(unknown)}"
             )
         
-        # Initialize converter
-        converter = AIConverter(api_key=api_key)
+        if request.preflight is not None and request.preflight not in PreflightValidator.MODES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported preflight mode: {request.preflight}"
+            )
+        
+        if request.priority is not None and request.priority not in PRIORITIES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported priority: {request.priority}"
+            )
+        
+        # Wait for room under the in-flight limits (503 when saturated)
+        ticket = await _admit(
+            len(request.statements),
+            sum(len(s.encode('utf-8')) for s in request.statements)
+        )
+        
+        # Initialize converter; providers that need a key use the request's
+        # or their environment variable (401 if none is usable)
+        converter = AIConverter(api_key=request.api_key, providers=request.providers)
+        
+        # The job's budget is the tighter of the request's and the configured one
+        key_usage = usage_ledger.meter(converter.api_key)
+        converter.meter = UsageMeter(
+            min(filter(None, (request.token_budget, JOB_TOKEN_BUDGET)), default=None),
+            min(filter(None, (request.cost_budget, JOB_COST_BUDGET)), default=None),
+            parent=key_usage
+        )
+        
+        # Small jobs (manual input, a few statements) are interactive unless
+        # the request asks for bulk; large jobs can never jump the queue
+        converter.scheduler = scheduler
+        converter.scheduler_key = usage_ledger.key_id(converter.api_key)
+        if len(request.statements) <= INTERACTIVE_MAX_STATEMENTS and request.priority != "bulk":
+            converter.priority = "interactive"
+        else:
+            converter.priority = "bulk"
+        
+        # Score statements locally; junk fragments are not sent to the model
+        statements = [Statement(s) for s in request.statements]
+        skip = {}
+        preflight = None
+        
+        if request.preflight:
+            validator = PreflightValidator(
+                request.min_confidence if request.min_confidence is not None else PREFLIGHT_MIN_CONFIDENCE,
+                request.source_dialect
+            )
+            checks = await run_in_threadpool(validator.check_many, statements)
+            
+            for i, check in enumerate(checks):
+                if not check['passed']:
+                    skip[i] = (
+                        f"Skipped by pre-flight check (confidence {check['confidence']}): "
+                        + "; ".join(check['issues'])
+                    )
+            
+            preflight = {
+                "mode": request.preflight,
+                "min_confidence": validator.min_confidence,
+                "confidence": [check['confidence'] for check in checks],
+                "skipped": len(skip),
+                "llm_calls_saved": len({statements[i].text for i in skip})
+            }
         
         # Perform conversion
-        results = converter.convert(
-            request.statements,
+        results = await run_in_threadpool(
+            converter.convert,
+            statements,
             request.source_dialect,
-            request.target_dialect
+            request.target_dialect,
+            statement_ids=request.statement_ids,
+            max_workers=CONVERT_MAX_WORKERS,
+            skip=skip
         )
+        skipped_count = results.skipped_count
         
-        # Calculate statistics
-        success_count = sum(1 for r in results if r['status'] == 'success')
-        error_count = len(results) - success_count
+        if request.preflight == "drop":
+            results = results.without_skipped()
         
-        return ConversionResponse(
-            results=[ConversionResult(**r) for r in results],
-            success_count=success_count,
-            error_count=error_count,
-            total_count=len(results)
-        )
+        # Records are turned into the ConversionResponse schema only here;
+        # they already match it, so skip re-validating every result
+        return JSONResponse({
+            "results": results.to_dicts(),
+            "success_count": results.success_count,
+            "error_count": results.error_count,
+            "total_count": len(results),
+            "skipped_count": skipped_count,
+            "preflight": preflight,
+            "usage": converter.meter.to_dict(),
+            "key_usage": {"key_id": usage_ledger.key_id(converter.api_key), **key_usage.to_dict()},
+            "queue": {
+                "priority": converter.priority,
+                "wait_ms": round(converter.queue_wait_ms, 1),
+                "max_wait_ms": round(converter.queue_max_wait_ms, 1),
+                "queue_depth": scheduler.stats()["queue_depth"],
+                "admission_wait_ms": round(ticket.wait_ms, 1)
+            }
+        })
     
     except HTTPException:
         raise
+    except UnknownProviderError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except ValueError as e:
+        # Missing or unusable API key
         raise HTTPException(status_code=401, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if ticket is not None:
+            admission.release(ticket)
+
+
+# Live conversion for the editor
+@app.websocket("/ws/convert")
+async def live_convert(websocket: WebSocket):
+    """
+    Convert editor text as it is typed.
+    
+    The client sends {"type": "start", "source_dialect", "target_dialect",
+    "api_key", "providers"} once (again to change dialects), then a
+    debounced {"type": "update", "sql_text", "version"} per edit. Only
+    statements that changed are converted; conversions made stale by a
+    newer edit are cancelled. See LiveConversionSession for the messages
+    pushed back. Problems are reported as {"type": "error", "detail"}.
+    """
+    await websocket.accept()
+    session = None
+    
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except ValueError:
+                await websocket.send_json({"type": "error", "detail": "Messages must be JSON"})
+                continue
+            
+            kind = message.get("type") if isinstance(message, dict) else None
+            
+            if kind == "start":
+                source = message.get("source_dialect")
+                target = message.get("target_dialect")
+                if source not in SUPPORTED_DIALECTS or target not in SUPPORTED_DIALECTS:
+                    await websocket.send_json({"type": "error", "detail": "Unsupported dialect"})
+                    continue
+                if source == target:
+                    await websocket.send_json({
+                        "type": "error",
+                        "detail": "Source and target dialects cannot be the same"
+                    })
+                    continue
+                
+                try:
+                    providers = build_providers(message.get("providers"), message.get("api_key"))
+                except ValueError as e:
+                    await websocket.send_json({"type": "error", "detail": str(e)})
+                    continue
+                
+                if session is not None:
+                    session.close()
+                
+                api_key = next((p.api_key for p in providers if p.api_key), None)
+                key_usage = usage_ledger.meter(api_key)
+                session = LiveConversionSession(
+                    providers,
+                    source,
+                    target,
+                    websocket.send_json,
+                    meter=UsageMeter(JOB_TOKEN_BUDGET, JOB_COST_BUDGET, parent=key_usage),
+                    scheduler=scheduler,
+                    scheduler_key=usage_ledger.key_id(api_key),
+                    admission=admission
+                )
+                await websocket.send_json({"type": "started", "providers": [p.name for p in providers]})
+            
+            elif kind == "update":
+                if session is None:
+                    await websocket.send_json({"type": "error", "detail": "Send a start message first"})
+                    continue
+                await session.update(message.get("sql_text") or "", message.get("version"))
+            
+            else:
+                await websocket.send_json({"type": "error", "detail": f"Unknown message type: {kind}"})
+    
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if session is not None:
+            session.close()
+
+
+def _cached_export_response(
+    cache_key: str,
+    if_none_match: Optional[str],
+    media_type: str,
+    filename: str
+) -> Optional[Response]:
+    """
+    Answer an export from the artifact cache if possible.
+    
+    Args:
+        cache_key: Key from ExportCache.make_key, also used as the ETag
+        if_none_match: Value of the If-None-Match request header
+        media_type: Media type of the export
+        filename: Download file name
+        
+    Returns:
+        304 or file response, or None if the export has to be generated
+    """
+    etag = f'"{cache_key}"'
+    
+    # The key is derived from the export's inputs, so a matching tag is current
+    if if_none_match:
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        if etag in tags or f'W/{etag}' in tags or '*' in tags:
+            return Response(status_code=304, headers={"ETag": etag})
+    
+    path = export_cache.get(cache_key)
+    if path is None:
+        return None
+    
+    return FileResponse(
+        path,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "ETag": etag
+        }
+    )
 
 
 # Export results to file
 @app.post("/api/export")
-async def export_results(request: ExportRequest):
+async def export_results(
+    request: ExportRequest,
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Export conversion results to specified format.
-    Formats: PDF, Word Document, Excel, SQL File
+    Formats: PDF, Word Document, Excel, SQL File, NDJSON, Parquet
+    
+    Generated files are cached by content; repeats are served from disk
+    and conditional requests with a matching ETag get 304 Not Modified.
     """
     try:
+        if request.format not in EXPORT_FILES or request.format not in OUTPUT_FORMATS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported format: {request.format}"
+            )
+        
+        media_type, filename = EXPORT_FILES[request.format]
+        
+        # SQL exports can be split into a ZIP of migration files
+        if request.split_by:
+            if request.format != "SQL File":
+                raise HTTPException(
+                    status_code=400,
+                    detail="split_by is only supported for SQL File exports"
+                )
+            if request.split_by not in MigrationGenerator.SPLIT_MODES:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Unsupported split mode: {request.split_by}"
+                )
+            media_type, filename = "application/zip", "converted_sql_migrations.zip"
+        
+        if request.order not in EXPORT_ORDERS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported order: {request.order}"
+            )
+        
+        results = request.results
+        
+        # Reorder into a valid execution order (DDL before the DML using it, ...)
+        if request.order == "dependency":
+            results = await run_in_threadpool(DependencyGraph.order_results, results)
+        
+        # Format original statements lazily, only when the export asks for it
+        if request.format_original:
+            results = [
+                {**r, "original": statement_formatter.format(r['original'])}
+                for r in results
+            ]
+        
+        cache_key = export_cache.make_key(
+            results, request.source_dialect, request.target_dialect, request.format,
+            request.split_by
+        )
+        etag = f'"{cache_key}"'
+        
+        cached = _cached_export_response(cache_key, if_none_match, media_type, filename)
+        if cached is not None:
+            return cached
+        
+        # Very large result sets use the streaming generators
+        large_export = len(results) >= LARGE_EXPORT_THRESHOLD
+        content = None
+        
         # Generate file based on format
         if request.format == "PDF":
             generator = PDFGenerator()
-            buffer = generator.generate(
-                request.results,
-                request.source_dialect,
-                request.target_dialect
-            )
-            media_type = "application/pdf"
-            filename = "converted_sql.pdf"
+            if large_export:
+                # Story laid out in chunks, finished file streamed out
+                content = generator.generate_stream(
+                    results,
+                    request.source_dialect,
+                    request.target_dialect
+                )
+            else:
+                buffer = generator.generate(
+                    results,
+                    request.source_dialect,
+                    request.target_dialect
+                )
         
         elif request.format == "Word Document":
             generator = WordGenerator()
-            buffer = generator.generate(
-                request.results,
-                request.source_dialect,
-                request.target_dialect
-            )
-            media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-            filename = "converted_sql.docx"
+            if large_export:
+                # Document XML written from precompiled fragments, streamed into the zip
+                content = generator.generate_stream(
+                    results,
+                    request.source_dialect,
+                    request.target_dialect
+                )
+            else:
+                buffer = generator.generate(
+                    results,
+                    request.source_dialect,
+                    request.target_dialect
+                )
         
         elif request.format == "Excel":
             generator = ExcelGenerator()
-            buffer = generator.generate(
-                request.results,
+            if large_export:
+                # Write-only workbook, streamed into the response as it is written
+                content = generator.generate_stream(
+                    results,
+                    request.source_dialect,
+                    request.target_dialect
+                )
+            else:
+                buffer = generator.generate(
+                    results,
+                    request.source_dialect,
+                    request.target_dialect
+                )
+        
+        elif request.format == "SQL File" and request.split_by:
+            generator = MigrationGenerator(request.split_by)
+            # Numbered migration files plus manifest, streamed as a ZIP
+            content = generator.generate_stream(
+                results,
                 request.source_dialect,
                 request.target_dialect
             )
-            media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            filename = "converted_sql.xlsx"
         
         elif request.format == "SQL File":
             generator = SQLGenerator()
-            buffer = generator.generate(
-                request.results,
+            # Plain text streams block by block at any size
+            content = generator.generate_stream(
+                results,
                 request.source_dialect,
                 request.target_dialect
             )
-            media_type = "text/plain"
-            filename = "converted_sql.sql"
         
-        else:
+        elif request.format in ("NDJSON", "Parquet"):
+            generator = RecordGenerator(request.format.lower())
+            # One flat record per result, streamed at any size
+            content = generator.generate_stream(
+                results,
+                request.source_dialect,
+                request.target_dialect
+            )
+        
+        if content is None:
+            content = [buffer.getvalue()]
+        
+        # Return file as streaming response, keeping a copy in the cache
+        return StreamingResponse(
+            export_cache.store(cache_key, content),
+            media_type=media_type,
+            headers={
+                "Content-Disposition": f"attachment; filename={filename}",
+                "ETag": etag
+            }
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Extend a previous export with new results
+@app.post("/api/export-append")
+async def export_append(
+    request: ExportAppendRequest,
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Extend a previously generated SQL or Excel export with new results.
+    
+    base_etag is the ETag of the earlier export (it must still be in the
+    export cache) and watermark the number of results it holds; results
+    are only the ones added since. The returned file has its own ETag, so
+    exports can be chained as batches finish.
+    """
+    base_file = None
+    streaming = False
+    try:
+        if request.format not in ("SQL File", "Excel"):
             raise HTTPException(
                 status_code=400,
-                detail=f"Unsupported format: {request.format}"
+                detail=f"Incremental export is not supported for: {request.format}"
             )
         
-        # Return file as streaming response
-        buffer.seek(0)
+        media_type, filename = EXPORT_FILES[request.format]
+        base_key = request.base_etag.replace('W/', '').strip().strip('"')
+        
+        # Opened before responding, so a concurrent cache eviction cannot
+        # unlink the base file while the response streams it
+        base_path = export_cache.get(base_key)
+        try:
+            base_file = open(base_path, 'rb') if base_path else None
+        except OSError:
+            base_file = None
+        if base_file is None:
+            raise HTTPException(
+                status_code=412,
+                detail="Base export not found in cache; export the full result set again"
+            )
+        
+        if request.format == "SQL File":
+            generator = SQLGenerator()
+        else:
+            generator = ExcelGenerator()
+        
+        # The base file must be an export in the requested format, and the
+        # watermark must match what it actually contains
+        try:
+            summary = await run_in_threadpool(generator.read_summary, base_file)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Base export does not match the requested format ({request.format}): {e}"
+            )
+        
+        if summary['total'] != request.watermark:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Base export holds {summary['total']} results, watermark is {request.watermark}"
+            )
+        
+        results = request.results
+        
+        # Format original statements lazily, only when the export asks for it
+        if request.format_original:
+            results = [
+                {**r, "original": statement_formatter.format(r['original'])}
+                for r in results
+            ]
+        
+        cache_key = export_cache.make_key(
+            results, request.source_dialect, request.target_dialect, request.format,
+            "append", base_key, request.watermark
+        )
+        etag = f'"{cache_key}"'
+        
+        cached = _cached_export_response(cache_key, if_none_match, media_type, filename)
+        if cached is not None:
+            return cached
+        
+        if request.format == "SQL File":
+            # Existing blocks are copied as-is, only new ones are formatted;
+            # the stream closes the base file once it has copied it
+            content = generator.append_stream(
+                base_file,
+                results,
+                request.source_dialect,
+                request.target_dialect
+            )
+            streaming = True
+        else:
+            buffer = await run_in_threadpool(
+                generator.append,
+                base_file,
+                results,
+                request.source_dialect,
+                request.target_dialect
+            )
+            content = [buffer.getvalue()]
+        
         return StreamingResponse(
-            buffer,
+            export_cache.store(cache_key, content),
             media_type=media_type,
             headers={
-                "Content-Disposition": f"attachment; filename={filename}"
+                "Content-Disposition": f"attachment; filename={filename}",
+                "ETag": etag
+            },
+            # Also closes the file if the client left before streaming began
+            background=BackgroundTask(base_file.close) if streaming else None
+        )
+    
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if base_file is not None and not streaming:
+            base_file.close()
+
+
+# Export results to several formats in one ZIP
+@app.post("/api/export-bundle")
+async def export_bundle(
+    request: ExportBundleRequest,
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Export conversion results to a ZIP with any subset of the output formats.
+    Each format is generated in its own worker process.
+    """
+    try:
+        if not request.formats:
+            raise HTTPException(status_code=400, detail="No export formats selected")
+        
+        # Members are generated after the response has started streaming, so
+        # anything that cannot be generated has to be refused here
+        if "Parquet" in request.formats and not PARQUET_AVAILABLE:
+            raise HTTPException(
+                status_code=400,
+                detail="Parquet export requires pyarrow (pip install pyarrow)"
+            )
+        
+        unsupported = [f for f in request.formats if f not in OUTPUT_FORMATS]
+        if unsupported:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported format: {', '.join(unsupported)}"
+            )
+        
+        if request.order not in EXPORT_ORDERS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported order: {request.order}"
+            )
+        
+        results = request.results
+        
+        # Reorder into a valid execution order (DDL before the DML using it, ...)
+        if request.order == "dependency":
+            results = await run_in_threadpool(DependencyGraph.order_results, results)
+        
+        # Format original statements lazily, only when the export asks for it
+        if request.format_original:
+            results = [
+                {**r, "original": statement_formatter.format(r['original'])}
+                for r in results
+            ]
+        
+        formats = list(dict.fromkeys(request.formats))
+        cache_key = export_cache.make_key(
+            results, request.source_dialect, request.target_dialect, "ZIP", *formats
+        )
+        etag = f'"{cache_key}"'
+        
+        cached = _cached_export_response(
+            cache_key, if_none_match, "application/zip", "converted_sql.zip"
+        )
+        if cached is not None:
+            return cached
+        
+        generator = BundleGenerator()
+        content = generator.generate_stream(
+            results,
+            request.source_dialect,
+            request.target_dialect,
+            formats,
+            large_export=len(results) >= LARGE_EXPORT_THRESHOLD
+        )
+        
+        return StreamingResponse(
+            export_cache.store(cache_key, content),
+            media_type="application/zip",
+            headers={
+                "Content-Disposition": "attachment; filename=converted_sql.zip",
+                "ETag": etag
             }
         )
     
@@ -293,7 +1083,10 @@ async def export_results(request: ExportRequest):
 # Validate API key
 @app.post("/api/validate-key")
 async def validate_api_key(api_key: str = Form(...)):
-    """Validate OpenRouter API key"""
+    """Validate an API key against the providers in the chain that take one"""
+    if not api_key.strip().strip("'\""):
+        return {"valid": False, "message": "API key is empty"}
+    
     try:
         converter = AIConverter(api_key=api_key)
         is_valid = converter.validate_api_key()
@@ -1,5 +1,7 @@
 from .pdf_parser import PDFParser
 from .sql_parser import SQLParser
 from .excel_parser import ExcelParser
+from .archive_parser import ArchiveParser
+from .record_parser import RecordParser
 
-__all__ = ["PDFParser", "SQLParser", "ExcelParser"]
+__all__ = ["PDFParser", "SQLParser", "ExcelParser", "ArchiveParser", "RecordParser"]
@@ -0,0 +1,208 @@
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+import gzip
+import io
+import os
+import tarfile
+import zipfile
+
+from .pdf_parser import PDFParser
+from .sql_parser import SQLParser
+from .excel_parser import ExcelParser
+
+# Member file types that can be parsed, by extension
+MEMBER_EXTENSIONS = ('sql', 'txt', 'pdf', 'xlsx', 'xls')
+
+
+def _parse_member(name: str, data: bytes) -> List[Tuple[str, Optional[int]]]:
+    """
+    Parse a single archive member with the parser for its extension.
+
+    Runs in a worker process, so it only takes and returns plain data.
+
+    Returns:
+        List of (statement, start_line) tuples; start_line is None for
+        formats without line information (PDF, Excel)
+    """
+    extension = name.rsplit('.', 1)[-1].lower()
+    file_obj = io.BytesIO(data)
+    file_obj.name = name
+
+    if extension in ('sql', 'txt'):
+        return list(SQLParser().iter_located(file_obj))
+    if extension == 'pdf':
+        return [(statement, None) for statement in PDFParser().parse(file_obj)]
+    return [(statement, None) for statement in ExcelParser().parse(file_obj)]
+
+
+class ArchiveParser:
+    """
+    Parser for compressed uploads: .zip, .tar.gz/.tgz and gzipped .sql/.txt.
+
+    Archives are decompressed as a stream, one member at a time, without
+    extracting them to disk. Member files are handed to the matching
+    parser in a process pool, with a bounded number of members in flight,
+    and statements come back tagged with their source file and line.
+    Members that are too large or fail to parse are reported instead of
+    failing the whole archive.
+    """
+
+    # Bump when extraction output changes so cached results are invalidated
+    VERSION = 2
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_member_bytes: int = 64 * 1024 * 1024
+    ):
+        """
+        Initialize the archive parser.
+
+        Args:
+            max_workers: Worker processes used to parse members. Defaults to
+                the number of CPUs.
+            max_member_bytes: Largest decompressed member that is read;
+                bigger members are skipped and reported
+        """
+        self.max_workers = max_workers
+        self.max_member_bytes = max_member_bytes
+
+    @staticmethod
+    def archive_type(filename: str) -> Optional[str]:
+        """
+        Detect the archive type from a file name.
+
+        Args:
+            filename: Uploaded file name
+
+        Returns:
+            'zip', 'tar' or 'gzip', or None if the file is not an archive
+        """
+        name = filename.lower()
+
+        if name.endswith('.zip'):
+            return 'zip'
+        if name.endswith(('.tar.gz', '.tgz')):
+            return 'tar'
+        if name.endswith(('.sql.gz', '.txt.gz')):
+            return 'gzip'
+        return None
+
+    def parse(self, file, filename: str) -> List[Dict]:
+        """
+        Extract SQL statements from every supported file in an archive.
+
+        Args:
+            file: Binary file-like object of the uploaded archive
+            filename: Uploaded file name, used to detect the archive type
+
+        Returns:
+            List of dicts in archive order: statements have 'statement',
+            'source' and 'line' keys; members that were skipped have
+            'source' and 'error' keys
+        """
+        archive_type = self.archive_type(filename)
+
+        if archive_type == 'gzip':
+            # A single compressed stream; nothing to parallelize
+            member_name = filename[:-3]
+            with gzip.GzipFile(fileobj=file, mode='rb') as stream:
+                return [
+                    {"statement": statement, "source": member_name, "line": line}
+                    for statement, line in SQLParser().iter_located(stream)
+                ]
+
+        if archive_type == 'zip':
+            members = self._iter_zip_members(file)
+        elif archive_type == 'tar':
+            members = self._iter_tar_members(file)
+        else:
+            raise ValueError(f"Unsupported archive format: {filename}")
+
+        return self._parse_members(members)
+
+    def _parse_members(self, members: Iterator[Tuple[str, Optional[bytes]]]) -> List[Dict]:
+        """Parse members in parallel, keeping archive order in the output."""
+        results = []
+        workers = self.max_workers or os.cpu_count() or 1
+
+        # Limit members held in memory to a few per worker
+        window = workers * 2
+        pending = deque()
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for name, data in members:
+                if data is None:
+                    pending.append((name, None))
+                else:
+                    pending.append((name, executor.submit(_parse_member, name, data)))
+                if len(pending) >= window:
+                    results.extend(self._collect(*pending.popleft()))
+
+            while pending:
+                results.extend(self._collect(*pending.popleft()))
+
+        return results
+
+    def _collect(self, name: str, future) -> List[Dict]:
+        """Wait for one member and tag its statements, or its error, with its source."""
+        if future is None:
+            return [{
+                "source": name,
+                "error": f"Skipped: larger than {self.max_member_bytes} bytes"
+            }]
+
+        try:
+            located = future.result()
+        except Exception as e:
+            print(f"Error parsing archive member {name}: {e}")
+            return [{"source": name, "error": str(e) or type(e).__name__}]
+
+        return [
+            {"statement": statement, "source": name, "line": line}
+            for statement, line in located
+        ]
+
+    def _iter_zip_members(self, file) -> Iterator[Tuple[str, Optional[bytes]]]:
+        """Read supported zip members one at a time (None if too large)."""
+        with zipfile.ZipFile(file) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not self._is_supported(info.filename):
+                    continue
+                if info.file_size > self.max_member_bytes:
+                    yield info.filename, None
+                    continue
+                with archive.open(info) as member:
+                    yield info.filename, self._read_member(member)
+
+    def _iter_tar_members(self, file) -> Iterator[Tuple[str, Optional[bytes]]]:
+        """Read supported tar members sequentially from the compressed stream."""
+        with tarfile.open(fileobj=file, mode='r|gz') as archive:
+            for info in archive:
+                if not info.isfile() or not self._is_supported(info.name):
+                    continue
+                if info.size > self.max_member_bytes:
+                    yield info.name, None
+                    continue
+                member = archive.extractfile(info)
+                if member is not None:
+                    yield info.name, self._read_member(member)
+
+    def _read_member(self, member) -> Optional[bytes]:
+        """Read a member up to max_member_bytes; None if it is larger."""
+        # Declared sizes can lie, so the read itself is bounded too
+        data = member.read(self.max_member_bytes + 1)
+        if len(data) > self.max_member_bytes:
+            return None
+        return data
+
+    def _is_supported(self, name: str) -> bool:
+        """Check whether an archive member should be parsed."""
+        base = name.replace('\\', '/').rsplit('/', 1)[-1]
+
+        # Skip hidden files and macOS resource forks
+        if not base or base.startswith('.') or name.startswith('__MACOSX/'):
+            return False
+
+        return base.rsplit('.', 1)[-1].lower() in MEMBER_EXTENSIONS
@@ -10,6 +10,9 @@ class ExcelParser:
     Handles both .xlsx and .xls formats.
     """
     
+    # Bump when extraction output changes so cached results are invalidated
+    VERSION = 1
+    
     def __init__(self):
         self.sql_keywords = [
             'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'CREATE', 'ALTER', 
@@ -9,6 +9,9 @@ class PDFParser:
     Uses pdfplumber for robust text extraction.
     """
     
+    # Bump when extraction output changes so cached results are invalidated
+    VERSION = 1
+    
     def __init__(self):
         self.sql_keywords = [
             'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'CREATE', 'ALTER', 
@@ -0,0 +1,140 @@
+from typing import Dict, Iterator, List, Optional
+import csv
+import io
+import json
+import sys
+
+# Field names accepted for the statement text and its ID, in priority order
+STATEMENT_FIELDS = ('statement', 'sql', 'query')
+ID_FIELDS = ('id', 'statement_id')
+
+
+class RecordParser:
+    """
+    Parser for machine-readable statement inventories.
+
+    Reads NDJSON, CSV and Parquet statement lists record by record. Each
+    record already holds exactly one statement, so nothing is re-split or
+    filtered by keyword heuristics, and caller-supplied IDs and extra
+    columns are kept alongside the statement.
+    """
+
+    # Bump when extraction output changes so cached results are invalidated
+    VERSION = 1
+
+    # Record formats, by file extension
+    FORMATS = {
+        'ndjson': 'ndjson',
+        'jsonl': 'ndjson',
+        'csv': 'csv',
+        'parquet': 'parquet'
+    }
+
+    def parse(self, file, filename: str) -> List[Dict]:
+        """
+        Read every statement record from a file.
+
+        Args:
+            file: Binary file-like object
+            filename: File name, used to detect the record format
+
+        Returns:
+            List of dicts with 'id', 'statement' and 'attributes' keys
+        """
+        return list(self.iter_records(file, filename))
+
+    def iter_records(self, file, filename: str) -> Iterator[Dict]:
+        """
+        Stream statement records from a file.
+
+        Args:
+            file: Binary file-like object
+            filename: File name, used to detect the record format
+
+        Yields:
+            Dicts with 'id', 'statement' and 'attributes' keys. Records
+            without an ID get their 1-based position as ID.
+        """
+        record_format = self.FORMATS.get(filename.rsplit('.', 1)[-1].lower())
+
+        if record_format == 'ndjson':
+            rows = self._iter_ndjson(file)
+        elif record_format == 'csv':
+            rows = self._iter_csv(file)
+        elif record_format == 'parquet':
+            rows = self._iter_parquet(file)
+        else:
+            raise ValueError(f"Unsupported record format: {filename}")
+
+        for position, row in enumerate(rows, 1):
+            record = self._to_record(row, position)
+            if record:
+                yield record
+
+    def _iter_ndjson(self, file) -> Iterator[Dict]:
+        """Read one JSON object per line."""
+        text = io.TextIOWrapper(file, encoding='utf-8-sig')
+        try:
+            for line_number, line in enumerate(text, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"Invalid JSON on line {line_number}: {e}")
+                if isinstance(row, str):
+                    row = {'statement': row}
+                yield row
+        finally:
+            # Leave the underlying upload open for the caller
+            text.detach()
+
+    def _iter_csv(self, file) -> Iterator[Dict]:
+        """Read CSV rows keyed by the header line."""
+        # Stored procedures easily exceed the default 128 KB field limit
+        csv.field_size_limit(sys.maxsize)
+        text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+        try:
+            yield from csv.DictReader(text)
+        finally:
+            # Leave the underlying upload open for the caller
+            text.detach()
+
+    def _iter_parquet(self, file) -> Iterator[Dict]:
+        """Read Parquet rows batch by batch."""
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet support requires pyarrow (pip install pyarrow)")
+
+        parquet_file = pq.ParquetFile(file)
+        for batch in parquet_file.iter_batches():
+            yield from batch.to_pylist()
+
+    def _to_record(self, row: Dict, position: int) -> Optional[Dict]:
+        """Normalize a raw row into a statement record."""
+        statement_field = next((f for f in STATEMENT_FIELDS if f in row), None)
+        if statement_field is None:
+            raise ValueError(
+                f"Record {position} has no statement field "
+                f"(expected one of: {', '.join(STATEMENT_FIELDS)})"
+            )
+
+        statement = row[statement_field]
+        if statement is None or not str(statement).strip():
+            return None
+
+        id_field = next((f for f in ID_FIELDS if row.get(f) not in (None, '')), None)
+        record_id = str(row[id_field]) if id_field else str(position)
+
+        attributes = {
+            key: value for key, value in row.items()
+            if key != statement_field and key != id_field
+        }
+
+        return {
+            "id": record_id,
+            "statement": str(statement).strip(),
+            "attributes": attributes
+        }
@@ -1,92 +1,131 @@
-import sqlparse
-from typing import List
-import io
+from typing import Iterator, List, Optional, Tuple
+import codecs
+
+from utils.statement_splitter import StatementSplitter
+from utils.statement_formatter import StatementFormatter
 
 class SQLParser:
     """
     Parser for extracting SQL statements from SQL files.
-    Uses sqlparse for proper SQL tokenization.
+    Streams the file through StatementSplitter; reformatting is left to
+    StatementFormatter and only done on request.
     """
     
-    def __init__(self):
-        pass
+    # Bump when extraction output changes so cached results are invalidated
+    VERSION = 1
+    
+    # Bytes read per chunk when streaming a file
+    CHUNK_SIZE = 1024 * 1024
+    
+    def __init__(self, formatter: Optional[StatementFormatter] = None):
+        self.formatter = formatter or StatementFormatter()
     
-    def parse(self, file) -> List[str]:
+    def parse(self, file, reformat: bool = False) -> List[str]:
         """
         Extract SQL statements from a SQL file.
         
         Args:
             file: File-like object or path to SQL file
+            reformat: Whether to reindent statements with sqlparse
             
         Returns:
             List of SQL statements found in the file
         """
-        content = self._read_file(file)
-        return self._extract_statements(content)
+        return list(self.iter_statements(file, reformat=reformat))
     
-    def _read_file(self, file) -> str:
-        """Read content from file."""
-        # Handle different file types
-        if isinstance(file, str):
-            # File path
-            return self._read_with_encoding(file)
-        else:
-            # File-like object (uploaded file)
-            try:
-                content = file.read()
-                if isinstance(content, bytes):
-                    # Try different encodings
-                    for encoding in ['utf-8', 'latin-1', 'cp1252']:
-                        try:
-                            return content.decode(encoding)
-                        except UnicodeDecodeError:
-                            continue
-                    return content.decode('utf-8', errors='replace')
-                return content
-            except Exception:
-                return ""
-    
-    def _read_with_encoding(self, file_path: str) -> str:
-        """Read file with multiple encoding attempts."""
-        encodings = ['utf-8', 'latin-1', 'cp1252', 'utf-16']
+    def iter_statements(self, file, reformat: bool = False) -> Iterator[str]:
+        """
+        Stream SQL statements from a SQL file without loading it whole.
         
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    return f.read()
-            except (UnicodeDecodeError, UnicodeError):
-                continue
+        The file is decoded incrementally and split with StatementSplitter,
+        so statements are yielded as soon as they are complete. This is the
+        path used for large mysqldump / pg_dump files.
         
-        # Fallback with error replacement
-        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-            return f.read()
+        Args:
+            file: File-like object or path to SQL file
+            reformat: Whether to reindent statements with sqlparse
+            
+        Yields:
+            Individual SQL statements in file order
+        """
+        for statement, _ in self.iter_located(file, reformat=reformat):
+            yield statement
     
-    def _extract_statements(self, content: str) -> List[str]:
+    def iter_located(self, file, reformat: bool = False) -> Iterator[Tuple[str, int]]:
         """
-        Extract and split SQL statements using sqlparse.
+        Stream SQL statements together with the line they start on.
         
         Args:
-            content: Raw SQL file content
+            file: File-like object or path to SQL file
+            reformat: Whether to reindent statements with sqlparse
             
-        Returns:
-            List of individual SQL statements
+        Yields:
+            (statement, start_line) tuples in file order
         """
-        statements = []
-        
-        # Remove comments and parse
-        parsed = sqlparse.split(content)
+        splitter = StatementSplitter()
         
-        for stmt in parsed:
-            # Clean up the statement
-            cleaned = self._clean_statement(stmt)
+        for statement, line in splitter.split(self._iter_text(file)):
+            cleaned = self._clean_statement(statement)
             
             if cleaned and self._is_valid_statement(cleaned):
-                statements.append(cleaned)
+                yield (self.formatter.format(cleaned) if reformat else cleaned), line
+    
+    def _iter_text(self, file) -> Iterator[str]:
+        """Read decoded text from a file in chunks."""
+        if isinstance(file, str):
+            # File path
+            with open(file, 'rb') as f:
+                yield from self._decode_chunks(f)
+        else:
+            # File-like object (uploaded file)
+            yield from self._decode_chunks(file)
+    
+    def _decode_chunks(self, file) -> Iterator[str]:
+        """
+        Incrementally decode a binary stream.
         
-        return statements
+        The encoding is sniffed from the byte order mark; files without one
+        are read as UTF-8, switching to latin-1 from the first chunk that is
+        not valid UTF-8.
+        """
+        chunk = file.read(self.CHUNK_SIZE)
+        
+        if isinstance(chunk, str):
+            # Already text (file opened in text mode)
+            while chunk:
+                yield chunk
+                chunk = file.read(self.CHUNK_SIZE)
+            return
+        
+        decoder = codecs.getincrementaldecoder(self._sniff_encoding(chunk))()
+        
+        while chunk:
+            try:
+                text = decoder.decode(chunk)
+            except UnicodeDecodeError:
+                buffered = decoder.getstate()[0]
+                decoder = codecs.getincrementaldecoder('latin-1')()
+                text = decoder.decode(buffered + chunk)
+            if text:
+                yield text
+            chunk = file.read(self.CHUNK_SIZE)
+        
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+    
+    def _sniff_encoding(self, head: bytes) -> str:
+        """Pick a decoder from the byte order mark at the start of the file."""
+        if head.startswith(codecs.BOM_UTF8):
+            return 'utf-8-sig'
+        if head.startswith((codecs.BOM_UTF32_LE, codecs.BOM_UTF32_BE)):
+            return 'utf-32'
+        if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+            return 'utf-16'
+        return 'utf-8'
     
     def _clean_statement(self, statement: str) -> str:
-        """Clean and format a SQL statement."""
+        """Strip whitespace and leading comment lines from a SQL statement."""
         # Strip leading/trailing whitespace
         statement = statement.strip()
         
@@ -105,17 +144,6 @@ class SQLParser:
             else:
                 return ""
         
-        # Format with sqlparse - preserve formatting
-        if statement:
-            statement = sqlparse.format(
-                statement,
-                strip_comments=False,
-                reindent=True,
-                indent_tabs=False,
-                indent_width=2,
-                keyword_case='upper'
-            )
-        
         return statement.strip()
     
     def _is_valid_statement(self, statement: str) -> bool:
@@ -1,3 +1,16 @@
 from .sql_utils import SQLUtils
+from .statement import Statement
+from .dependency_graph import DependencyGraph
+from .statement_splitter import StatementSplitter
+from .statement_formatter import StatementFormatter
+from .file_lru import FileLRU
+from .parse_cache import ParseCache
+from .export_cache import ExportCache
+from .streaming import QueueWriter, iter_writer_output
+from .admission import AdmissionController, AdmissionRejected
 
-__all__ = ["SQLUtils"]
+__all__ = [
+    "SQLUtils", "Statement", "DependencyGraph", "StatementSplitter", "StatementFormatter",
+    "FileLRU", "ParseCache", "ExportCache", "QueueWriter", "iter_writer_output",
+    "AdmissionController", "AdmissionRejected"
+]
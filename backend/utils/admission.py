@@ -0,0 +1,187 @@
+from collections import deque
+from typing import Deque, Dict, Tuple
+import asyncio
+import math
+import time
+
+
+class AdmissionRejected(Exception):
+    """The service is saturated; the request should be retried later."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """The share of the limits one admitted request holds."""
+
+    __slots__ = ('statements', 'size', 'enqueued', 'admitted_at', 'wait_ms')
+
+    def __init__(self, statements: int, size: int):
+        self.statements = statements
+        self.size = size
+        self.enqueued = time.perf_counter()
+        self.admitted_at = None
+        self.wait_ms = 0.0
+
+
+class AdmissionController:
+    """
+    Caps the statements and bytes being worked on at once.
+
+    Requests that fit are admitted straight away. Otherwise they wait in a
+    bounded FIFO queue, so large requests are not starved by small ones.
+    When the queue is full, or a request has waited queue_timeout seconds,
+    it is rejected at once with a Retry-After estimate instead of piling up.
+    A request larger than the limits is admitted only when nothing else is
+    running.
+
+    Runs on the event loop: acquire() and release() must be called from
+    the loop, not from worker threads.
+    """
+
+    def __init__(
+        self,
+        max_statements: int,
+        max_bytes: int,
+        max_queue: int = 16,
+        queue_timeout: float = 30.0
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            max_statements: Statements in flight across admitted requests
+            max_bytes: Bytes (SQL text or uploads) in flight
+            max_queue: Requests allowed to wait for room
+            queue_timeout: Seconds a request may wait before it is rejected
+        """
+        self.max_statements = max_statements
+        self.max_bytes = max_bytes
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._statements = 0
+        self._bytes = 0
+        self._active = 0
+        self._queue: Deque[Tuple[AdmissionTicket, asyncio.Future]] = deque()
+
+        # Moving average of how long admitted requests hold their share
+        self._hold_seconds = 1.0
+
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    async def acquire(self, statements: int, size: int) -> AdmissionTicket:
+        """
+        Wait for room for a request.
+
+        Args:
+            statements: Statements the request works on
+            size: Bytes the request works on
+
+        Returns:
+            AdmissionTicket to pass to release()
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait timed out
+        """
+        ticket = AdmissionTicket(statements, size)
+
+        if not self._queue and self._fits(ticket):
+            self._start(ticket)
+            return ticket
+
+        if len(self._queue) >= self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected(
+                f"Server busy: {self._active} requests in flight and "
+                f"{len(self._queue)} waiting",
+                self.retry_after()
+            )
+
+        entry = (ticket, asyncio.get_running_loop().create_future())
+        self._queue.append(entry)
+
+        try:
+            await asyncio.wait_for(entry[1], self.queue_timeout)
+        except asyncio.TimeoutError:
+            # Admitted just as the wait ran out
+            if ticket.admitted_at is not None:
+                return ticket
+            self._queue.remove(entry)
+            self._admit_waiting()
+            self.timed_out += 1
+            raise AdmissionRejected(
+                f"Server busy: no room within {self.queue_timeout:g}s",
+                self.retry_after()
+            )
+        except asyncio.CancelledError:
+            # Client went away while waiting
+            if ticket.admitted_at is not None:
+                self.release(ticket)
+            else:
+                self._queue.remove(entry)
+                self._admit_waiting()
+            raise
+
+        return ticket
+
+    def release(self, ticket: AdmissionTicket):
+        """Give a request's share back and admit waiting requests that fit."""
+        self._statements -= ticket.statements
+        self._bytes -= ticket.size
+        self._active -= 1
+
+        held = time.perf_counter() - ticket.admitted_at
+        self._hold_seconds = 0.8 * self._hold_seconds + 0.2 * held
+
+        self._admit_waiting()
+
+    def _admit_waiting(self):
+        """Admit queued requests from the head while they fit."""
+        while self._queue and self._fits(self._queue[0][0]):
+            waiting, future = self._queue.popleft()
+            self._start(waiting)
+            if not future.done():
+                future.set_result(None)
+
+    def _fits(self, ticket: AdmissionTicket) -> bool:
+        if not self._active:
+            return True
+        return (self._statements + ticket.statements <= self.max_statements
+                and self._bytes + ticket.size <= self.max_bytes)
+
+    def _start(self, ticket: AdmissionTicket):
+        ticket.admitted_at = time.perf_counter()
+        ticket.wait_ms = (ticket.admitted_at - ticket.enqueued) * 1000
+        self._statements += ticket.statements
+        self._bytes += ticket.size
+        self._active += 1
+        self.admitted += 1
+
+    def retry_after(self) -> int:
+        """Seconds until the queue has likely drained, for Retry-After."""
+        drain = self._hold_seconds * (len(self._queue) + 1) / max(self._active, 1)
+        return min(max(math.ceil(drain), 1), 300)
+
+    def stats(self) -> Dict:
+        """Limits and current load, for the limits endpoint."""
+        return {
+            "max_statements": self.max_statements,
+            "max_bytes": self.max_bytes,
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+            "in_flight": {
+                "requests": self._active,
+                "statements": self._statements,
+                "bytes": self._bytes
+            },
+            "queue_depth": len(self._queue),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "retry_after": self.retry_after()
+        }
@@ -0,0 +1,205 @@
+from typing import Dict, Iterable, List, Optional, Set, Union
+import heapq
+import re
+
+from utils.statement import Statement, _QUOTES
+
+# References the lexer-based table scan does not see
+_NAME = r'([\w.$"`\[\]]+)'
+_EXTRA_REFERENCES = (
+    re.compile(r'\bREFERENCES\s+' + _NAME, re.IGNORECASE),
+    re.compile(r'\b(?:CREATE|ALTER|DROP)\b[^;(]*?\b(?:INDEX|TRIGGER)\b[^;(]*?\bON\s+' + _NAME, re.IGNORECASE),
+    re.compile(r'\b(?:CALL|EXEC(?:UTE)?)\s+' + _NAME, re.IGNORECASE),
+)
+
+# Statement types that write to the table they target
+_DML_WRITES = ('insert', 'update', 'delete', 'merge', 'truncate')
+
+# Statement types that define or change the object they name
+_DDL_VERBS = ('CREATE', 'ALTER', 'DROP')
+
+
+class DependencyGraph:
+    """
+    Dependency DAG across the statements of a script.
+
+    A statement depends on the statement that last created, altered or
+    wrote an object before it reads or writes that object, and an object
+    write waits for the reads before it. Accesses to an object that is
+    only created further down the script are moved after that CREATE, so
+    views come after their base tables and procedures after the objects
+    they touch even when the script lists them the other way round.
+    """
+
+    def __init__(self, statements: Iterable[Union[str, Statement]]):
+        """
+        Build the graph.
+
+        Args:
+            statements: Statements in script order (text or Statement objects)
+        """
+        self.statements = [s if isinstance(s, Statement) else Statement(s) for s in statements]
+        self.dependencies: List[Set[int]] = [set() for _ in self.statements]
+        self.dependents: List[Set[int]] = [set() for _ in self.statements]
+        self._build()
+
+    def _build(self):
+        """Derive the edges from each statement's writes and reads."""
+        accesses = [self._accesses(statement) for statement in self.statements]
+
+        # First statement creating each object, for forward references
+        creators: Dict[str, int] = {}
+        for i, (_, _, creates, _) in enumerate(accesses):
+            for name in creates:
+                creators.setdefault(name, i)
+
+        last_writer: Dict[str, int] = {}
+        readers_since_write: Dict[str, List[int]] = {}
+        # Accesses to objects defined further down, replayed at the definition
+        deferred: Dict[str, List] = {}
+
+        def access(i: int, name: str, is_write: bool):
+            writer = last_writer.get(name)
+            if writer is not None:
+                self._add_edge(writer, i)
+            if is_write:
+                for reader in readers_since_write.pop(name, ()):
+                    self._add_edge(reader, i)
+                last_writer[name] = i
+            elif self.statements[i].type != 'CREATE':
+                # Definitions (views, procedures) only need the object to
+                # exist; later writes need not wait for them
+                readers_since_write.setdefault(name, []).append(i)
+
+        for i, (writes, reads, creates, drops) in enumerate(accesses):
+            for name in sorted(writes | reads):
+                # DROP ... before CREATE is a deliberate reset; keep it first
+                if creators.get(name, i) > i and not drops:
+                    deferred.setdefault(name, []).append((i, name in writes))
+                else:
+                    access(i, name, name in writes)
+
+            for name in creates:
+                if creators[name] == i:
+                    for j, is_write in deferred.pop(name, ()):
+                        access(j, name, is_write)
+
+    def _accesses(self, statement: Statement):
+        """(writes, reads, creates, drops) of one statement; names are normalized."""
+        object_type, object_name = statement.object
+        verb = statement.type
+        writes, creates = set(), set()
+
+        if object_name and (verb in _DDL_VERBS or object_type in _DML_WRITES):
+            writes.add(self._key(object_name))
+            if verb == 'CREATE':
+                creates.add(self._key(object_name))
+
+        reads = {self._key(name) for name in statement.tables}
+        for pattern in _EXTRA_REFERENCES:
+            reads.update(self._key(name) for name in pattern.findall(statement.text))
+
+        return writes, reads - writes, creates, verb == 'DROP'
+
+    @staticmethod
+    def _key(name: str) -> str:
+        """Normalize an object name for matching."""
+        return _QUOTES.sub('', name).lower()
+
+    def _add_edge(self, before: int, after: int):
+        if before != after:
+            self.dependencies[after].add(before)
+            self.dependents[before].add(after)
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def order(self) -> List[int]:
+        """
+        A valid execution order of statement indices.
+
+        Ties keep script order, so an already valid script is unchanged.
+        Statements caught in a dependency cycle keep script order too.
+        """
+        return [i for level in self._walk() for i in level]
+
+    def levels(self) -> List[List[int]]:
+        """
+        Statement indices grouped into levels that can run in parallel.
+
+        Every statement only depends on statements in earlier levels.
+        """
+        return list(self._walk(by_level=True))
+
+    def cycle_breaks(self) -> List[int]:
+        """
+        Statements released early to break a dependency cycle.
+
+        Each one is the earliest statement still waiting when no statement
+        was ready; it and the rest of its cycle keep script order.
+        """
+        breaks = []
+        for _ in self._walk(breaks=breaks):
+            pass
+        return breaks
+
+    def _walk(self, by_level: bool = False, breaks: Optional[List[int]] = None):
+        """
+        Kahn's algorithm, lowest index first; yields lists of indices.
+
+        Statements released to break a cycle are appended to breaks.
+        """
+        remaining = [len(deps) for deps in self.dependencies]
+        heap = [i for i, count in enumerate(remaining) if count == 0]
+        heapq.heapify(heap)
+        emitted = 0
+
+        while emitted < len(self.statements):
+            if not heap:
+                # Cycle: release the earliest statement still waiting
+                stuck = min(i for i, count in enumerate(remaining) if count > 0)
+                if breaks is not None:
+                    breaks.append(stuck)
+                remaining[stuck] = 0
+                heap = [stuck]
+
+            if by_level:
+                level, heap = sorted(heap), []
+            else:
+                level = [heapq.heappop(heap)]
+
+            for i in level:
+                remaining[i] = -1
+                for j in self.dependents[i]:
+                    if remaining[j] > 0:
+                        remaining[j] -= 1
+                        if remaining[j] == 0:
+                            heapq.heappush(heap, j)
+
+            emitted += len(level)
+            yield level
+
+    @classmethod
+    def order_results(cls, results: List[Dict]) -> List[Dict]:
+        """
+        Reorder conversion results into a valid execution order.
+
+        Converted SQL is analyzed where there is one, the original otherwise.
+
+        Args:
+            results: Conversion results in script order
+
+        Returns:
+            The same results, reordered
+        """
+        graph = cls(result.get('converted') or result['original'] for result in results)
+        return [results[i] for i in graph.order()]
+
+    def to_dict(self) -> Dict:
+        """Graph summary for API responses."""
+        return {
+            "order": self.order(),
+            "levels": self.levels(),
+            "dependencies": [sorted(deps) for deps in self.dependencies],
+            "cycles": self.cycle_breaks()
+        }
@@ -0,0 +1,119 @@
+from typing import Dict, Iterator, List, Optional
+import hashlib
+import json
+
+from utils.file_lru import FileLRU
+
+
+class ExportCache:
+    """
+    Size-bounded on-disk LRU of generated export files.
+
+    Artifacts are keyed by a hash of the normalized results, the dialects
+    and the export format, so exporting the same result set again is a
+    file read instead of another PDF/Word layout pass. The key doubles as
+    the ETag of the download.
+    """
+
+    # Bump when generator output changes so cached artifacts are invalidated
+    VERSION = 2
+
+    def __init__(self, cache_dir: Optional[str], max_bytes: int = 512 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory for cached files. Caching is disabled when None.
+            max_bytes: Total size of cached files kept before the least
+                recently used ones are evicted
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._files = FileLRU(cache_dir, '.bin', max_bytes)
+
+    @classmethod
+    def make_key(
+        cls,
+        results: List[Dict],
+        source_dialect: str,
+        target_dialect: str,
+        export_format: str,
+        *options
+    ) -> str:
+        """
+        Build a cache key for an export.
+
+        Args:
+            results: Conversion results being exported
+            source_dialect: Source SQL dialect
+            target_dialect: Target SQL dialect
+            export_format: Output format name
+            *options: Any export options that change the output
+
+        Returns:
+            Hex digest, safe to use as a file name and ETag
+        """
+        digest = hashlib.sha256()
+        header = [str(cls.VERSION), source_dialect, target_dialect, export_format]
+        header.extend(str(option) for option in options)
+        digest.update('|'.join(header).encode('utf-8'))
+
+        # Key order must not matter, so results are hashed in canonical form
+        for result in results:
+            digest.update(b'\n')
+            digest.update(json.dumps(
+                result, sort_keys=True, separators=(',', ':'), default=str
+            ).encode('utf-8'))
+
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached artifact and mark it as recently used.
+
+        Args:
+            key: Key from make_key
+
+        Returns:
+            Path of the cached file, or None on a miss
+        """
+        return self._files.touch(key)
+
+    def store(self, key: str, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        """
+        Pass generated chunks through while writing them to the cache.
+
+        The artifact only becomes visible once the whole stream has been
+        written; an interrupted or failed export leaves nothing behind.
+
+        Args:
+            key: Key from make_key
+            chunks: Chunks of the generated file
+
+        Yields:
+            The same chunks, unchanged
+        """
+        tmp_path = None
+        tmp_file = None
+
+        try:
+            tmp_path = self._files.temp_path(key)
+            if tmp_path:
+                tmp_file = open(tmp_path, 'wb')
+        except OSError as e:
+            print(f"Error writing export cache entry {key}: {e}")
+
+        completed = False
+        try:
+            for chunk in chunks:
+                if tmp_file is not None:
+                    tmp_file.write(chunk)
+                yield chunk
+            completed = True
+        finally:
+            if tmp_file is not None:
+                tmp_file.close()
+                if completed:
+                    self._files.commit(key, tmp_path)
+                else:
+                    self._files.remove(tmp_path)
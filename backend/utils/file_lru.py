@@ -0,0 +1,162 @@
+from collections import OrderedDict
+from typing import Optional
+import os
+import threading
+import uuid
+
+
+class FileLRU:
+    """
+    Size-bounded least-recently-used index over cache files in one directory.
+
+    Files are named <key><suffix>. A file is written to a temporary path
+    first and published with commit(), which evicts the least recently used
+    files once their total size exceeds max_bytes. The modification time
+    is the LRU order, so the index is rebuilt from the directory after a
+    restart. Safe to use from several threads.
+    """
+
+    def __init__(self, cache_dir: Optional[str], suffix: str, max_bytes: int):
+        """
+        Initialize the index.
+
+        Args:
+            cache_dir: Directory holding the files. Disabled when None.
+            suffix: File name suffix of cache files, e.g. '.json'
+            max_bytes: Total size of files kept before the least recently
+                used ones are evicted
+        """
+        self.cache_dir = cache_dir
+        self.suffix = suffix
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._load_index()
+
+    @property
+    def total_bytes(self) -> int:
+        """Total size of the indexed files."""
+        return self._total_bytes
+
+    def path(self, key: str) -> Optional[str]:
+        """Get the on-disk path for a key, or None when disabled."""
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, f"{key}{self.suffix}")
+
+    def temp_path(self, key: str) -> Optional[str]:
+        """Get a fresh temporary path to write a key's file to before commit()."""
+        path = self.path(key)
+        if not path:
+            return None
+        os.makedirs(self.cache_dir, exist_ok=True)
+        return f"{path}.{uuid.uuid4().hex}.tmp"
+
+    def touch(self, key: str) -> Optional[str]:
+        """
+        Mark a file as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Path of the file, or None if it is not cached
+        """
+        path = self.path(key)
+        if not path:
+            return None
+
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+
+        try:
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._forget(key)
+            return None
+
+        return path
+
+    def commit(self, key: str, tmp_path: str) -> bool:
+        """
+        Publish a fully written temporary file and evict old files if over budget.
+
+        Args:
+            key: Cache key
+            tmp_path: Path from temp_path() holding the complete file
+
+        Returns:
+            True if the file was published, False if it was discarded
+        """
+        path = self.path(key)
+        try:
+            size = os.path.getsize(tmp_path)
+            if size > self.max_bytes:
+                self.remove(tmp_path)
+                return False
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing cache file {path}: {e}")
+            self.remove(tmp_path)
+            return False
+
+        with self._lock:
+            self._forget(key)
+            self._entries[key] = size
+            self._total_bytes += size
+            self._evict()
+
+        return True
+
+    def remove(self, path: Optional[str]):
+        """Delete a file, ignoring files that are already gone."""
+        if not path:
+            return
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Drop least recently used files until under budget (caller holds the lock)."""
+        while self._total_bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._forget(oldest)
+            self.remove(self.path(oldest))
+
+    def _forget(self, key: str):
+        """Drop a key from the index (caller holds the lock)."""
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _load_index(self):
+        """Rebuild the index from the files already on disk."""
+        if not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return
+
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith('.tmp'):
+                # Left over from an interrupted write
+                self.remove(path)
+                continue
+            if not name.endswith(self.suffix):
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, name[:-len(self.suffix)], stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self._total_bytes += size
+
+        # The limit may have been lowered since the files were written
+        self._evict()
@@ -0,0 +1,166 @@
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import hashlib
+import json
+import threading
+
+from utils.file_lru import FileLRU
+
+
+class ParseCache:
+    """
+    Content-addressed cache of parsed file results.
+
+    Extracted statements are keyed by the SHA-256 of the uploaded bytes,
+    the parser name and its version, so a repeat upload of the same file
+    skips pdfplumber/pandas entirely. Entries live in an in-memory LRU
+    backed by JSON files on disk, which survive restarts. Both tiers are
+    bounded by size, measured as the JSON length of each result.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_entries: int = 128,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_memory_bytes: int = 64 * 1024 * 1024
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory for on-disk entries. Disk caching is
+                disabled when None.
+            max_entries: Maximum number of results kept in memory
+            max_bytes: Total size of on-disk entries kept before the least
+                recently used ones are evicted
+            max_memory_bytes: Total size of results kept in memory; larger
+                results are only cached on disk
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self._memory: "OrderedDict[str, Tuple[List, int]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._files = FileLRU(cache_dir, '.json', max_bytes)
+
+    @staticmethod
+    def hash_file(file, chunk_size: int = 1024 * 1024) -> str:
+        """
+        Hash a binary file object in chunks and rewind it.
+
+        Args:
+            file: Seekable binary file-like object
+            chunk_size: Bytes read per chunk
+
+        Returns:
+            Hex SHA-256 digest of the file content
+        """
+        digest = hashlib.sha256()
+        file.seek(0)
+
+        chunk = file.read(chunk_size)
+        while chunk:
+            digest.update(chunk)
+            chunk = file.read(chunk_size)
+
+        file.seek(0)
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(content_hash: str, parser, *options) -> str:
+        """
+        Build a cache key for a parser run.
+
+        Args:
+            content_hash: Digest returned by hash_file
+            parser: Parser instance; its class name and VERSION are part of the key
+            *options: Any parse options that change the output
+
+        Returns:
+            Cache key safe to use as a file name
+        """
+        parts = [content_hash, type(parser).__name__, str(getattr(parser, 'VERSION', 0))]
+        parts.extend(str(option) for option in options)
+        return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[List]:
+        """
+        Look up cached statements.
+
+        Args:
+            key: Key from make_key
+
+        Returns:
+            Cached statements, or None on a miss
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry[0]
+
+        path = self._files.touch(key)
+        if not path:
+            return None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = f.read()
+            statements = json.loads(data)
+        except (OSError, ValueError) as e:
+            print(f"Error reading parse cache entry {key}: {e}")
+            return None
+
+        self._remember(key, statements, len(data))
+        return statements
+
+    def set(self, key: str, statements: List):
+        """
+        Store parsed statements in memory and on disk.
+
+        Args:
+            key: Key from make_key
+            statements: Extracted statements (any JSON-serializable list)
+        """
+        try:
+            data = json.dumps(statements)
+        except (TypeError, ValueError) as e:
+            print(f"Error writing parse cache entry {key}: {e}")
+            return
+
+        self._remember(key, statements, len(data))
+
+        tmp_path = None
+        try:
+            tmp_path = self._files.temp_path(key)
+            if not tmp_path:
+                return
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+        except OSError as e:
+            print(f"Error writing parse cache entry {key}: {e}")
+            self._files.remove(tmp_path)
+            return
+
+        self._files.commit(key, tmp_path)
+
+    def _remember(self, key: str, statements: List, size: int):
+        """Insert into the in-memory LRU, evicting the oldest entries while over budget."""
+        if size > self.max_memory_bytes:
+            return
+
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= previous[1]
+
+            self._memory[key] = (statements, size)
+            self._memory_bytes += size
+
+            while self._memory and (len(self._memory) > self.max_entries
+                                    or self._memory_bytes > self.max_memory_bytes):
+                _, (_, evicted) = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted
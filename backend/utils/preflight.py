@@ -0,0 +1,162 @@
+from typing import Dict, Iterable, List, Optional, Union
+import re
+
+from sqlparse import tokens as T
+
+from utils.statement import Statement
+
+# Statement words the sqlparse lexer does not mark as keywords; any lexer
+# keyword is already accepted as a statement start
+_OTHER_LEADING_WORDS = {
+    'OPTIMIZE', 'REPAIR', 'KILL', 'DBCC', 'RAISERROR', 'WAITFOR', 'RESTORE', 'REFRESH',
+    'HANDLER', 'CHECKSUM', 'INSTALL', 'ATTACH', 'DETACH', 'THROW'
+}
+
+# Words that show up as identifiers in prose but are unlikely names in SQL
+_PROSE_WORDS = {
+    'the', 'your', 'you', 'please', 'this', 'that', 'these', 'those', 'is', 'are',
+    'was', 'were', 'will', 'would', 'should', 'could', 'can', 'my', 'our', 'their',
+    'his', 'her', 'its', 'an', 'of', 'to', 'we', 'it', 'has', 'have', 'be', 'been',
+    'which', 'there', 'here', 'then', 'than', 'also', 'just', 'very', 'must'
+}
+
+# Clause a statement type cannot do without
+_REQUIRED_CLAUSES = {
+    'INSERT': ('INTO', 'VALUES', 'SELECT'),
+    'UPDATE': ('SET',),
+    'DELETE': ('FROM',),
+    'MERGE': ('USING',),
+}
+
+# Identifier quoting each dialect accepts besides double quotes
+_DIALECT_QUOTES = {
+    'MySQL': '`', 'MariaDB': '`', 'BigQuery': '`',
+    'SQL Server': '[', 'SQLite': '`[',
+}
+
+_QUOTED_NAME = re.compile(r'^[`\[]')
+
+# Penalties subtracted from a confidence of 1.0
+_PENALTIES = {
+    'no_statement': 0.6,
+    'missing_clause': 0.3,
+    'lexer_error': 0.3,
+    'unbalanced': 0.3,
+    'prose_word': 0.2,
+    'sentence_end': 0.3,
+    'foreign_quote': 0.1,
+}
+_MAX_PROSE_PENALTY = 0.6
+
+
+class PreflightValidator:
+    """
+    Fast local check that a fragment is SQL before it is sent to the model.
+
+    Each statement is tokenized with the sqlparse lexer (shared with the
+    rest of the pipeline through Statement) and scored from 0 to 1: does it
+    start like a statement, does it have the clauses its type needs, are
+    quotes and parentheses balanced, does it read like prose, and does its
+    identifier quoting fit the source dialect. Fragments below
+    min_confidence are not worth an LLM call.
+    """
+
+    MODES = ('drop', 'quarantine')
+
+    def __init__(self, min_confidence: float = 0.5, dialect: Optional[str] = None):
+        """
+        Initialize the validator.
+
+        Args:
+            min_confidence: Statements scoring below this are rejected
+            dialect: Source dialect, for dialect-specific identifier quoting
+        """
+        self.min_confidence = min_confidence
+        self.dialect = dialect
+
+    def check(self, statement: Union[str, Statement]) -> Dict:
+        """
+        Score one statement.
+
+        Args:
+            statement: Statement text or Statement object
+
+        Returns:
+            Dict with 'confidence' (0-1), 'issues' (list of reasons) and
+            'passed' (confidence >= min_confidence)
+        """
+        if not isinstance(statement, Statement):
+            statement = Statement(statement)
+
+        issues = []
+        penalty = 0.0
+        significant = statement.analysis.significant
+
+        if not significant:
+            return {"confidence": 0.0, "issues": ["empty statement"], "passed": False}
+
+        keywords = {value.upper() for ttype, value in significant if ttype in T.Keyword}
+        first_type, first_value = significant[0]
+
+        if statement.type == 'UNKNOWN' and not (
+            first_type in T.Keyword or first_value.upper() in _OTHER_LEADING_WORDS
+        ):
+            issues.append(f"does not start with a SQL statement keyword ({first_value!r})")
+            penalty += _PENALTIES['no_statement']
+
+        required = _REQUIRED_CLAUSES.get(statement.type)
+        if required and not keywords.intersection(required):
+            issues.append(f"{statement.type} without {'/'.join(required)}")
+            penalty += _PENALTIES['missing_clause']
+        elif statement.type in ('CREATE', 'ALTER', 'DROP') and statement.object[1] is None:
+            issues.append(f"{statement.type} without an object name")
+            penalty += _PENALTIES['missing_clause']
+
+        if any(ttype in T.Error for ttype, _ in significant):
+            issues.append("unterminated quote or unexpected characters")
+            penalty += _PENALTIES['lexer_error']
+
+        depth = 0
+        for ttype, value in significant:
+            if ttype in T.Punctuation:
+                depth += (value == '(') - (value == ')')
+                if depth < 0:
+                    break
+        if depth:
+            issues.append("unbalanced parentheses")
+            penalty += _PENALTIES['unbalanced']
+
+        prose_words = [
+            value for ttype, value in significant
+            if ttype in T.Name and value.lower() in _PROSE_WORDS
+        ]
+        if prose_words:
+            issues.append(f"reads like prose ({', '.join(prose_words[:3])})")
+            penalty += min(len(prose_words) * _PENALTIES['prose_word'], _MAX_PROSE_PENALTY)
+
+        # Parsers append a semicolon to every fragment; look before it
+        ending = [value for _, value in significant if value != ';'][-1:]
+        if ending and ending[0] in ('.', '?', '!'):
+            issues.append("ends like a sentence")
+            penalty += _PENALTIES['sentence_end']
+
+        if self.dialect is not None:
+            accepted = _DIALECT_QUOTES.get(self.dialect, '')
+            foreign = {
+                value[0] for ttype, value in significant
+                if ttype in T.Name and _QUOTED_NAME.match(value) and value[0] not in accepted
+            }
+            if foreign:
+                issues.append(f"identifier quoting {''.join(sorted(foreign))} is not {self.dialect}")
+                penalty += _PENALTIES['foreign_quote']
+
+        confidence = round(max(0.0, 1.0 - penalty), 2)
+        return {
+            "confidence": confidence,
+            "issues": issues,
+            "passed": confidence >= self.min_confidence
+        }
+
+    def check_many(self, statements: Iterable[Union[str, Statement]]) -> List[Dict]:
+        """Score several statements; see check()."""
+        return [self.check(statement) for statement in statements]
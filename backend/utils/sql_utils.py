@@ -1,7 +1,9 @@
 import sqlparse
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import re
 
+from utils.statement import Statement
+
 class SQLUtils:
     """
     Utility class for SQL processing and validation.
@@ -40,12 +42,6 @@ class SQLUtils:
         if not sql or len(sql.strip()) < 5:
             return False
         
-        # Parse the SQL
-        parsed = sqlparse.parse(sql)
-        
-        if not parsed:
-            return False
-        
         # Check for SQL keywords
         sql_keywords = [
             'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'CREATE', 
@@ -64,23 +60,26 @@ class SQLUtils:
             sql: SQL statement
             
         Returns:
-            List of table names found
+            List of table names found, in order of first appearance
         """
-        tables = []
-        
-        # Simple pattern matching for FROM and JOIN clauses
-        patterns = [
-            r'FROM\s+(\w+)',
-            r'JOIN\s+(\w+)',
-            r'INTO\s+(\w+)',
-            r'UPDATE\s+(\w+)'
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, sql, re.IGNORECASE)
-            tables.extend(matches)
+        # Read from the shared token stream instead of re-scanning the text
+        return list(Statement(sql).tables)
+    
+    @staticmethod
+    def get_object(sql: str) -> Tuple[str, Optional[str]]:
+        """
+        Determine the database object a statement defines or changes.
         
-        return list(set(tables))
+        Args:
+            sql: SQL statement
+            
+        Returns:
+            Tuple of (object_type, object_name). DDL gives the object type
+            ('table', 'view', 'procedure', ...); other statements give their
+            lower-case statement type and the table they write to (or the
+            first table they read). The name is None if none is found.
+        """
+        return Statement(sql).object
     
     @staticmethod
     def split_statements(sql: str) -> List[str]:
@@ -107,12 +106,10 @@ class SQLUtils:
         Returns:
             Statement type (SELECT, INSERT, UPDATE, DELETE, etc.) or None
         """
-        parsed = sqlparse.parse(sql)
+        if not sql or not sql.strip():
+            return None
         
-        if parsed and len(parsed) > 0:
-            return parsed[0].get_type()
-        
-        return None
+        return Statement(sql).type
     
     @staticmethod
     def contains_where_clause(sql: str) -> bool:
@@ -0,0 +1,267 @@
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import re
+import threading
+
+from sqlparse import lexer
+from sqlparse import tokens as T
+
+# DDL statement head: verb, object type and object name
+_DDL_OBJECT = re.compile(
+    r'^\s*(?:CREATE|ALTER|DROP)\s+(?:OR\s+REPLACE\s+)?(?:(?:GLOBAL|LOCAL)\s+)?'
+    r'(?:TEMP(?:ORARY)?\s+)?(?:UNIQUE\s+)?(?:MATERIALIZED\s+)?'
+    r'(TABLE|VIEW|PROCEDURE|FUNCTION|INDEX|TRIGGER|SEQUENCE|SCHEMA|TYPE|PACKAGE(?:\s+BODY)?)\s+'
+    r'(?:IF\s+(?:NOT\s+)?EXISTS\s+)?([\w.$"`\[\]]+)',
+    re.IGNORECASE
+)
+
+# Table written to by a DML statement
+_DML_TARGET = re.compile(
+    r'^\s*(?:INSERT\s+(?:INTO\s+)?|UPDATE\s+|DELETE\s+(?:FROM\s+)?|MERGE\s+(?:INTO\s+)?|'
+    r'TRUNCATE\s+(?:TABLE\s+)?)([\w.$"`\[\]]+)',
+    re.IGNORECASE
+)
+
+# Keywords followed by a table reference
+_TABLE_KEYWORDS = ('FROM', 'INTO', 'UPDATE')
+
+# Characters quoting identifiers in the supported dialects
+_QUOTES = re.compile(r'["`\[\]]')
+
+
+class _Analysis:
+    """
+    Lexer-derived facts about one statement text, each computed at most once.
+
+    Only the facts (type, tables, object) are kept. Token lists are built
+    on demand and dropped again, so a cached analysis costs a few names
+    rather than the whole token stream of the statement.
+    """
+
+    __slots__ = ('text', '_type', '_tables', '_object')
+
+    def __init__(self, text: str):
+        self.text = text
+        self._type = None
+        self._tables = None
+        self._object = None
+
+    @property
+    def tokens(self) -> List[Tuple]:
+        """Full token stream, lexed again on every access."""
+        tokens = list(lexer.tokenize(self.text))
+        if self._type is None:
+            self._derive(self._significant(tokens))
+        return tokens
+
+    @property
+    def significant(self) -> List[Tuple]:
+        """Tokens without whitespace and comments, lexed again on every access."""
+        significant = self._significant(lexer.tokenize(self.text))
+        if self._type is None:
+            self._derive(significant)
+        return significant
+
+    @property
+    def type(self) -> str:
+        if self._type is None:
+            self._derive(self._significant(lexer.tokenize(self.text)))
+        return self._type
+
+    @property
+    def tables(self) -> List[str]:
+        if self._type is None:
+            self._derive(self._significant(lexer.tokenize(self.text)))
+        return self._tables
+
+    @property
+    def object(self) -> Tuple[str, Optional[str]]:
+        if self._object is None:
+            self._object = self._database_object()
+        return self._object
+
+    @staticmethod
+    def _significant(tokens) -> List[Tuple]:
+        return [
+            (ttype, value) for ttype, value in tokens
+            if ttype not in T.Whitespace and ttype not in T.Newline
+            and ttype not in T.Comment
+        ]
+
+    def _derive(self, significant: List[Tuple]):
+        """Compute type and tables from one token pass."""
+        self._tables = self._referenced_tables(significant)
+        # Set last: a non-None type marks the facts as complete
+        self._type = self._statement_type(significant)
+
+    def _statement_type(self, significant: List[Tuple]) -> str:
+        """First DML/DDL keyword, looking past a leading WITH clause."""
+        depth = 0
+        in_cte = False
+
+        for ttype, value in significant:
+            if ttype in T.Punctuation:
+                depth += value == '('
+                depth -= value == ')'
+                continue
+            if depth:
+                continue
+            if ttype in T.Keyword.DML or ttype in T.Keyword.DDL:
+                return value.upper()
+            if ttype in T.Keyword.CTE:
+                in_cte = True
+                continue
+            if not in_cte:
+                return 'UNKNOWN'
+
+        return 'UNKNOWN'
+
+    def _referenced_tables(self, significant: List[Tuple]) -> List[str]:
+        """Names following FROM, JOIN, INTO and UPDATE, in order of appearance."""
+        tables = []
+
+        for i, (ttype, value) in enumerate(significant):
+            if ttype not in T.Keyword:
+                continue
+            keyword = value.upper()
+            if keyword not in _TABLE_KEYWORDS and not keyword.endswith('JOIN'):
+                continue
+
+            name = self._read_name(significant, i + 1)
+            if name and name not in tables:
+                tables.append(name)
+
+        return tables
+
+    def _read_name(self, significant: List[Tuple], start: int) -> Optional[str]:
+        """Read a possibly dotted, possibly quoted name starting at a token index."""
+        parts = []
+        expect_part = True
+
+        for ttype, value in significant[start:]:
+            if expect_part and (ttype in T.Name or ttype in T.Literal.String.Symbol
+                                or (ttype in T.Keyword and ttype not in T.Keyword.DML)):
+                if ttype in T.Keyword and not parts and value.upper() in ('SELECT', 'WITH'):
+                    break
+                parts.append(_QUOTES.sub('', value))
+                expect_part = False
+            elif not expect_part and ttype in T.Punctuation and value == '.':
+                expect_part = True
+            else:
+                break
+
+        return '.'.join(parts) if parts else None
+
+    def _database_object(self) -> Tuple[str, Optional[str]]:
+        """Object type and name a statement defines or changes."""
+        match = _DDL_OBJECT.match(self.text)
+        if match:
+            object_type = re.sub(r'\s+', '_', match.group(1).lower())
+            return object_type, _QUOTES.sub('', match.group(2))
+
+        statement_type = self.type.lower()
+
+        match = _DML_TARGET.match(self.text)
+        if match:
+            return statement_type, _QUOTES.sub('', match.group(1))
+
+        return statement_type, self.tables[0] if self.tables else None
+
+
+class Statement:
+    """
+    A SQL statement with its lexer-derived facts, computed once.
+
+    The statement type, referenced tables and database object are derived
+    lazily on first access and shared by every Statement with the same
+    text (across requests and threads), so SQLUtils, the converter and the
+    generators do not tokenize the same SQL again. The token stream itself
+    is not kept. Position information (source file, start/end line) is
+    kept per occurrence.
+    """
+
+    __slots__ = ('text', 'source', 'start_line', '_analysis')
+
+    # Shared analyses, keyed by statement text; used from worker threads
+    _analyses: "OrderedDict[str, _Analysis]" = OrderedDict()
+    _analyses_lock = threading.Lock()
+    _max_analyses = 4096
+
+    def __init__(self, text: str, start_line: Optional[int] = None, source: Optional[str] = None):
+        """
+        Wrap a statement.
+
+        Args:
+            text: SQL statement text
+            start_line: 1-based line the statement starts on in its source
+            source: Name of the file the statement came from
+        """
+        self.text = text
+        self.start_line = start_line
+        self.source = source
+        self._analysis = None
+
+    @property
+    def analysis(self) -> _Analysis:
+        if self._analysis is None:
+            self._analysis = self._shared_analysis(self.text)
+        return self._analysis
+
+    @property
+    def tokens(self) -> List[Tuple]:
+        """Flat (ttype, value) token stream from the sqlparse lexer (not cached)."""
+        return self.analysis.tokens
+
+    @property
+    def type(self) -> str:
+        """Statement type (SELECT, INSERT, CREATE, ...) or 'UNKNOWN'."""
+        return self.analysis.type
+
+    @property
+    def tables(self) -> List[str]:
+        """Tables referenced after FROM, JOIN, INTO and UPDATE."""
+        return self.analysis.tables
+
+    @property
+    def object(self) -> Tuple[str, Optional[str]]:
+        """(object_type, object_name) the statement defines or changes."""
+        return self.analysis.object
+
+    @property
+    def span(self) -> Tuple[Optional[int], Optional[int]]:
+        """(start_line, end_line) in the source, if known."""
+        if self.start_line is None:
+            return None, None
+        return self.start_line, self.start_line + self.text.count('\n')
+
+    @classmethod
+    def set_cache_size(cls, max_analyses: int):
+        """Set how many statement analyses are kept for reuse."""
+        with cls._analyses_lock:
+            cls._max_analyses = max_analyses
+            while len(cls._analyses) > max_analyses:
+                cls._analyses.popitem(last=False)
+
+    @classmethod
+    def _shared_analysis(cls, text: str) -> _Analysis:
+        """Get the analysis for a text from the bounded LRU, creating it if needed."""
+        with cls._analyses_lock:
+            analysis = cls._analyses.get(text)
+
+            if analysis is not None:
+                cls._analyses.move_to_end(text)
+                return analysis
+
+            analysis = _Analysis(text)
+            cls._analyses[text] = analysis
+
+            if len(cls._analyses) > cls._max_analyses:
+                cls._analyses.popitem(last=False)
+
+            return analysis
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return f"Statement({self.text[:40]!r}, type={self.type!r})"
@@ -0,0 +1,162 @@
+from typing import Dict, List, Optional, Tuple
+
+from sqlparse import tokens as T
+
+from utils.statement import Statement
+
+# Line the skeleton carries in place of the body; must come back unchanged
+BODY_MARKER = "-- @@BODY@@"
+
+# Control blocks closed by END IF / END LOOP / ...; only counted when the
+# matching END form appears, since T-SQL's IF and WHILE have none
+_COMPOUND_BLOCKS = ('IF', 'LOOP', 'WHILE', 'REPEAT', 'FOR')
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough model token count of a text (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+class StatementChunker:
+    """
+    Splits a large procedural statement at safe boundaries.
+
+    The outermost BEGIN ... END body of a procedure, function, trigger or
+    block is cut into its top-level statements (control blocks such as
+    IF ... END IF stay whole) and grouped into parts under a token budget.
+    What is left - header, leading declarations and the closing END - is a
+    skeleton with BODY_MARKER where the body was, converted on its own and
+    given to every part as context.
+    """
+
+    def __init__(self, max_part_tokens: int = 1000):
+        """
+        Initialize the chunker.
+
+        Args:
+            max_part_tokens: Estimated token budget for one part of the body
+        """
+        self.max_part_tokens = max_part_tokens
+
+    def split(self, text: str) -> Optional[Dict]:
+        """
+        Split a statement into a skeleton and body parts.
+
+        Args:
+            text: Statement text
+
+        Returns:
+            Dict with 'skeleton' (str) and 'parts' (list of str), or None if
+            the statement has no body that can be split safely
+        """
+        tokens = Statement(text).tokens
+        body = self._find_body(tokens)
+        if body is None:
+            return None
+
+        start, end = body
+        statements = self._split_body(tokens[start:end])
+        if statements is None:
+            return None
+
+        # Declarations stay with the header; Oracle and T-SQL put them elsewhere
+        declarations = []
+        while statements and statements[0].lstrip().upper().startswith('DECLARE'):
+            declarations.append(statements.pop(0))
+
+        if len(statements) < 2:
+            return None
+
+        head = ''.join(value for _, value in tokens[:start])
+        tail = ''.join(value for _, value in tokens[end:])
+        skeleton = (head + ''.join(declarations)).rstrip() + f"\n  {BODY_MARKER}\n" + tail.lstrip()
+
+        return {"skeleton": skeleton, "parts": self._group(statements)}
+
+    def _find_body(self, tokens: List[Tuple]) -> Optional[Tuple[int, int]]:
+        """Token range between the outermost BEGIN and its END."""
+        begin = next(
+            (i for i, (ttype, value) in enumerate(tokens)
+             if ttype in T.Keyword and value.upper() == 'BEGIN'),
+            None
+        )
+        if begin is None:
+            return None
+
+        end = next(
+            (i for i in range(len(tokens) - 1, begin, -1)
+             if tokens[i][0] in T.Keyword and tokens[i][1].upper() == 'END'),
+            None
+        )
+        if end is None:
+            return None
+
+        return begin + 1, end
+
+    def _split_body(self, tokens: List[Tuple]) -> Optional[List[str]]:
+        """Top-level statements of a body, each with its leading whitespace."""
+        text = ''.join(value for _, value in tokens).upper()
+        compound = {block for block in _COMPOUND_BLOCKS if f"END {block}" in text}
+
+        statements = []
+        current = []
+        depth = 0
+        at_start = True
+        previous = None
+
+        for ttype, value in tokens:
+            current.append(value)
+
+            if ttype in T.Whitespace or ttype in T.Newline or ttype in T.Comment:
+                continue
+
+            word = value.upper()
+            if ttype in T.Keyword:
+                if word.split()[0] == 'END':
+                    depth -= 1
+                elif word == 'CASE' and previous is not None and previous.upper() == 'END':
+                    # The CASE of END CASE; its END already closed the block
+                    pass
+                elif word in ('BEGIN', 'CASE'):
+                    depth += 1
+                elif word in compound and (at_start or previous == ':'):
+                    depth += 1
+
+            if depth < 0:
+                return None
+
+            if ttype in T.Punctuation and value == ';':
+                if depth == 0:
+                    statements.append(''.join(current))
+                    current = []
+                at_start = True
+            elif not (ttype in T.Name and at_start) and value != ':':
+                # A leading label (name and colon) still counts as the start
+                at_start = False
+
+            previous = value
+
+        if depth != 0:
+            return None
+
+        rest = ''.join(current)
+        if rest.strip():
+            statements.append(rest)
+
+        return statements
+
+    def _group(self, statements: List[str]) -> List[str]:
+        """Pack consecutive statements into parts under the token budget."""
+        parts = []
+        current = ''
+
+        for statement in statements:
+            if current and estimate_tokens(current + statement) > self.max_part_tokens:
+                parts.append(current)
+                current = ''
+            current += statement
+
+        if current:
+            parts.append(current)
+
+        return parts
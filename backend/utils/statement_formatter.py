@@ -0,0 +1,82 @@
+from collections import OrderedDict
+from typing import Dict, List
+import re
+
+from utils.sql_utils import SQLUtils
+
+
+class StatementFormatter:
+    """
+    Lazy, cached formatting layer for parsed SQL statements.
+
+    Parsers return statements as written; the reindented view is only
+    computed when a consumer (UI display, export) asks for it and is then
+    kept in a bounded LRU cache keyed by the raw statement text.
+    """
+
+    _FIRST_WORD = re.compile(r'\s*([A-Za-z]+)')
+
+    def __init__(self, max_entries: int = 4096):
+        """
+        Initialize the formatter.
+
+        Args:
+            max_entries: Maximum number of formatted statements to keep cached
+        """
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+
+    def format(self, sql: str) -> str:
+        """
+        Get the formatted view of a statement, formatting it on first access.
+
+        Args:
+            sql: Raw SQL statement
+
+        Returns:
+            Reindented SQL with upper-case keywords
+        """
+        formatted = self._cache.get(sql)
+
+        if formatted is not None:
+            self._cache.move_to_end(sql)
+            return formatted
+
+        formatted = SQLUtils.format_sql(sql).strip()
+        self._cache[sql] = formatted
+
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+        return formatted
+
+    def format_many(self, statements: List[str]) -> List[str]:
+        """
+        Format a list of statements, reusing cached results.
+
+        Args:
+            statements: Raw SQL statements
+
+        Returns:
+            Formatted statements in the same order
+        """
+        return [self.format(sql) for sql in statements]
+
+    @classmethod
+    def describe(cls, sql: str) -> Dict:
+        """
+        Build cheap metadata for a raw statement without tokenizing it.
+
+        Args:
+            sql: Raw SQL statement
+
+        Returns:
+            Dict with 'type', 'length' and 'lines' keys
+        """
+        match = cls._FIRST_WORD.match(sql)
+
+        return {
+            "type": match.group(1).upper() if match else None,
+            "length": len(sql),
+            "lines": sql.count('\n') + 1
+        }
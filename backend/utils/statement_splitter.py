@@ -0,0 +1,225 @@
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class StatementSplitter:
+    """
+    Incremental SQL statement splitter for large script files.
+
+    Text is fed in arbitrary chunks and complete statements are returned
+    as soon as their terminator is seen, so a dump never has to be held in
+    memory as a whole. Understands quoted strings and identifiers,
+    comments, PostgreSQL dollar quoting, BEGIN/END blocks inside CREATE
+    statements and the client-side ``DELIMITER``, ``\\g`` and ``/``
+    directives used by mysql and SQL*Plus scripts.
+    """
+
+    _DELIMITER_DIRECTIVE = re.compile(r'^\s*DELIMITER\s+(\S+)', re.IGNORECASE)
+    _SLASH_DIRECTIVE = re.compile(r'^\s*/\s*$')
+    _HEAD = re.compile(r'\s*')
+    _FIRST_WORD = re.compile(r'[A-Za-z_]+')
+    _BLOCK_CLOSERS = re.compile(r'\s+(IF|LOOP|WHILE|REPEAT|FOR)\b', re.IGNORECASE)
+    _END_CASE = re.compile(r'\s+CASE\b', re.IGNORECASE)
+
+    # Closing patterns for each open quote/comment state
+    _CLOSERS = {
+        "'": re.compile(r"(?:\\.|''|[^'\\])*'", re.DOTALL),
+        '"': re.compile(r'(?:\\.|""|[^"\\])*"', re.DOTALL),
+        '`': re.compile(r'(?:``|[^`])*`'),
+        '/*': re.compile(r'.*?\*/', re.DOTALL),
+    }
+
+    def __init__(self):
+        self.delimiter = ';'
+        self._patterns: Dict[Tuple[str, bool], re.Pattern] = {}
+        self._pending = ''
+        self._line = 0
+        self._reset()
+
+    def _reset(self):
+        """Reset per-statement state."""
+        self._parts: List[str] = []
+        self._state: Optional[str] = None
+        self._start_line: Optional[int] = None
+        self._is_create = False
+        self._depth = 0
+        self._closing_case = False
+
+    def feed(self, text: str) -> List[Tuple[str, int]]:
+        """
+        Feed a chunk of text to the splitter.
+
+        Args:
+            text: Next chunk of the script
+
+        Returns:
+            List of (statement, start_line) tuples completed by this chunk
+        """
+        statements = []
+        data = self._pending + text
+        start = 0
+
+        while True:
+            end = data.find('\n', start)
+            if end == -1:
+                break
+            statements.extend(self._process_line(data[start:end + 1]))
+            start = end + 1
+
+        self._pending = data[start:]
+        return statements
+
+    def close(self) -> List[Tuple[str, int]]:
+        """
+        Flush the remaining input once the whole script has been fed.
+
+        Returns:
+            List of (statement, start_line) tuples, including any trailing
+            statement without a terminator
+        """
+        statements = []
+        if self._pending:
+            statements.extend(self._process_line(self._pending))
+            self._pending = ''
+        statements.extend(self._flush(''))
+        return statements
+
+    def split(self, chunks: Iterable[str]) -> Iterator[Tuple[str, int]]:
+        """
+        Split an iterable of text chunks into statements.
+
+        Args:
+            chunks: Iterable of text chunks (e.g. from an incremental decoder)
+
+        Yields:
+            (statement, start_line) tuples in script order
+        """
+        for chunk in chunks:
+            yield from self.feed(chunk)
+        yield from self.close()
+
+    def _process_line(self, line: str) -> List[Tuple[str, int]]:
+        """Scan one line of input, updating state and collecting statements."""
+        self._line += 1
+        statements = []
+
+        if self._state is None and self._start_line is None:
+            # Client directives are only recognised between statements
+            directive = self._DELIMITER_DIRECTIVE.match(line)
+            if directive:
+                self.delimiter = directive.group(1)
+                self._parts = []
+                return statements
+            if self._SLASH_DIRECTIVE.match(line):
+                return statements
+
+        if self._state is None and self._SLASH_DIRECTIVE.match(line):
+            return self._flush('')
+
+        pos = 0
+        length = len(line)
+
+        while pos < length:
+            if self._state == '--':
+                self._parts.append(line[pos:])
+                self._state = None
+                break
+
+            if self._state is not None:
+                closer = self._closer_for(self._state).match(line, pos)
+                if closer is None:
+                    self._parts.append(line[pos:])
+                    break
+                self._parts.append(line[pos:closer.end()])
+                pos = closer.end()
+                self._state = None
+                continue
+
+            if self._start_line is None:
+                head = self._HEAD.match(line, pos)
+                if head.end() >= length:
+                    self._parts.append(line[pos:])
+                    break
+                if not line.startswith(('--', '/*'), head.end()):
+                    self._start_line = self._line
+                    first_word = self._FIRST_WORD.match(line, head.end())
+                    self._is_create = bool(first_word and first_word.group(0).upper() == 'CREATE')
+
+            match = self._pattern().search(line, pos)
+            if match is None:
+                self._parts.append(line[pos:])
+                break
+
+            token = match.group(0)
+            self._parts.append(line[pos:match.start()])
+            pos = match.end()
+
+            if token.upper() == self.delimiter.upper():
+                # A custom delimiter ends the statement whatever the nesting
+                if self._depth > 0 and self.delimiter == ';':
+                    self._parts.append(token)
+                else:
+                    statements.extend(self._flush(';' if token == ';' else ''))
+            elif token in ('\\g', '\\G'):
+                statements.extend(self._flush(';'))
+            elif token in ("'", '"', '`', '/*', '--'):
+                self._parts.append(token)
+                self._state = token
+            elif token.startswith('$'):
+                self._parts.append(token)
+                self._state = token
+            else:
+                self._parts.append(token)
+                self._track_block(token, line, pos)
+
+        return statements
+
+    def _track_block(self, word: str, line: str, pos: int):
+        """Update BEGIN/END nesting depth inside CREATE statements."""
+        word = word.upper()
+        if word == 'CASE' and self._closing_case:
+            # The CASE of END CASE; its END already closed the block
+            self._closing_case = False
+        elif word in ('BEGIN', 'CASE'):
+            self._depth += 1
+        elif word == 'END' and not self._BLOCK_CLOSERS.match(line, pos):
+            self._depth = max(0, self._depth - 1)
+            self._closing_case = bool(self._END_CASE.match(line, pos))
+
+    def _flush(self, terminator: str) -> List[Tuple[str, int]]:
+        """Emit the current statement (if any) and reset for the next one."""
+        statement = ''.join(self._parts).strip()
+        start_line = self._start_line or self._line
+        self._reset()
+
+        if not statement:
+            return []
+
+        return [(statement + terminator, start_line)]
+
+    def _closer_for(self, state: str) -> re.Pattern:
+        """Get the pattern that closes a string, comment or dollar quote."""
+        if state.startswith('$'):
+            return re.compile(r'.*?' + re.escape(state), re.DOTALL)
+        return self._CLOSERS[state]
+
+    def _pattern(self) -> re.Pattern:
+        """Get the scanner pattern for the current delimiter and block mode."""
+        key = (self.delimiter, self._is_create)
+        pattern = self._patterns.get(key)
+
+        if pattern is None:
+            alternatives = [
+                re.escape(self.delimiter),
+                r"['\"`]",
+                r'--',
+                r'/\*',
+                r'\$[A-Za-z_]\w*\$|\$\$',
+                r'\\[gG]',
+            ]
+            if self._is_create:
+                alternatives.append(r'\b(?:BEGIN|END|CASE)\b')
+            pattern = re.compile('|'.join(alternatives), re.IGNORECASE)
+            self._patterns[key] = pattern
+
+        return pattern
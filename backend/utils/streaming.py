@@ -0,0 +1,121 @@
+from typing import Callable, Iterator
+import queue
+import threading
+
+# Sentinel marking the end of the produced stream
+_DONE = object()
+
+
+class QueueWriter:
+    """
+    Write-only file object that hands written bytes to a bounded queue.
+
+    Lets libraries that only know how to ``save(fileobj)`` (openpyxl,
+    zipfile, reportlab) feed an HTTP response as they go. It is not
+    seekable, so zip-based writers fall back to streaming data descriptors.
+    """
+
+    def __init__(self, chunks: queue.Queue, chunk_size: int, cancelled: threading.Event):
+        self._chunks = chunks
+        self._chunk_size = chunk_size
+        self._cancelled = cancelled
+        self._buffer = bytearray()
+        self.closed = False
+
+    def write(self, data) -> int:
+        """Buffer data and pass on full chunks."""
+        self._buffer += data
+        while len(self._buffer) >= self._chunk_size:
+            chunk = bytes(self._buffer[:self._chunk_size])
+            del self._buffer[:self._chunk_size]
+            self._put(chunk)
+        return len(data)
+
+    def flush(self):
+        """Pass any buffered bytes on to the consumer."""
+        if self._buffer:
+            chunk = bytes(self._buffer)
+            self._buffer.clear()
+            self._put(chunk)
+
+    def _put(self, chunk: bytes):
+        """Queue a chunk, waiting for the consumer unless it went away."""
+        while True:
+            if self._cancelled.is_set():
+                raise IOError("Stream consumer went away")
+            try:
+                self._chunks.put(chunk, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def close(self):
+        """Flush remaining bytes; the consumer is signalled separately."""
+        if not self.closed:
+            self.flush()
+            self.closed = True
+
+
+def iter_writer_output(
+    produce: Callable[[QueueWriter], None],
+    chunk_size: int = 64 * 1024,
+    max_chunks: int = 16
+) -> Iterator[bytes]:
+    """
+    Run a writer-based producer in a thread and yield its output as it is written.
+
+    Args:
+        produce: Callable that writes the whole file into the given file object
+        chunk_size: Size of the chunks handed to the consumer
+        max_chunks: Chunks buffered before the producer is paused
+
+    Yields:
+        Chunks of the produced file, in order
+
+    Raises:
+        Any exception raised by the producer, once its earlier output has
+        been consumed
+    """
+    chunks: queue.Queue = queue.Queue(maxsize=max_chunks)
+    cancelled = threading.Event()
+    errors = []
+
+    def run():
+        writer = QueueWriter(chunks, chunk_size, cancelled)
+        try:
+            produce(writer)
+            writer.close()
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            # The end marker must not be dropped, but never block a gone consumer
+            while not cancelled.is_set():
+                try:
+                    chunks.put(_DONE, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is _DONE:
+                break
+            yield chunk
+    finally:
+        # Stops the producer if the consumer stopped early (e.g. client disconnect)
+        cancelled.set()
+
+    thread.join()
+
+    if errors:
+        raise errors[0]
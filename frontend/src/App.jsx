@@ -19,6 +19,7 @@ function App() {
     const [sourceDialect, setSourceDialect] = useState('');
     const [targetDialect, setTargetDialect] = useState('');
     const [statements, setStatements] = useState([]);
+    const [statementIds, setStatementIds] = useState(null);
     const [results, setResults] = useState(null);
     const [isConverting, setIsConverting] = useState(false);
 
@@ -61,6 +62,7 @@ function App() {
             const data = await apiService.parseFile(file);
             console.log('File parsed successfully:', data);
             setStatements(data.statements);
+            setStatementIds(data.ids || null);
             toast.success(`Extracted ${data.count} SQL statement(s)`);
         } catch (error) {
             toast.error(error.response?.data?.detail || 'Failed to parse file');
@@ -75,6 +77,7 @@ function App() {
             const data = await apiService.parseSQL(sqlText);
             console.log('SQL parsed successfully:', data);
             setStatements(data.statements);
+            setStatementIds(null);
             toast.success(`Parsed ${data.count} SQL statement(s)`);
         } catch (error) {
             toast.error('Failed to parse SQL');
@@ -102,7 +105,8 @@ function App() {
             const data = await apiService.convertSQL(
                 statements,
                 sourceDialect,
-                targetDialect
+                targetDialect,
+                statementIds
             );
 
             setResults(data);
@@ -148,6 +152,7 @@ function App() {
     const handleClear = () => {
         setResults(null);
         setStatements([]);
+        setStatementIds(null);
     };
 
     return (
@@ -85,6 +85,28 @@ function ConversionResults({ results, formats, onExport, onClear, sourceDialect,
             color: '#8B5CF6',
             bgColor: '#FAF5FF'
         },
+        'NDJSON': {
+            icon: (
+                <svg viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                    <rect x="4" y="2" width="16" height="20" rx="2" fill="#F59E0B"/>
+                    <path d="M9 7c-1 0-1.5.5-1.5 1.5v1.5L6.5 12l1 2v1.5c0 1 .5 1.5 1.5 1.5M15 7c1 0 1.5.5 1.5 1.5v1.5l1 2-1 2v1.5c0 1-.5 1.5-1.5 1.5" stroke="white" strokeWidth="1.5" strokeLinecap="round"/>
+                </svg>
+            ),
+            ext: '.ndjson',
+            color: '#F59E0B',
+            bgColor: '#FFFBEB'
+        },
+        'Parquet': {
+            icon: (
+                <svg viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                    <rect x="4" y="2" width="16" height="20" rx="2" fill="#0EA5E9"/>
+                    <path d="M8 7v10M12 7v10M16 7v10" stroke="white" strokeWidth="1.5" strokeLinecap="round"/>
+                </svg>
+            ),
+            ext: '.parquet',
+            color: '#0EA5E9',
+            bgColor: '#F0F9FF'
+        },
     };
 
     const successfulResults = results.results.filter(r => r.status === 'success');
@@ -24,6 +24,11 @@ function FileUpload({ onFileUpload }) {
             'text/plain': ['.sql', '.txt'],
             'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': ['.xlsx'],
             'application/vnd.ms-excel': ['.xls'],
+            'application/zip': ['.zip'],
+            'application/gzip': ['.gz', '.tgz'],
+            'application/x-ndjson': ['.ndjson', '.jsonl'],
+            'text/csv': ['.csv'],
+            'application/vnd.apache.parquet': ['.parquet'],
         },
         multiple: false,
     });
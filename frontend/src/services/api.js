@@ -50,16 +50,67 @@ export const apiService = {
         return response.data;
     },
 
+    // Get formatted view of statements (computed and cached server-side)
+    formatSQL: async (statements) => {
+        const response = await api.post('/api/format-sql', {
+            statements,
+        });
+        return response.data.formatted;
+    },
+
     // Convert SQL statements
-    convertSQL: async (statements, sourceDialect, targetDialect) => {
+    convertSQL: async (statements, sourceDialect, targetDialect, statementIds = null) => {
         const response = await api.post('/api/convert', {
             statements,
             source_dialect: sourceDialect,
             target_dialect: targetDialect,
+            statement_ids: statementIds,
         });
         return response.data;
     },
 
+    // Open a live conversion socket; onMessage gets every pushed message
+    // (statements, result, done, error). Call update() with debounced text.
+    openLiveConversion: (sourceDialect, targetDialect, onMessage, apiKey = null) => {
+        const socket = new WebSocket(`${API_BASE_URL.replace(/^http/, 'ws')}/ws/convert`);
+        let version = 0;
+        let pendingText = null;
+
+        const send = (sqlText) => {
+            socket.send(JSON.stringify({
+                type: 'update',
+                sql_text: sqlText,
+                version: ++version,
+            }));
+        };
+
+        socket.onopen = () => {
+            socket.send(JSON.stringify({
+                type: 'start',
+                source_dialect: sourceDialect,
+                target_dialect: targetDialect,
+                api_key: apiKey,
+            }));
+            // Text typed before the socket opened
+            if (pendingText !== null) {
+                send(pendingText);
+                pendingText = null;
+            }
+        };
+        socket.onmessage = (event) => onMessage(JSON.parse(event.data));
+
+        return {
+            update: (sqlText) => {
+                if (socket.readyState === WebSocket.OPEN) {
+                    send(sqlText);
+                } else {
+                    pendingText = sqlText;
+                }
+            },
+            close: () => socket.close(),
+        };
+    },
+
     // Export results
     exportResults: async (results, sourceDialect, targetDialect, format) => {
         const response = await api.post('/api/export', {
@@ -82,6 +133,8 @@ export const apiService = {
             'Word Document': '.docx',
             'Excel': '.xlsx',
             'SQL File': '.sql',
+            'NDJSON': '.ndjson',
+            'Parquet': '.parquet',
         };
 
         link.setAttribute('download', `converted_sql${extensions[format] || '.txt'}`);
@@ -91,6 +144,28 @@ export const apiService = {
         window.URL.revokeObjectURL(url);
     },
 
+    // Export results to several formats in one ZIP
+    exportBundle: async (results, sourceDialect, targetDialect, formats) => {
+        const response = await api.post('/api/export-bundle', {
+            results,
+            source_dialect: sourceDialect,
+            target_dialect: targetDialect,
+            formats,
+        }, {
+            responseType: 'blob',
+        });
+
+        // Create download link
+        const url = window.URL.createObjectURL(new Blob([response.data]));
+        const link = document.createElement('a');
+        link.href = url;
+        link.setAttribute('download', 'converted_sql.zip');
+        document.body.appendChild(link);
+        link.click();
+        link.remove();
+        window.URL.revokeObjectURL(url);
+    },
+
     // Validate API key
     validateAPIKey: async (apiKey) => {
         const formData = new FormData();